@@ -0,0 +1,179 @@
+"""Content-addressed on-disk cache for derived feature frames.
+
+An entry's key hashes everything the frame was derived from: the index,
+column names, dtypes and values of the input frame, the
+:class:`~features.FeatureSpec`, and :data:`features.FEATURES_VERSION` for the
+feature code itself. Any change to those produces a new key, and an
+unchanged key always names the same frame. Entries therefore never need
+invalidating, only evicting.
+
+Entries are stored in the per-column ``.npy`` layout of :mod:`loader` and
+memory-mapped on load. The cache is bounded by total size. When a new entry
+pushes it over ``max_bytes``, the least recently used entries are deleted.
+An entry's recency is the mtime of its manifest, which every hit touches.
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from features import DEFAULT_SPEC, FEATURES_VERSION, FeatureSpec, create_financial_features
+from loader import MANIFEST, read_columns, write_columns
+
+INDEX_COLUMN = "__index__"
+
+
+def _digest(*parts: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Hash of a frame's index, column names, dtypes and values.
+
+    Numeric columns are hashed from their buffers; other columns (object,
+    categorical, extension dtypes) from pandas' per-row value hashes.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for name, values in ((INDEX_COLUMN, df.index), *df.items()):
+        h.update(f"{name}:{values.dtype}".encode())
+        h.update(b"\0")
+        if isinstance(values.dtype, np.dtype) and values.dtype.kind in "biufcmM":
+            h.update(np.ascontiguousarray(values.to_numpy()).view(np.uint8))
+        else:
+            h.update(pd.util.hash_pandas_object(values, index=False).to_numpy().view(np.uint8))
+    return h.hexdigest()
+
+
+def spec_fingerprint(spec: FeatureSpec) -> str:
+    """Hash of every field of ``spec``."""
+    return _digest(type(spec).__qualname__, json.dumps(dataclasses.asdict(spec), sort_keys=True))
+
+
+class FeatureCache:
+    """Size-bounded LRU cache of DataFrames under content-derived keys.
+
+    Parameters
+    ----------
+    directory
+        One subdirectory per entry is created here
+    max_bytes
+        Total size the cache is trimmed back to after each insert
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 4 * 1024**3) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        return _digest(*parts)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """The cached frame for ``key``, memory-mapped, or None."""
+        directory = self._path(key)
+        columns = read_columns(directory, {"key": key})
+        if columns is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        os.utime(os.path.join(directory, MANIFEST))
+        index = columns.pop(INDEX_COLUMN, None)
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def put(self, key: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Store ``df`` under ``key``, evict if over budget, and return the memory-mapped copy."""
+        columns: Dict[str, np.ndarray] = {}
+        for name in df.columns:
+            series = df[name]
+            columns[name] = series.array if isinstance(series.dtype, pd.CategoricalDtype) else series.to_numpy()
+        if not df.index.equals(pd.RangeIndex(len(df))):
+            columns[INDEX_COLUMN] = df.index.to_numpy()
+
+        # write beside the final location and rename, so readers never see a partial entry
+        staging = self._path(f"{key}.tmp{os.getpid()}")
+        target = self._path(key)
+        shutil.rmtree(staging, ignore_errors=True)
+        write_columns(staging, {"key": key}, columns)
+        try:
+            os.rename(staging, target)
+        except OSError:
+            if read_columns(target, {"key": key}) is not None:
+                # another process stored the same key first; the contents are identical
+                shutil.rmtree(staging, ignore_errors=True)
+            else:
+                # a broken or partial entry is in the way; replace it
+                shutil.rmtree(target, ignore_errors=True)
+                try:
+                    os.rename(staging, target)
+                except OSError:
+                    shutil.rmtree(staging, ignore_errors=True)
+                    raise
+        self.evict(keep=key)
+        return self.get(key)
+
+    def get_or_compute(self, key: str, compute: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        df = self.get(key)
+        return df if df is not None else self.put(key, compute())
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        """``(last_used, size_bytes, key)`` for every complete entry, least recent first."""
+        result = []
+        for key in os.listdir(self.directory):
+            if ".tmp" in key:
+                continue
+            directory = self._path(key)
+            try:
+                last_used = os.stat(os.path.join(directory, MANIFEST)).st_mtime
+            except OSError:
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(directory))
+            result.append((last_used, size, key))
+        return sorted(result)
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Delete least recently used entries until the cache fits ``max_bytes``."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = []
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._path(key), ignore_errors=True)
+            total -= size
+            evicted.append(key)
+        return evicted
+
+    def clear(self) -> None:
+        for key in os.listdir(self.directory):
+            shutil.rmtree(self._path(key), ignore_errors=True)
+
+
+def cached_features(
+    df: pd.DataFrame,
+    cache: FeatureCache,
+    spec: FeatureSpec = DEFAULT_SPEC,
+) -> pd.DataFrame:
+    """``create_financial_features(df, spec)``, reused across sessions for frames with the same contents."""
+    key = cache.key("features", str(FEATURES_VERSION), frame_fingerprint(df), spec_fingerprint(spec))
+    return cache.get_or_compute(key, lambda: create_financial_features(df, spec))
@@ -0,0 +1,300 @@
+"""Lag, rate-of-change, range-regime and MACD features for columns A-N.
+
+Two implementations of the same feature set:
+
+* :func:`create_financial_features` computes the whole history at once. Each
+  feature family is one NumPy operation over all columns, written straight
+  into a single preallocated block.
+* :class:`StreamingFeatures` keeps per-column state and produces one row of
+  features per call in O(1): ring buffers for lags and ROC, monotonic deques
+  for the rolling min/max, and recursive EWMs.
+
+Both return the values of the original pandas implementation (``shift``,
+``rolling`` and ``ewm(adjust=False)``), including the NaN warm-up rows,
+rounded to one output precision: float32 for float32 input, float64 for
+anything else (the streaming path takes it as ``dtype``). On float64 input
+that is the pandas output value for value. On float32 input, lags and rates
+of change are computed in float32 and equal what pandas returns. Pandas
+returns the range-regime and MACD families as float64; both paths compute
+them in float64 too, and store them as float32.
+"""
+
+import math
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """Which columns get features, and the lags/windows/spans used."""
+
+    columns: Tuple[str, ...] = tuple("ABCDEFGHIJKLMN")
+    lags: Tuple[int, ...] = (1, 2, 3)
+    roc_windows: Tuple[int, ...] = (5, 10)
+    regime_window: int = 10
+    ema_short: int = 5
+    ema_long: int = 10
+    signal_span: int = 3
+
+    def per_column(self) -> List[str]:
+        """Feature suffixes generated for every column, in output order."""
+        return [
+            *(f"lag{k}" for k in self.lags),
+            *(f"roc{w}" for w in self.roc_windows),
+            "regime",
+            "regime_strength",
+            "macd",
+            "macd_signal",
+            "macd_hist",
+        ]
+
+    def feature_names(self) -> List[str]:
+        suffixes = self.per_column()
+        return [f"{col}_{suffix}" for col in self.columns for suffix in suffixes]
+
+
+DEFAULT_SPEC = FeatureSpec()
+
+# Bump whenever the output of create_financial_features changes for the same
+# input and spec (values, dtypes or layout); cached feature frames key on it.
+FEATURES_VERSION = 2
+
+
+def _ewm(values: np.ndarray, span: int) -> np.ndarray:
+    """``ewm(span, adjust=False).mean()`` along the last axis of a (columns, rows) array."""
+    return pd.DataFrame(values.T, copy=False).ewm(span=span, adjust=False).mean().to_numpy().T
+
+
+def compute_features(X: np.ndarray, spec: FeatureSpec = DEFAULT_SPEC) -> np.ndarray:
+    """Feature block for a (rows, len(spec.columns)) numeric array.
+
+    Work happens on a (columns, features, rows) buffer so every operation
+    runs along contiguous rows; the result is returned as a transposed view
+    of that buffer, which pandas adopts without copying.
+
+    Returns
+    -------
+    features
+        Array of shape (rows, len(spec.columns) * len(spec.per_column())),
+        laid out in ``spec.feature_names()`` order, with the dtype of ``X``
+        if it is float32 or float64 and float64 otherwise
+    """
+    X = np.asarray(X)
+    dtype = np.result_type(X.dtype, np.float32)
+    XT = np.ascontiguousarray(X.T, dtype=dtype)
+    XT64 = XT if dtype == np.float64 else XT.astype(np.float64)
+    c, n = XT.shape
+    k = len(spec.per_column())
+    out = np.empty((c, k, n), dtype=dtype)
+
+    j = 0
+    for lag in spec.lags:
+        out[:, j, :lag] = np.nan
+        out[:, j, lag:] = XT[:, :-lag] if lag < n else XT[:, :0]
+        j += 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for w in spec.roc_windows:
+            out[:, j, :w] = np.nan
+            if w < n:
+                np.divide(XT[:, w:], XT[:, :-w], out=out[:, j, w:])
+                out[:, j, w:] -= 1
+            j += 1
+
+        W = spec.regime_window
+        out[:, j:j + 2, :W - 1] = np.nan
+        if W <= n:
+            # W - 1 shifted elementwise passes beat a strided window reduction
+            # and propagate NaN the same way rolling(W).min()/max() do
+            rolling_min = XT64[:, W - 1:].copy()
+            rolling_max = XT64[:, W - 1:].copy()
+            for d in range(1, W):
+                np.minimum(rolling_min, XT64[:, W - 1 - d:n - d], out=rolling_min)
+                np.maximum(rolling_max, XT64[:, W - 1 - d:n - d], out=rolling_max)
+            hl_range = np.subtract(rolling_max, rolling_min, out=rolling_max)
+            hl_range[hl_range == 0] = 1e-6
+            regime = np.subtract(XT64[:, W - 1:], rolling_min, out=rolling_min)
+            np.divide(regime, hl_range, out=regime)
+            out[:, j, W - 1:] = regime
+            np.abs(np.subtract(regime, 0.5, out=regime), out=regime)
+            regime *= 2
+            out[:, j + 1, W - 1:] = regime
+            del rolling_min, rolling_max, hl_range, regime
+        j += 2
+
+    # in float64 like pandas; stored at the output precision only at the end
+    macd = _ewm(XT64, spec.ema_short) - _ewm(XT64, spec.ema_long)
+    signal = _ewm(macd, spec.signal_span)
+    out[:, j, :] = macd
+    out[:, j + 1, :] = signal
+    np.subtract(macd, signal, out=out[:, j + 2, :])
+    return out.reshape(c * k, n).T
+
+
+def create_financial_features(df: pd.DataFrame, spec: FeatureSpec = DEFAULT_SPEC) -> pd.DataFrame:
+    """Return ``df`` with the feature columns of ``spec`` appended."""
+    features = compute_features(df[list(spec.columns)].to_numpy(), spec)
+    features_df = pd.DataFrame(features, index=df.index, columns=spec.feature_names(), copy=False)
+    return pd.concat([df, features_df], axis=1)
+
+
+def _roc(x: float, prev: float) -> float:
+    """``x / prev - 1`` with NumPy's division-by-zero semantics instead of an exception."""
+    if prev == 0:
+        if x == 0 or x != x:
+            return math.nan
+        return math.copysign(math.inf, x) * math.copysign(1.0, prev)
+    return x / prev - 1
+
+
+def _roc32(x: float, prev: float) -> float:
+    """:func:`_roc` in float32 arithmetic for float32 ``x`` and ``prev``.
+
+    Each float64 result is rounded to float32. For a single division or
+    subtraction of float32 values this gives the float32 result exactly.
+    """
+    if prev == 0:
+        return _roc(x, prev)
+    return array("f", (array("f", (x / prev,))[0] - 1.0,))[0]
+
+
+class _Ewm:
+    """Recursive ``ewm(adjust=False).mean()``, step for step as pandas computes it."""
+
+    __slots__ = ("alpha", "factor", "weighted", "old_wt")
+
+    def __init__(self, span: int) -> None:
+        self.alpha = 2.0 / (span + 1.0)
+        self.factor = 1.0 - self.alpha
+        self.weighted = float("nan")
+        self.old_wt = 1.0
+
+    def update(self, cur: float) -> float:
+        weighted = self.weighted
+        if weighted == weighted:
+            self.old_wt *= self.factor
+            if cur == cur:
+                if weighted != cur:
+                    weighted = (self.old_wt * weighted + self.alpha * cur) / (self.old_wt + self.alpha)
+                    self.weighted = weighted
+                self.old_wt = 1.0
+        elif cur == cur:
+            self.weighted = weighted = cur
+        return weighted
+
+
+class _ColumnState:
+    __slots__ = ("history", "mins", "maxs", "nans", "short", "long", "signal")
+
+    def __init__(self, spec: FeatureSpec, history: int) -> None:
+        self.history = [float("nan")] * history
+        self.mins: deque = deque()  # (row, value), values increasing
+        self.maxs: deque = deque()  # (row, value), values decreasing
+        self.nans: deque = deque()  # rows of NaNs still inside the window
+        self.short = _Ewm(spec.ema_short)
+        self.long = _Ewm(spec.ema_long)
+        self.signal = _Ewm(spec.signal_span)
+
+
+class StreamingFeatures:
+    """Row-at-a-time version of :func:`create_financial_features`.
+
+    Parameters
+    ----------
+    spec
+        Feature specification, shared with the batch path
+    dtype
+        Output precision, float32 or float64. With float32, inputs are
+        rounded to float32 and lags and rates of change are computed in
+        float32, so rows match :func:`compute_features` on a float32 frame.
+    """
+
+    def __init__(self, spec: FeatureSpec = DEFAULT_SPEC, dtype: np.dtype = np.float64) -> None:
+        self.spec = spec
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float64):
+            raise ValueError(f"dtype must be float32 or float64, not {self.dtype}")
+        self._float32 = self.dtype == np.float32
+        self.names = spec.feature_names()
+        self._size = max((*spec.lags, *spec.roc_windows, 1)) + 1
+        self.reset()
+
+    def reset(self) -> None:
+        self.row = 0
+        self._states = [_ColumnState(self.spec, self._size) for _ in self.spec.columns]
+
+    def update(self, values: Sequence[float]) -> List[float]:
+        """Consume one row of raw values (in ``spec.columns`` order) and return its features."""
+        spec = self.spec
+        i = self.row
+        size = self._size
+        W = spec.regime_window
+        nan = float("nan")
+        float32 = self._float32
+        roc = _roc32 if float32 else _roc
+        out: List[float] = []
+        append = out.append
+
+        if float32:
+            values = array("f", values)
+        for x, st in zip(values, self._states):
+            x = float(x)
+            history = st.history
+            history[i % size] = x
+
+            for lag in spec.lags:
+                append(history[(i - lag) % size] if i >= lag else nan)
+            for w in spec.roc_windows:
+                append(roc(x, history[(i - w) % size]) if i >= w else nan)
+
+            # rolling min/max over the last W rows; any NaN in the window gives NaN
+            start = i - W + 1
+            mins, maxs, nans = st.mins, st.maxs, st.nans
+            while nans and nans[0] < start:
+                nans.popleft()
+            while mins and mins[0][0] < start:
+                mins.popleft()
+            while maxs and maxs[0][0] < start:
+                maxs.popleft()
+            if x != x:
+                nans.append(i)
+            else:
+                while mins and mins[-1][1] >= x:
+                    mins.pop()
+                mins.append((i, x))
+                while maxs and maxs[-1][1] <= x:
+                    maxs.pop()
+                maxs.append((i, x))
+            if start >= 0 and not nans:
+                low = mins[0][1]
+                hl_range = maxs[0][1] - low
+                regime = (x - low) / (1e-6 if hl_range == 0 else hl_range)
+                append(regime)
+                append(abs(regime - 0.5) * 2)
+            else:
+                append(nan)
+                append(nan)
+
+            macd = st.short.update(x) - st.long.update(x)
+            signal = st.signal.update(macd)
+            append(macd)
+            append(signal)
+            append(macd - signal)
+
+        self.row = i + 1
+        # regime and MACD stay float64 in the state; only the output is rounded
+        return array("f", out).tolist() if float32 else out
+
+    def transform(self, df: pd.DataFrame, index: Optional[pd.Index] = None) -> pd.DataFrame:
+        """Feed every row of ``df`` through :meth:`update` and collect the features."""
+        rows = [self.update(values) for values in df[list(self.spec.columns)].itertuples(index=False)]
+        return pd.DataFrame(
+            np.array(rows, dtype=self.dtype).reshape(len(rows), len(self.names)),
+            index=df.index if index is None else index,
+            columns=self.names,
+            copy=False,
+        )
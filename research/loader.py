@@ -0,0 +1,215 @@
+"""Out-of-core CSV loading into compact dtypes, with a memory-mapped column cache.
+
+:func:`load_csv` never materialises the float64 frame that ``pd.read_csv``
+followed by ``reduce_mem_usage`` would. It picks each column's dtype from a
+sampled read using the same rules as ``reduce_mem_usage`` and preallocates
+one array per column. It then parses the file in chunks and writes each chunk
+straight into those arrays. If a later chunk does not fit the sampled dtype
+(a larger id, a NaN in an integer column), that column alone is widened.
+
+With ``cache_dir`` set, the arrays are saved as one ``.npy`` file per column
+next to a manifest. Later loads memory-map them (copy-on-write) instead of
+parsing the CSV; the cache is rebuilt automatically when the CSV's size or
+mtime changes.
+"""
+
+import json
+import os
+import warnings
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+MANIFEST = "manifest.json"
+
+
+def compact_dtype(values: np.ndarray, float16_as_32: bool = True) -> np.dtype:
+    """Smallest dtype for ``values`` under the rules of the notebook's ``reduce_mem_usage``."""
+    dtype = values.dtype
+    if not np.issubdtype(dtype, np.number) or values.size == 0:
+        return dtype
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN chunk
+        lo, hi = np.nanmin(values), np.nanmax(values)
+    if np.issubdtype(dtype, np.integer):
+        if lo >= 0:
+            for candidate in (np.uint8, np.uint16, np.uint32):
+                if hi < np.iinfo(candidate).max:
+                    return np.dtype(candidate)
+            return np.dtype(np.uint64)
+        for candidate in (np.int8, np.int16, np.int32):
+            info = np.iinfo(candidate)
+            if lo > info.min and hi < info.max:
+                return np.dtype(candidate)
+        return np.dtype(np.int64)
+    if not float16_as_32 and lo > np.finfo(np.float16).min and hi < np.finfo(np.float16).max:
+        return np.dtype(np.float16)
+    if lo > np.finfo(np.float32).min and hi < np.finfo(np.float32).max:
+        return np.dtype(np.float32)
+    return np.dtype(np.float64)
+
+
+def count_rows(path: str) -> int:
+    """Upper bound on the number of data rows (newlines minus the header)."""
+    lines = 0
+    last = b""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(1 << 20)
+            if not block:
+                break
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last and last != b"\n":
+        lines += 1
+    return max(0, lines - 1)
+
+
+def _fit(column: np.ndarray, values: np.ndarray, float16_as_32: bool) -> np.ndarray:
+    """Return ``column``, widened if ``values`` do not fit its dtype."""
+    needed = compact_dtype(values, float16_as_32)
+    if column.dtype == object or needed == object:
+        return column if column.dtype == object else column.astype(object)
+    promoted = np.promote_types(column.dtype, needed)
+    return column if promoted == column.dtype else column.astype(promoted)
+
+
+def read_csv_compact(
+    path: str,
+    chunksize: int = 100_000,
+    sample_rows: int = 50_000,
+    float16_as_32: bool = True,
+    category_threshold: float = 0.5,
+) -> Dict[str, np.ndarray]:
+    """Stream ``path`` into one compact NumPy array per column.
+
+    Parameters
+    ----------
+    path
+        CSV file with a header row
+    chunksize
+        Rows parsed per chunk; bounds the float64 working set
+    sample_rows
+        Rows read up front to choose the initial dtypes
+    float16_as_32
+        Store float16-range columns as float32, as ``reduce_mem_usage`` does
+    category_threshold
+        String columns with a unique/total ratio below this become categorical
+
+    Returns
+    -------
+    columns
+        Mapping of column name to array (or ``pd.Categorical`` for strings)
+    """
+    sample = pd.read_csv(path, nrows=sample_rows)
+    capacity = count_rows(path)
+    columns = {
+        name: np.empty(capacity, dtype=compact_dtype(sample[name].to_numpy(), float16_as_32))
+        for name in sample.columns
+    }
+    del sample
+
+    filled = 0
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        n = len(chunk)
+        for name in columns:
+            values = chunk[name].to_numpy()
+            column = _fit(columns[name], values, float16_as_32)
+            column[filled:filled + n] = values
+            columns[name] = column
+        filled += n
+
+    result = {}
+    for name, column in columns.items():
+        column = column[:filled]
+        if column.dtype == object:
+            unique = pd.unique(column)
+            if filled and len(unique) / filled < category_threshold:
+                column = pd.Categorical(column)
+        result[name] = column
+    return result
+
+
+def _source_stamp(path: str) -> dict:
+    st = os.stat(path)
+    return {"source": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _cache_path(path: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, os.path.splitext(os.path.basename(path))[0])
+
+
+def write_columns(directory: str, stamp: dict, columns: Dict[str, np.ndarray]) -> None:
+    """Save ``columns`` as one ``.npy`` file each, with ``stamp`` recorded in the manifest."""
+    os.makedirs(directory, exist_ok=True)
+    entries: List[dict] = []
+    for i, (name, column) in enumerate(columns.items()):
+        entry = {"name": name, "file": f"{i}.npy"}
+        if isinstance(column, pd.Categorical):
+            entry["categories"] = column.categories.tolist()
+            column = column.codes
+        elif column.dtype == object:
+            raise TypeError(f"column {name!r} holds mixed objects and cannot be cached")
+        np.save(os.path.join(directory, entry["file"]), column)
+        entries.append(entry)
+    # the manifest goes last so a half-written cache is never considered valid
+    with open(os.path.join(directory, MANIFEST), "w") as f:
+        json.dump({**stamp, "columns": entries}, f)
+
+
+def read_columns(directory: str, stamp: dict) -> Optional[Dict[str, np.ndarray]]:
+    """Memory-map columns saved by :func:`write_columns`; None if missing or ``stamp`` differs."""
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if any(manifest.get(key) != value for key, value in stamp.items()):
+        return None
+    columns = {}
+    for entry in manifest["columns"]:
+        column = np.load(os.path.join(directory, entry["file"]), mmap_mode="c")
+        if "categories" in entry:
+            column = pd.Categorical.from_codes(column, entry["categories"])
+        columns[entry["name"]] = column
+    return columns
+
+
+def load_csv(
+    path: str,
+    cache_dir: Optional[str] = None,
+    verbose: bool = True,
+    **kwargs,
+) -> pd.DataFrame:
+    """Load a CSV as a compact DataFrame, memory-mapping a column cache when available.
+
+    Parameters
+    ----------
+    path
+        CSV file with a header row
+    cache_dir
+        Directory for the per-column ``.npy`` cache; None disables caching
+    verbose
+        Print where the data came from and its in-memory size
+    kwargs
+        Passed to :func:`read_csv_compact`
+    """
+    columns = None
+    stamp = _source_stamp(path)
+    directory = _cache_path(path, cache_dir) if cache_dir else None
+    if directory:
+        columns = read_columns(directory, stamp)
+    origin = "cache"
+    if columns is None:
+        origin = "csv"
+        columns = read_csv_compact(path, **kwargs)
+        if directory:
+            write_columns(directory, stamp, columns)
+            columns = read_columns(directory, stamp)
+
+    df = pd.DataFrame(columns, copy=False)
+    if verbose:
+        size = sum(getattr(c, "nbytes", 0) for c in columns.values()) / 1024**2
+        print(f"{path}: {len(df)} rows x {df.shape[1]} columns from {origin}, {size:.2f} MB")
+    return df
@@ -0,0 +1,104 @@
+"""One scaled design matrix shared by the Y1 and Y2 models.
+
+Scaling ``X[Y1_FEATURES]`` and ``X[Y2_FEATURES]`` separately copies the
+shared columns (``time``) twice and every column at least twice more. Here
+the features are copied once into a single float32 matrix in column-major
+order. Its columns are laid out as::
+
+    y1 only | shared | y2 only
+
+so each target's features are one contiguous column slice, a view that
+needs no copy. The matrix is standardised in place by one ``StandardScaler``.
+Per-column scaling makes that identical to scaling each subset on its own.
+"""
+
+import pickle
+from typing import Any, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from predict import TARGETS  # noqa: F401  (re-exported)
+
+
+def r2_scores(y_true, y_pred) -> np.ndarray:
+    """R² of every column of ``y_pred`` against ``y_true``, in one pass.
+
+    Matches ``sklearn.metrics.r2_score`` column by column, including 1.0 for
+    a perfectly predicted constant column and 0.0 for an imperfect one.
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    ss_res = np.square(y_true - y_pred).sum(axis=0)
+    ss_tot = np.square(y_true - y_true.mean(axis=0)).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = 1.0 - ss_res / ss_tot
+    return np.where(ss_tot == 0, np.where(ss_res == 0, 1.0, 0.0), r2)
+
+
+def fused_layout(y1_features: Sequence[str], y2_features: Sequence[str]) -> Tuple[List[str], slice, slice]:
+    """Column order of the fused matrix and the slice holding each target's features.
+
+    Features are regrouped (y1 only, shared, y2 only), so the order within a
+    slice can differ from the lists passed in; models must be fitted and
+    used through the same layout.
+    """
+    y2 = set(y2_features)
+    y1_only = [c for c in y1_features if c not in y2]
+    shared = [c for c in y1_features if c in y2]
+    y2_only = [c for c in y2_features if c not in set(shared)]
+    columns = y1_only + shared + y2_only
+    return columns, slice(0, len(y1_only) + len(shared)), slice(len(y1_only), len(columns))
+
+
+class TwoTargetModel:
+    """Y1 and Y2 regressors fitted and applied through one shared design matrix.
+
+    Parameters
+    ----------
+    model_y1, model_y2
+        Unfitted scikit-learn style regressors
+    y1_features, y2_features
+        Feature columns of each target; overlaps are stored once
+    """
+
+    def __init__(self, model_y1: Any, model_y2: Any, y1_features: Sequence[str], y2_features: Sequence[str]) -> None:
+        self.model_y1 = model_y1
+        self.model_y2 = model_y2
+        self.y1_features = list(y1_features)
+        self.y2_features = list(y2_features)
+        self.columns, self.y1_slice, self.y2_slice = fused_layout(self.y1_features, self.y2_features)
+        self.scaler = StandardScaler(copy=False)
+
+    def design_matrix(self, X: pd.DataFrame) -> np.ndarray:
+        """Copy the feature columns of ``X`` into a fresh column-major float32 matrix."""
+        out = np.empty((len(X), len(self.columns)), dtype=np.float32, order="F")
+        for j, name in enumerate(self.columns):
+            out[:, j] = X[name].to_numpy()
+        return out
+
+    def fit(self, X: pd.DataFrame, Y) -> "TwoTargetModel":
+        """Fit the scaler on all features at once, then each model on its view."""
+        Y = np.asarray(Y.values if hasattr(Y, "values") else Y)
+        design = self.scaler.fit_transform(self.design_matrix(X))
+        self.model_y1.fit(design[:, self.y1_slice], Y[:, 0])
+        self.model_y2.fit(design[:, self.y2_slice], Y[:, 1])
+        return self
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        """Predictions of shape (len(X), 2), Y1 then Y2."""
+        design = self.scaler.transform(self.design_matrix(X))
+        out = np.empty((len(design), 2))
+        out[:, 0] = self.model_y1.predict(design[:, self.y1_slice])
+        out[:, 1] = self.model_y2.predict(design[:, self.y2_slice])
+        return out
+
+    def score(self, X: pd.DataFrame, Y) -> float:
+        """Mean of the two R² scores, the competition metric."""
+        return float(r2_scores(Y, self.predict(X)).mean())
+
+    def save(self, path: str) -> None:
+        """Pickle the fitted model; :mod:`predict` accepts the file as a bundle."""
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
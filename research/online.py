@@ -0,0 +1,167 @@
+"""Incremental Y1 model: running standardisation plus a mini-batch SGD Huber regressor.
+
+``HuberRegressor`` has to be refitted on the full history whenever rows are
+added. :class:`OnlineHuberRegressor` instead updates in O(features) time per
+new row:
+
+* :class:`RunningScaler` keeps per-column mean and variance with Welford /
+  Chan batch merges. It standardises the features and the target.
+* The weights take one AdaGrad step per mini-batch on the Huber loss plus an
+  L2 penalty. As in ``HuberRegressor``, ``epsilon`` is relative to the
+  residual scale, which is tracked online from the mean absolute residual.
+
+:func:`walk_forward` evaluates such a model on exactly the folds
+``TimeSeriesSplit`` produces. Those training windows are expanding
+prefixes, so one model is learned once over the data: train on the first
+window, score the next fold before learning it, learn it, and so on.
+"""
+
+from typing import Callable, List, Optional
+
+import numpy as np
+from sklearn.model_selection import TimeSeriesSplit
+
+from multitarget import r2_scores
+
+# E|r| = sigma * sqrt(2 / pi) for normal residuals
+_MAD_TO_SIGMA = float(np.sqrt(np.pi / 2))
+
+
+def _as_array(data, dtype=np.float64) -> np.ndarray:
+    return np.asarray(data.values if hasattr(data, "values") else data, dtype=dtype)
+
+
+class RunningScaler:
+    """Column means and variances over every row seen so far."""
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.mean: Optional[np.ndarray] = None
+        self._m2: Optional[np.ndarray] = None
+
+    def partial_fit(self, X) -> "RunningScaler":
+        X = _as_array(X)
+        if X.ndim == 1:
+            X = X[:, None]
+        k = len(X)
+        if k == 0:
+            return self
+        batch_mean = X.mean(axis=0)
+        batch_m2 = np.square(X - batch_mean).sum(axis=0)
+        if self.n == 0:
+            self.mean, self._m2 = batch_mean, batch_m2
+        else:
+            n = self.n + k
+            delta = batch_mean - self.mean
+            self.mean = self.mean + delta * (k / n)
+            self._m2 = self._m2 + batch_m2 + np.square(delta) * (self.n * k / n)
+        self.n += k
+        return self
+
+    @property
+    def scale(self) -> np.ndarray:
+        """Population standard deviation, with zero-variance columns left unscaled."""
+        std = np.sqrt(self._m2 / max(self.n, 1))
+        return np.where(std > 0, std, 1.0)
+
+    def transform(self, X) -> np.ndarray:
+        return (_as_array(X) - self.mean) / self.scale
+
+
+class OnlineHuberRegressor:
+    """Linear Huber regression learned by mini-batch AdaGrad on standardised data.
+
+    Parameters
+    ----------
+    epsilon
+        Residuals beyond ``epsilon`` times the running residual scale get
+        linear instead of quadratic loss (``HuberRegressor`` semantics)
+    alpha
+        L2 penalty per sample on the standardised weights
+    learning_rate
+        AdaGrad base step size
+    batch_size
+        Rows per gradient step
+    """
+
+    def __init__(self, epsilon: float = 1.35, alpha: float = 1e-4, learning_rate: float = 0.05, batch_size: int = 256) -> None:
+        self.epsilon = epsilon
+        self.alpha = alpha
+        self.learning_rate = learning_rate
+        self.batch_size = batch_size
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything learned."""
+        self.x_scaler = RunningScaler()
+        self.y_scaler = RunningScaler()
+        self.coef_: Optional[np.ndarray] = None
+        self.intercept_ = 0.0
+        self.sigma_ = 1.0
+        self._g2: Optional[np.ndarray] = None
+
+    def _step(self, X: np.ndarray, y: np.ndarray) -> None:
+        self.x_scaler.partial_fit(X)
+        self.y_scaler.partial_fit(y)
+        Z = self.x_scaler.transform(X)
+        t = (y - self.y_scaler.mean[0]) / self.y_scaler.scale[0]
+        if self.coef_ is None:
+            self.coef_ = np.zeros(Z.shape[1])
+            self._g2 = np.zeros(Z.shape[1] + 1)
+
+        residual = t - (Z @ self.coef_ + self.intercept_)
+        # residual scale follows the mean absolute residual, slowly enough to stay robust
+        self.sigma_ = 0.99 * self.sigma_ + 0.01 * _MAD_TO_SIGMA * float(np.abs(residual).mean())
+        bound = self.epsilon * self.sigma_
+        psi = np.clip(residual, -bound, bound)
+
+        grad = np.empty(len(self.coef_) + 1)
+        grad[:-1] = -(Z.T @ psi) / len(Z) + self.alpha * self.coef_
+        grad[-1] = -psi.mean()
+        self._g2 += np.square(grad)
+        step = self.learning_rate * grad / (np.sqrt(self._g2) + 1e-8)
+        self.coef_ -= step[:-1]
+        self.intercept_ -= step[-1]
+
+    def partial_fit(self, X, y) -> "OnlineHuberRegressor":
+        """Learn from new rows, in order, one mini-batch at a time."""
+        X = _as_array(X)
+        y = _as_array(y).ravel()
+        for start in range(0, len(X), self.batch_size):
+            self._step(X[start:start + self.batch_size], y[start:start + self.batch_size])
+        return self
+
+    def fit(self, X, y, epochs: int = 1) -> "OnlineHuberRegressor":
+        """Start over and make ``epochs`` passes over ``X``/``y``."""
+        self.reset()
+        for _ in range(epochs):
+            self.partial_fit(X, y)
+        return self
+
+    def predict(self, X) -> np.ndarray:
+        Z = self.x_scaler.transform(X)
+        return self.y_scaler.mean[0] + self.y_scaler.scale[0] * (Z @ self.coef_ + self.intercept_)
+
+
+def walk_forward(
+    make_model: Callable[[], OnlineHuberRegressor],
+    X,
+    y,
+    n_splits: int = 3,
+) -> List[float]:
+    """R² on each ``TimeSeriesSplit`` validation fold of a single online model.
+
+    Each fold is scored before the model learns it, so every score uses only
+    earlier rows, exactly like refitting on that fold's training window.
+    """
+    X = _as_array(X)
+    y = _as_array(y).ravel()
+    model = make_model()
+    learned = 0
+    scores = []
+    for train_idx, val_idx in TimeSeriesSplit(n_splits=n_splits).split(X):
+        end = train_idx[-1] + 1
+        model.partial_fit(X[learned:end], y[learned:end])
+        learned = end
+        scores.append(float(r2_scores(y[val_idx], model.predict(X[val_idx]))))
+    return scores
@@ -0,0 +1,150 @@
+"""Saved model bundles and a streaming batch predictor for the submission CSV.
+
+A :class:`ModelBundle` pickles everything the submission needs: the per-target
+scalers, both fitted models, their feature lists, and the dtypes the training
+features had. The predictor loads a bundle once, then reads the test file in
+chunks. Each chunk is scaled and predicted in one vectorized call per target,
+and its ``id,Y1,Y2`` rows are appended to the output straight away. Memory
+use is bounded by the chunk size, not the size of the test set::
+
+    python predict.py models/bundle.pkl data/test.csv ../submit/preds.csv
+
+A pickled :class:`multitarget.TwoTargetModel` works as a bundle too: the
+predictor only needs ``columns`` and ``predict``.
+
+Bundled features must be columns of the CSV itself. Derived features such as
+:mod:`features` produces are not recomputed here.
+"""
+
+import argparse
+import pickle
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+TARGETS = ("Y1", "Y2")
+
+
+@dataclass
+class ModelBundle:
+    """Everything needed to turn raw test rows into Y1/Y2 predictions.
+
+    Parameters
+    ----------
+    scaler_y1, model_y1
+        Fitted scaler and regressor for Y1
+    y1_features
+        Columns ``scaler_y1`` was fitted on, in order
+    scaler_y2, model_y2, y2_features
+        The same for Y2
+    dtypes
+        Training dtype per feature; float columns of each chunk are cast to
+        it so predictions match the in-notebook ones exactly
+    """
+
+    scaler_y1: Any
+    model_y1: Any
+    y1_features: List[str]
+    scaler_y2: Any
+    model_y2: Any
+    y2_features: List[str]
+    dtypes: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_training(cls, X: pd.DataFrame, scaler_y1, model_y1, y1_features, scaler_y2, model_y2, y2_features) -> "ModelBundle":
+        """Bundle fitted models, recording the dtypes of the training frame ``X``."""
+        columns = list(dict.fromkeys([*y1_features, *y2_features]))
+        return cls(
+            scaler_y1,
+            model_y1,
+            list(y1_features),
+            scaler_y2,
+            model_y2,
+            list(y2_features),
+            {name: str(X[name].dtype) for name in columns},
+        )
+
+    @property
+    def columns(self) -> List[str]:
+        """Every input column either model needs."""
+        return list(dict.fromkeys([*self.y1_features, *self.y2_features]))
+
+    def _prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        frame = df[self.columns]
+        casts = {
+            name: dtype
+            for name, dtype in self.dtypes.items()
+            if np.dtype(dtype).kind == "f" and frame[name].dtype != dtype
+        }
+        return frame.astype(casts) if casts else frame
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        """Predictions of shape (len(df), 2), Y1 then Y2."""
+        frame = self._prepare(df)
+        out = np.empty((len(frame), 2))
+        out[:, 0] = self.model_y1.predict(self.scaler_y1.transform(frame[self.y1_features]))
+        out[:, 1] = self.model_y2.predict(self.scaler_y2.transform(frame[self.y2_features]))
+        return out
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> "ModelBundle":
+        # not an isinstance check: run as a script, this module is __main__
+        # while the pickle refers to predict.ModelBundle
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+def predict_csv(
+    bundle: Any,
+    test_path: str,
+    out_path: str,
+    chunksize: int = 100_000,
+    id_column: str = "id",
+) -> int:
+    """Stream ``test_path`` through ``bundle`` and write ``id,Y1,Y2`` to ``out_path``.
+
+    ``bundle`` is a :class:`ModelBundle` or anything else with ``columns``
+    and an ``(n, 2)``-returning ``predict``.
+
+    Returns
+    -------
+    rows
+        Number of predictions written
+    """
+    usecols = [id_column, *(c for c in bundle.columns if c != id_column)]
+    rows = 0
+    with open(out_path, "w", newline="") as out:
+        out.write(",".join((id_column, *TARGETS)) + "\n")
+        for chunk in pd.read_csv(test_path, usecols=usecols, chunksize=chunksize):
+            preds = bundle.predict(chunk)
+            result = pd.DataFrame({id_column: chunk[id_column].to_numpy(), TARGETS[0]: preds[:, 0], TARGETS[1]: preds[:, 1]})
+            result.to_csv(out, header=False, index=False)
+            rows += len(chunk)
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Write Y1/Y2 predictions for a test CSV from a saved model bundle.")
+    parser.add_argument("bundle", help="bundle written by ModelBundle.save or TwoTargetModel.save")
+    parser.add_argument("test", help="test CSV with an id column and the bundled feature columns")
+    parser.add_argument("out", help="output CSV (id,Y1,Y2)")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--id-column", default="id")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    bundle = ModelBundle.load(args.bundle)
+    rows = predict_csv(bundle, args.test, args.out, args.chunksize, args.id_column)
+    print(f"{args.out}: {rows} rows in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+import cache
+from cache import FeatureCache, cached_features
+from features import DEFAULT_SPEC
+
+
+def test_feature_code_version_is_part_of_the_key(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(50, len(DEFAULT_SPEC.columns))).astype(np.float32), columns=list(DEFAULT_SPEC.columns))
+    store = FeatureCache(str(tmp_path))
+    computed = []
+    compute = cache.create_financial_features
+    monkeypatch.setattr(cache, "create_financial_features", lambda *args: computed.append(1) or compute(*args))
+
+    first = cached_features(df, store)
+    again = cached_features(df, store)
+    assert len(computed) == 1
+    pd.testing.assert_frame_equal(first, again)
+
+    monkeypatch.setattr(cache, "FEATURES_VERSION", cache.FEATURES_VERSION + 1)
+    cached_features(df, store)
+    assert len(computed) == 2
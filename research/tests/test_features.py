@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import DEFAULT_SPEC, StreamingFeatures, create_financial_features
+
+COLUMNS = list(DEFAULT_SPEC.columns)
+
+
+def pandas_features(df):
+    """The notebook's original create_financial_features."""
+    new_features_list = []
+    for feature in COLUMNS:
+        new_features_list.append(df[feature].shift(1).rename(f"{feature}_lag1"))
+        new_features_list.append(df[feature].shift(2).rename(f"{feature}_lag2"))
+        new_features_list.append(df[feature].shift(3).rename(f"{feature}_lag3"))
+        new_features_list.append((df[feature] / df[feature].shift(5) - 1).rename(f"{feature}_roc5"))
+        new_features_list.append((df[feature] / df[feature].shift(10) - 1).rename(f"{feature}_roc10"))
+        rolling_min = df[feature].rolling(window=10).min()
+        rolling_max = df[feature].rolling(window=10).max()
+        hl_range = rolling_max - rolling_min
+        regime = (df[feature] - rolling_min) / np.where(hl_range == 0, 1e-6, hl_range)
+        new_features_list.append(regime.rename(f"{feature}_regime"))
+        new_features_list.append((np.abs(regime - 0.5) * 2).rename(f"{feature}_regime_strength"))
+        ema_short = df[feature].ewm(span=5, adjust=False).mean()
+        ema_long = df[feature].ewm(span=10, adjust=False).mean()
+        macd = ema_short - ema_long
+        new_features_list.append(macd.rename(f"{feature}_macd"))
+        macd_signal = macd.ewm(span=3, adjust=False).mean()
+        new_features_list.append(macd_signal.rename(f"{feature}_macd_signal"))
+        new_features_list.append((macd - macd_signal).rename(f"{feature}_macd_hist"))
+    return pd.concat(new_features_list, axis=1)
+
+
+def frame(dtype, n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(n, len(COLUMNS))).cumsum(axis=0).astype(dtype), columns=COLUMNS)
+    df.iloc[50:53, 2] = np.nan  # NaNs inside the rolling window
+    df.iloc[100:120, 3] = 5.0  # flat range
+    df.iloc[200, 4] = 0.0  # rate of change through zero
+    df.iloc[150:160, 5] = 0.0
+    return df
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_streaming_batch_and_pandas_agree(dtype):
+    df = frame(dtype)
+    names = DEFAULT_SPEC.feature_names()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = pandas_features(df)[names]
+        batch = create_financial_features(df)[names]
+    streaming = StreamingFeatures(dtype=dtype).transform(df)
+
+    assert set(batch.dtypes) == set(streaming.dtypes) == {np.dtype(dtype)}
+    # pandas values rounded to the output precision, including the float64 families
+    np.testing.assert_array_equal(batch.to_numpy(), expected.to_numpy(dtype=np.float64).astype(dtype))
+    np.testing.assert_array_equal(streaming.to_numpy(), batch.to_numpy())
+    for name in names:
+        if expected[name].dtype == dtype:
+            np.testing.assert_array_equal(batch[name].to_numpy(), expected[name].to_numpy(), err_msg=name)
+
+
+def test_streaming_rejects_other_dtypes():
+    with pytest.raises(ValueError):
+        StreamingFeatures(dtype=np.float16)
@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from loader import load_csv
+
+
+def _write(path, df):
+    df.to_csv(path, index=False)
+
+
+def _load(path, cache_dir, capsys, **kwargs):
+    df = load_csv(str(path), cache_dir=str(cache_dir), **kwargs)
+    return df, capsys.readouterr().out
+
+
+def test_cache_is_reused_until_the_csv_changes(tmp_path, capsys):
+    path, cache_dir = tmp_path / "train.csv", tmp_path / "cache"
+    original = pd.DataFrame({"id": np.arange(500), "A": np.linspace(0.0, 1.0, 500), "tag": ["x", "y"] * 250})
+    _write(path, original)
+
+    first, out = _load(path, cache_dir, capsys, chunksize=128, sample_rows=100)
+    assert "from csv" in out
+    again, out = _load(path, cache_dir, capsys)
+    assert "from cache" in out
+    pd.testing.assert_frame_equal(first, again)
+    assert first["id"].dtype == np.uint16 and first["A"].dtype == np.float32
+    assert isinstance(first["tag"].dtype, pd.CategoricalDtype)
+
+    # new contents with a later mtime
+    changed = original.assign(A=original["A"][::-1].to_numpy())
+    _write(path, changed)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    reloaded, out = _load(path, cache_dir, capsys)
+    assert "from csv" in out
+    np.testing.assert_array_equal(reloaded["A"].to_numpy(), changed["A"].to_numpy(dtype=np.float32))
+
+    # a different size
+    _write(path, changed.iloc[:300])
+    reloaded, out = _load(path, cache_dir, capsys)
+    assert "from csv" in out and len(reloaded) == 300
+    _, out = _load(path, cache_dir, capsys)
+    assert "from cache" in out
+
+
+def test_a_later_chunk_widens_its_column(tmp_path, capsys):
+    path = tmp_path / "wide.csv"
+    ids = np.arange(1000)
+    ids[900] = 100_000  # beyond the uint8/uint16 range of the sampled rows
+    _write(path, pd.DataFrame({"id": ids}))
+    df, _ = _load(path, tmp_path / "cache", capsys, chunksize=100, sample_rows=50)
+    assert df["id"].dtype == np.uint32
+    np.testing.assert_array_equal(df["id"].to_numpy(), ids)
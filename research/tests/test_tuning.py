@@ -0,0 +1,20 @@
+import numpy as np
+import optuna
+import pandas as pd
+
+from tuning import tune
+
+
+def test_same_shape_different_data_starts_a_new_study(tmp_path):
+    storage = f"sqlite:///{tmp_path / 'optuna.db'}"
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(120, 3)), columns=["A", "B", "C"])
+    y = X["A"] * 2 + rng.normal(scale=0.1, size=len(X))
+
+    tune(X, y, "huber", n_trials=2, workers=1, storage=storage)
+    tune(X, y, "huber", n_trials=2, workers=1, storage=storage)  # resumes: nothing left to run
+    tune(X * 3, y, "huber", n_trials=2, workers=1, storage=storage)
+
+    studies = optuna.get_all_study_summaries(storage)
+    assert len(studies) == 2
+    assert sorted(study.n_trials for study in studies) == [2, 2]
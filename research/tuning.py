@@ -0,0 +1,260 @@
+"""Parallel Optuna tuning over cached, pre-scaled ``TimeSeriesSplit`` folds.
+
+The notebook's original objectives re-split the data and refit a
+``StandardScaler`` on every fold of every trial, and ran trials one at a
+time. Here the folds are split and scaled once by :func:`build_folds` and
+saved as ``.npy`` files. Worker processes memory-map those files, so every
+worker reads the same pages instead of holding its own copy of the folds.
+
+Trials run in ``workers`` processes that share one study in local SQLite.
+Rerunning :func:`tune` with the same study name resumes an interrupted
+search and only runs the trials still missing. Each fold's score is
+reported as an intermediate value, so the median pruner can stop a bad
+trial after its first fold.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from multiprocessing import Pool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import optuna
+from sklearn.linear_model import HuberRegressor
+from sklearn.metrics import r2_score
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.preprocessing import StandardScaler
+
+Fold = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+FOLD_PARTS = ("X_train", "y_train", "X_val", "y_val")
+
+
+def _as_array(data) -> np.ndarray:
+    return np.asarray(data.values if hasattr(data, "values") else data)
+
+
+def data_fingerprint(X, y) -> str:
+    """Hash of the shapes, dtypes and values of ``X`` and ``y``, as :func:`build_folds` reads them."""
+    h = hashlib.blake2b(digest_size=8)
+    for data in (X, y):
+        arr = _as_array(data)
+        if arr.dtype.kind not in "biufc":
+            arr = arr.astype(np.float64)  # what StandardScaler would fit on
+        h.update(f"{arr.dtype.str}{arr.shape}".encode())
+        h.update(np.ascontiguousarray(arr).view(np.uint8))
+    return h.hexdigest()
+
+
+def build_folds(X, y, directory: str, n_splits: int = 3) -> int:
+    """Split ``X``/``y`` with ``TimeSeriesSplit``, scale each fold once and save it.
+
+    The scaler is fitted on each fold's training rows only, exactly as the
+    per-trial code did.
+
+    Returns
+    -------
+    n_folds
+        Number of folds written to ``directory``
+    """
+    X_arr = _as_array(X)
+    y_arr = _as_array(y).ravel()
+    os.makedirs(directory, exist_ok=True)
+    for i, (train_idx, val_idx) in enumerate(TimeSeriesSplit(n_splits=n_splits).split(X_arr)):
+        scaler = StandardScaler()
+        parts = (
+            scaler.fit_transform(X_arr[train_idx]),
+            y_arr[train_idx],
+            scaler.transform(X_arr[val_idx]),
+            y_arr[val_idx],
+        )
+        for name, part in zip(FOLD_PARTS, parts):
+            np.save(os.path.join(directory, f"fold{i}_{name}.npy"), part)
+    return n_splits
+
+
+def load_folds(directory: str, n_folds: int) -> List[Fold]:
+    """Memory-map the folds written by :func:`build_folds`."""
+    return [
+        tuple(np.load(os.path.join(directory, f"fold{i}_{name}.npy"), mmap_mode="r") for name in FOLD_PARTS)
+        for i in range(n_folds)
+    ]
+
+
+# -- search spaces ---------------------------------------------------------------
+
+
+def huber_params(trial: optuna.Trial) -> Dict[str, Any]:
+    return {
+        "epsilon": trial.suggest_float("epsilon", 1, 10),
+        "alpha": trial.suggest_float("alpha", 1e-5, 30, log=True),
+        "max_iter": 1000,
+    }
+
+
+def fit_huber(params: Dict[str, Any], fold: Fold, n_threads: int):
+    X_train, y_train, _, _ = fold
+    return HuberRegressor(**params).fit(X_train, y_train)
+
+
+def xgb_params(trial: optuna.Trial) -> Dict[str, Any]:
+    return {
+        "n_estimators": trial.suggest_int("n_estimators", 100, 400),
+        "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.1, log=True),
+        "max_depth": trial.suggest_int("max_depth", 5, 12),
+        "subsample": trial.suggest_float("subsample", 0.5, 0.9),
+        "colsample_bytree": trial.suggest_float("colsample_bytree", 0.5, 1.0),
+        "min_child_weight": trial.suggest_int("min_child_weight", 1, 10),
+        "reg_alpha": trial.suggest_float("reg_alpha", 0.0, 10.0),
+        "reg_lambda": trial.suggest_float("reg_lambda", 0.0, 10.0),
+        "gamma": trial.suggest_float("gamma", 0.0, 5.0),
+    }
+
+
+def fit_xgb(params: Dict[str, Any], fold: Fold, n_threads: int):
+    import xgboost as xgb
+
+    X_train, y_train, X_val, y_val = fold
+    model = xgb.XGBRegressor(
+        **params,
+        eval_metric="rmse",
+        verbosity=0,
+        random_state=42,
+        early_stopping_rounds=50,
+        n_jobs=n_threads,
+    )
+    # the validation rows passed for early stopping must be scaled like the training rows
+    return model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+
+
+MODELS: Dict[str, Tuple[Callable[[optuna.Trial], Dict[str, Any]], Callable[..., Any]]] = {
+    "huber": (huber_params, fit_huber),
+    "xgb": (xgb_params, fit_xgb),
+}
+
+
+# -- study -----------------------------------------------------------------------
+
+
+def _storage(url: str):
+    if url.startswith("sqlite"):
+        # several processes write to the same file; wait for the lock instead of failing
+        return optuna.storages.RDBStorage(url, engine_kwargs={"connect_args": {"timeout": 60}})
+    return url
+
+
+def _pruner() -> optuna.pruners.BasePruner:
+    # one step per fold, so warm-up must be 0 for pruning to ever kick in
+    return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=0, interval_steps=1)
+
+
+def make_objective(model: str, folds: List[Fold], n_threads: int = 1) -> Callable[[optuna.Trial], float]:
+    """Objective maximising the mean validation R² over ``folds``."""
+    suggest, fit = MODELS[model]
+
+    def objective(trial: optuna.Trial) -> float:
+        params = suggest(trial)
+        scores = []
+        for step, fold in enumerate(folds):
+            estimator = fit(params, fold, n_threads)
+            scores.append(r2_score(fold[3], estimator.predict(fold[2])))
+            trial.report(scores[-1], step)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+        return float(np.mean(scores))
+
+    return objective
+
+
+def _run_worker(
+    model: str,
+    study_name: str,
+    storage: str,
+    fold_dir: str,
+    n_folds: int,
+    n_trials: int,
+    seed: int,
+    n_threads: int,
+) -> None:
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.load_study(
+        study_name=study_name,
+        storage=_storage(storage),
+        sampler=optuna.samplers.TPESampler(seed=seed),
+        pruner=_pruner(),
+    )
+    objective = make_objective(model, load_folds(fold_dir, n_folds), n_threads)
+    study.optimize(objective, n_trials=n_trials, gc_after_trial=True)
+
+
+def tune(
+    X,
+    y,
+    model: str,
+    n_trials: int = 30,
+    n_splits: int = 3,
+    workers: Optional[int] = None,
+    storage: str = "sqlite:///optuna.db",
+    study_name: Optional[str] = None,
+    fold_dir: Optional[str] = None,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    """Tune ``model`` on ``X``/``y`` and return the best parameters found.
+
+    Parameters
+    ----------
+    model
+        Key of ``MODELS``: ``"huber"`` or ``"xgb"``
+    n_trials
+        Total finished trials wanted in the study, counting earlier runs
+    workers
+        Worker processes; defaults to the number of CPUs
+    storage
+        Optuna storage URL shared by the workers
+    study_name
+        Defaults to one derived from the model, features, row count and
+        :func:`data_fingerprint`, so only a rerun on the same data resumes
+        the study. Pass a new name to start a fresh search on the same data.
+    fold_dir
+        Where the scaled folds are written; a temporary directory by default
+    seed
+        Worker ``i`` samples with ``TPESampler(seed=seed + i)``
+    """
+    workers = workers or os.cpu_count() or 1
+    if study_name is None:
+        columns = "-".join(map(str, getattr(X, "columns", [])))
+        study_name = f"{model}_{columns}_{len(X)}rows_{n_splits}folds_{data_fingerprint(X, y)}"
+    study = optuna.create_study(
+        study_name=study_name,
+        storage=_storage(storage),
+        direction="maximize",
+        load_if_exists=True,
+    )
+    finished = (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+    remaining = n_trials - len(study.get_trials(deepcopy=False, states=finished))
+
+    if remaining > 0:
+        temporary = fold_dir is None
+        fold_dir = tempfile.mkdtemp(prefix="folds-") if temporary else fold_dir
+        try:
+            n_folds = build_folds(X, y, fold_dir, n_splits)
+            workers = min(workers, remaining)
+            n_threads = max(1, (os.cpu_count() or 1) // workers)
+            shares = [remaining // workers + (i < remaining % workers) for i in range(workers)]
+            tasks = [
+                (model, study_name, storage, fold_dir, n_folds, share, seed + i, n_threads)
+                for i, share in enumerate(shares)
+            ]
+            if workers == 1:
+                _run_worker(*tasks[0])
+            else:
+                with Pool(workers) as pool:
+                    pool.starmap(_run_worker, tasks)
+        finally:
+            if temporary:
+                shutil.rmtree(fold_dir, ignore_errors=True)
+
+    pruned = len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.PRUNED,)))
+    print(f"{study_name}: best R2 {study.best_value:.5f} over {len(study.trials)} trials ({pruned} pruned)")
+    return study.best_params
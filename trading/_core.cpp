@@ -0,0 +1,521 @@
+/*
+ * CPython bindings for core.hpp.
+ *
+ * _core.OrderBook, _core.OrderRegistry and _core.WinProbModel mirror the
+ * pure-Python classes in orderbook.py, orders.py and winprob.py and are
+ * swapped in by those modules when this extension is built (see native.py).
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+#include <new>
+
+#include "core.hpp"
+
+namespace {
+
+PyObject *order_type = nullptr;  // records.Order
+
+// -- OrderBook ---------------------------------------------------------------
+
+struct OrderBookObject {
+  PyObject_HEAD
+  qc::OrderBook *book;
+};
+
+struct LevelsObject {
+  PyObject_HEAD
+  OrderBookObject *owner;
+  int is_bid;
+};
+
+extern PyTypeObject OrderBookType;
+extern PyTypeObject LevelsType;
+
+PyObject *OrderBook_new(PyTypeObject *type, PyObject *, PyObject *) {
+  auto *self = reinterpret_cast<OrderBookObject *>(type->tp_alloc(type, 0));
+  if (self == nullptr) return nullptr;
+  self->book = new (std::nothrow) qc::OrderBook();
+  if (self->book == nullptr) {
+    Py_DECREF(self);
+    return PyErr_NoMemory();
+  }
+  return reinterpret_cast<PyObject *>(self);
+}
+
+void OrderBook_dealloc(OrderBookObject *self) {
+  delete self->book;
+  Py_TYPE(self)->tp_free(reinterpret_cast<PyObject *>(self));
+}
+
+PyObject *OrderBook_clear(OrderBookObject *self, PyObject *) {
+  self->book->clear();
+  Py_RETURN_NONE;
+}
+
+PyObject *OrderBook_update(OrderBookObject *self, PyObject *const *args, Py_ssize_t nargs) {
+  if (nargs != 3) {
+    PyErr_Format(PyExc_TypeError, "update() takes 3 arguments (%zd given)", nargs);
+    return nullptr;
+  }
+  int is_bid = PyObject_IsTrue(args[0]);
+  double price = PyFloat_AsDouble(args[1]);
+  double quantity = PyFloat_AsDouble(args[2]);
+  if (is_bid < 0 || PyErr_Occurred()) return nullptr;
+  self->book->update(is_bid, price, quantity);
+  Py_RETURN_NONE;
+}
+
+// collect the (tick, quantity) levels of an iterable of (price, quantity) pairs
+int read_levels(PyObject *levels, std::vector<std::pair<int, double>> &out) {
+  PyObject *iter = PyObject_GetIter(levels);
+  if (iter == nullptr) return -1;
+  PyObject *item;
+  while ((item = PyIter_Next(iter)) != nullptr) {
+    PyObject *pair = PySequence_Fast(item, "snapshot levels must be (price, quantity) pairs");
+    Py_DECREF(item);
+    if (pair == nullptr) break;
+    if (PySequence_Fast_GET_SIZE(pair) != 2) {
+      PyErr_SetString(PyExc_ValueError, "snapshot levels must be (price, quantity) pairs");
+      Py_DECREF(pair);
+      break;
+    }
+    double price = PyFloat_AsDouble(PySequence_Fast_GET_ITEM(pair, 0));
+    double quantity = PyFloat_AsDouble(PySequence_Fast_GET_ITEM(pair, 1));
+    Py_DECREF(pair);
+    if (PyErr_Occurred()) break;
+    out.emplace_back(qc::to_tick(price), quantity);
+  }
+  Py_DECREF(iter);
+  return PyErr_Occurred() ? -1 : 0;
+}
+
+PyObject *OrderBook_load_snapshot(OrderBookObject *self, PyObject *const *args, Py_ssize_t nargs) {
+  if (nargs != 2) {
+    PyErr_Format(PyExc_TypeError, "load_snapshot() takes 2 arguments (%zd given)", nargs);
+    return nullptr;
+  }
+  std::vector<std::pair<int, double>> bids, asks;
+  if (read_levels(args[0], bids) < 0 || read_levels(args[1], asks) < 0) return nullptr;
+  return PyLong_FromLong(self->book->load_snapshot(bids, asks));
+}
+
+PyObject *OrderBook_best_bid(OrderBookObject *self, PyObject *) { return PyFloat_FromDouble(self->book->best_bid()); }
+PyObject *OrderBook_best_ask(OrderBookObject *self, PyObject *) { return PyFloat_FromDouble(self->book->best_ask()); }
+PyObject *OrderBook_has_bids(OrderBookObject *self, PyObject *) { return PyBool_FromLong(self->book->has_bids()); }
+PyObject *OrderBook_has_asks(OrderBookObject *self, PyObject *) { return PyBool_FromLong(self->book->has_asks()); }
+PyObject *OrderBook_is_two_sided(OrderBookObject *self, PyObject *) { return PyBool_FromLong(self->book->is_two_sided()); }
+PyObject *OrderBook_mid(OrderBookObject *self, PyObject *) { return PyFloat_FromDouble(self->book->mid()); }
+
+PyObject *levels_list(const qc::OrderBook *book, bool is_bid) {
+  std::vector<int> ticks = is_bid ? book->bid_ticks() : book->ask_ticks();
+  PyObject *out = PyList_New(static_cast<Py_ssize_t>(ticks.size()));
+  if (out == nullptr) return nullptr;
+  for (std::size_t i = 0; i < ticks.size(); ++i) {
+    int tick = ticks[i];
+    PyObject *level = Py_BuildValue("(dd)", qc::to_price(tick), is_bid ? book->bid_qty(tick) : book->ask_qty(tick));
+    if (level == nullptr) {
+      Py_DECREF(out);
+      return nullptr;
+    }
+    PyList_SET_ITEM(out, static_cast<Py_ssize_t>(i), level);
+  }
+  return out;
+}
+
+PyObject *OrderBook_bids(OrderBookObject *self, PyObject *) {
+  PyObject *levels = levels_list(self->book, true);
+  if (levels == nullptr) return nullptr;
+  PyObject *iter = PyObject_GetIter(levels);
+  Py_DECREF(levels);
+  return iter;
+}
+
+PyObject *OrderBook_asks(OrderBookObject *self, PyObject *) {
+  PyObject *levels = levels_list(self->book, false);
+  if (levels == nullptr) return nullptr;
+  PyObject *iter = PyObject_GetIter(levels);
+  Py_DECREF(levels);
+  return iter;
+}
+
+PyObject *OrderBook_get_best_bid_tick(OrderBookObject *self, void *) { return PyLong_FromLong(self->book->best_bid_tick()); }
+PyObject *OrderBook_get_best_ask_tick(OrderBookObject *self, void *) { return PyLong_FromLong(self->book->best_ask_tick()); }
+
+PyObject *make_levels(OrderBookObject *self, int is_bid) {
+  auto *levels = PyObject_New(LevelsObject, &LevelsType);
+  if (levels == nullptr) return nullptr;
+  Py_INCREF(self);
+  levels->owner = self;
+  levels->is_bid = is_bid;
+  return reinterpret_cast<PyObject *>(levels);
+}
+
+PyObject *OrderBook_get_bid_qty(OrderBookObject *self, void *) { return make_levels(self, 1); }
+PyObject *OrderBook_get_ask_qty(OrderBookObject *self, void *) { return make_levels(self, 0); }
+
+PyMethodDef OrderBook_methods[] = {
+    {"clear", reinterpret_cast<PyCFunction>(OrderBook_clear), METH_NOARGS, "Remove every level from both sides."},
+    {"update", reinterpret_cast<PyCFunction>(reinterpret_cast<void (*)(void)>(OrderBook_update)), METH_FASTCALL,
+     "update(is_bid, price, quantity)\n\nSet the resting quantity at price; a quantity <= 0 removes the level."},
+    {"load_snapshot", reinterpret_cast<PyCFunction>(reinterpret_cast<void (*)(void)>(OrderBook_load_snapshot)),
+     METH_FASTCALL, "load_snapshot(bids, asks) -> int\n\nMake the book match a snapshot, touching only the levels that differ;\nreturns how many levels changed."},
+    {"best_bid", reinterpret_cast<PyCFunction>(OrderBook_best_bid), METH_NOARGS, "Best bid price, or 0.0 when there are no bids."},
+    {"best_ask", reinterpret_cast<PyCFunction>(OrderBook_best_ask), METH_NOARGS, "Best ask price, or 100.0 when there are no asks."},
+    {"has_bids", reinterpret_cast<PyCFunction>(OrderBook_has_bids), METH_NOARGS, nullptr},
+    {"has_asks", reinterpret_cast<PyCFunction>(OrderBook_has_asks), METH_NOARGS, nullptr},
+    {"is_two_sided", reinterpret_cast<PyCFunction>(OrderBook_is_two_sided), METH_NOARGS,
+     "True when both sides of the book have at least one level."},
+    {"mid", reinterpret_cast<PyCFunction>(OrderBook_mid), METH_NOARGS, "Mid price of the top of book. Only meaningful when two-sided."},
+    {"bids", reinterpret_cast<PyCFunction>(OrderBook_bids), METH_NOARGS, "Iterate bid levels as (price, quantity), best (highest) first."},
+    {"asks", reinterpret_cast<PyCFunction>(OrderBook_asks), METH_NOARGS, "Iterate ask levels as (price, quantity), best (lowest) first."},
+    {nullptr, nullptr, 0, nullptr},
+};
+
+PyGetSetDef OrderBook_getset[] = {
+    {"best_bid_tick", reinterpret_cast<getter>(OrderBook_get_best_bid_tick), nullptr, nullptr, nullptr},
+    {"best_ask_tick", reinterpret_cast<getter>(OrderBook_get_best_ask_tick), nullptr, nullptr, nullptr},
+    {"bid_qty", reinterpret_cast<getter>(OrderBook_get_bid_qty), nullptr, "Read-only view of bid quantity by tick.", nullptr},
+    {"ask_qty", reinterpret_cast<getter>(OrderBook_get_ask_qty), nullptr, "Read-only view of ask quantity by tick.", nullptr},
+    {nullptr, nullptr, nullptr, nullptr, nullptr},
+};
+
+void Levels_dealloc(LevelsObject *self) {
+  Py_DECREF(self->owner);
+  PyObject_Free(self);
+}
+
+Py_ssize_t Levels_length(LevelsObject *) { return qc::NUM_TICKS; }
+
+PyObject *Levels_item(LevelsObject *self, Py_ssize_t tick) {
+  if (tick < 0 || tick >= qc::NUM_TICKS) {
+    PyErr_SetString(PyExc_IndexError, "tick out of range");
+    return nullptr;
+  }
+  const qc::OrderBook *book = self->owner->book;
+  return PyFloat_FromDouble(self->is_bid ? book->bid_qty(static_cast<int>(tick)) : book->ask_qty(static_cast<int>(tick)));
+}
+
+PySequenceMethods Levels_as_sequence = {
+    reinterpret_cast<lenfunc>(Levels_length),
+    nullptr,
+    nullptr,
+    reinterpret_cast<ssizeargfunc>(Levels_item),
+};
+
+// -- OrderRegistry -------------------------------------------------------------
+
+struct OrderRegistryObject {
+  PyObject_HEAD
+  qc::OrderRegistry *registry;
+  PyObject *sides[2];  // side object last seen per code, handed back on records.Order
+};
+
+extern PyTypeObject OrderRegistryType;
+
+// records.side_code: 0 for buy, 1 for sell, from a Side enum member or an int code
+int side_code(PyObject *side) {
+  long code;
+  if (PyLong_Check(side)) {
+    code = PyLong_AsLong(side);
+  } else {
+    PyObject *value = PyObject_GetAttrString(side, "value");
+    if (value == nullptr) return -1;
+    code = PyLong_AsLong(value);
+    Py_DECREF(value);
+  }
+  if (code == -1 && PyErr_Occurred()) return -1;
+  if (code != 0 && code != 1) {
+    PyErr_Format(PyExc_ValueError, "side code must be 0 or 1, got %ld", code);
+    return -1;
+  }
+  return static_cast<int>(code);
+}
+
+PyObject *make_order(OrderRegistryObject *self, const qc::Order &order) {
+  PyObject *side = self->sides[order.side];
+  return PyObject_CallFunction(order_type, "LOdidd", static_cast<long long>(order.order_id), side ? side : Py_None,
+                               order.price, order.tick, order.qty, order.placed_at_time);
+}
+
+PyObject *OrderRegistry_new(PyTypeObject *type, PyObject *, PyObject *) {
+  auto *self = reinterpret_cast<OrderRegistryObject *>(type->tp_alloc(type, 0));
+  if (self == nullptr) return nullptr;
+  self->registry = new (std::nothrow) qc::OrderRegistry();
+  if (self->registry == nullptr) {
+    Py_DECREF(self);
+    return PyErr_NoMemory();
+  }
+  return reinterpret_cast<PyObject *>(self);
+}
+
+void OrderRegistry_dealloc(OrderRegistryObject *self) {
+  delete self->registry;
+  Py_XDECREF(self->sides[0]);
+  Py_XDECREF(self->sides[1]);
+  Py_TYPE(self)->tp_free(reinterpret_cast<PyObject *>(self));
+}
+
+Py_ssize_t OrderRegistry_length(OrderRegistryObject *self) { return static_cast<Py_ssize_t>(self->registry->size()); }
+
+int OrderRegistry_contains(OrderRegistryObject *self, PyObject *key) {
+  long long order_id = PyLong_AsLongLong(key);
+  if (order_id == -1 && PyErr_Occurred()) {
+    PyErr_Clear();
+    return 0;
+  }
+  return self->registry->contains(order_id);
+}
+
+PyObject *ids_list(const std::vector<std::int64_t> &ids) {
+  PyObject *out = PyList_New(static_cast<Py_ssize_t>(ids.size()));
+  if (out == nullptr) return nullptr;
+  for (std::size_t i = 0; i < ids.size(); ++i) {
+    PyObject *id = PyLong_FromLongLong(ids[i]);
+    if (id == nullptr) {
+      Py_DECREF(out);
+      return nullptr;
+    }
+    PyList_SET_ITEM(out, static_cast<Py_ssize_t>(i), id);
+  }
+  return out;
+}
+
+PyObject *OrderRegistry_iter(OrderRegistryObject *self) {
+  PyObject *ids = ids_list(self->registry->ids());
+  if (ids == nullptr) return nullptr;
+  PyObject *iter = PyObject_GetIter(ids);
+  Py_DECREF(ids);
+  return iter;
+}
+
+PyObject *OrderRegistry_get(OrderRegistryObject *self, PyObject *arg) {
+  long long order_id = PyLong_AsLongLong(arg);
+  if (order_id == -1 && PyErr_Occurred()) return nullptr;
+  const qc::Order *order = self->registry->get(order_id);
+  if (order == nullptr) Py_RETURN_NONE;
+  return make_order(self, *order);
+}
+
+PyObject *OrderRegistry_count(OrderRegistryObject *self, PyObject *side) {
+  int code = side_code(side);
+  if (code < 0) return nullptr;
+  return PyLong_FromLong(self->registry->count(code));
+}
+
+PyObject *OrderRegistry_add(OrderRegistryObject *self, PyObject *const *args, Py_ssize_t nargs) {
+  if (nargs != 5) {
+    PyErr_Format(PyExc_TypeError, "add() takes 5 arguments (%zd given)", nargs);
+    return nullptr;
+  }
+  long long order_id = PyLong_AsLongLong(args[0]);
+  int code = side_code(args[1]);
+  double price = PyFloat_AsDouble(args[2]);
+  double qty = PyFloat_AsDouble(args[3]);
+  double placed_at_time = PyFloat_AsDouble(args[4]);
+  if (code < 0 || PyErr_Occurred()) return nullptr;
+  if (self->sides[code] != args[1]) {
+    Py_INCREF(args[1]);
+    Py_XSETREF(self->sides[code], args[1]);
+  }
+  return make_order(self, self->registry->add(order_id, code, price, qty, placed_at_time));
+}
+
+PyObject *OrderRegistry_remove(OrderRegistryObject *self, PyObject *arg) {
+  long long order_id = PyLong_AsLongLong(arg);
+  if (order_id == -1 && PyErr_Occurred()) return nullptr;
+  std::optional<qc::Order> order = self->registry->remove(order_id);
+  if (!order) Py_RETURN_NONE;
+  return make_order(self, *order);
+}
+
+PyObject *OrderRegistry_match_fill(OrderRegistryObject *self, PyObject *const *args, Py_ssize_t nargs) {
+  if (nargs != 3) {
+    PyErr_Format(PyExc_TypeError, "match_fill() takes 3 arguments (%zd given)", nargs);
+    return nullptr;
+  }
+  int code = side_code(args[0]);
+  double price = PyFloat_AsDouble(args[1]);
+  double quantity = PyFloat_AsDouble(args[2]);
+  if (code < 0 || PyErr_Occurred()) return nullptr;
+  std::optional<std::int64_t> order_id = self->registry->match_fill(code, price, quantity);
+  if (!order_id) Py_RETURN_NONE;
+  return PyLong_FromLongLong(*order_id);
+}
+
+PyObject *OrderRegistry_pop_expired(OrderRegistryObject *self, PyObject *const *args, Py_ssize_t nargs) {
+  if (nargs != 2) {
+    PyErr_Format(PyExc_TypeError, "pop_expired() takes 2 arguments (%zd given)", nargs);
+    return nullptr;
+  }
+  double now = PyFloat_AsDouble(args[0]);
+  double lifetime = PyFloat_AsDouble(args[1]);
+  if (PyErr_Occurred()) return nullptr;
+  return ids_list(self->registry->pop_expired(now, lifetime));
+}
+
+PyObject *OrderRegistry_clear(OrderRegistryObject *self, PyObject *) {
+  self->registry->clear();
+  Py_RETURN_NONE;
+}
+
+PyMethodDef OrderRegistry_methods[] = {
+    {"get", reinterpret_cast<PyCFunction>(OrderRegistry_get), METH_O, "Copy of an open order as a records.Order, or None."},
+    {"count", reinterpret_cast<PyCFunction>(OrderRegistry_count), METH_O, "Number of open orders on side."},
+    {"add", reinterpret_cast<PyCFunction>(reinterpret_cast<void (*)(void)>(OrderRegistry_add)), METH_FASTCALL,
+     "add(order_id, side, price, qty, placed_at_time)\n\nRegister a newly placed order, replacing any order with the same id."},
+    {"remove", reinterpret_cast<PyCFunction>(OrderRegistry_remove), METH_O,
+     "Forget an order (cancelled or fully filled) and return it, if it was open."},
+    {"match_fill", reinterpret_cast<PyCFunction>(reinterpret_cast<void (*)(void)>(OrderRegistry_match_fill)), METH_FASTCALL,
+     "match_fill(side, price, quantity)\n\nApply a fill to the oldest open order at price on side; return its id or None."},
+    {"pop_expired", reinterpret_cast<PyCFunction>(reinterpret_cast<void (*)(void)>(OrderRegistry_pop_expired)),
+     METH_FASTCALL, "pop_expired(now, lifetime)\n\nRemove and return the ids of orders older than lifetime at time now."},
+    {"clear", reinterpret_cast<PyCFunction>(OrderRegistry_clear), METH_NOARGS, nullptr},
+    {nullptr, nullptr, 0, nullptr},
+};
+
+PySequenceMethods OrderRegistry_as_sequence = {
+    reinterpret_cast<lenfunc>(OrderRegistry_length),
+    nullptr, nullptr, nullptr, nullptr, nullptr, nullptr,
+    reinterpret_cast<objobjproc>(OrderRegistry_contains),
+};
+
+// -- WinProbModel --------------------------------------------------------------
+
+struct WinProbModelObject {
+  PyObject_HEAD
+  qc::WinProbModel *model;
+};
+
+int WinProbModel_init(WinProbModelObject *self, PyObject *args, PyObject *kwargs) {
+  static const char *keywords[] = {"coef", "clip", "game_length", "max_score_diff", "time_step", "exact_below", nullptr};
+  std::array<double, 5> coef;
+  double low = 0.0, high = 1.0, game_length = 2880.0, time_step = 5.0, exact_below = 60.0;
+  int max_score_diff = 60;
+  if (!PyArg_ParseTupleAndKeywords(args, kwargs, "(ddddd)|(dd)didd", const_cast<char **>(keywords), &coef[0], &coef[1],
+                                   &coef[2], &coef[3], &coef[4], &low, &high, &game_length, &max_score_diff,
+                                   &time_step, &exact_below))
+    return -1;
+  delete self->model;
+  self->model = new (std::nothrow) qc::WinProbModel(coef, low, high, game_length, max_score_diff, time_step, exact_below);
+  if (self->model == nullptr) {
+    PyErr_NoMemory();
+    return -1;
+  }
+  return 0;
+}
+
+void WinProbModel_dealloc(WinProbModelObject *self) {
+  delete self->model;
+  Py_TYPE(self)->tp_free(reinterpret_cast<PyObject *>(self));
+}
+
+// __new__ without __init__ leaves no model to call into
+bool has_model(WinProbModelObject *self) {
+  if (self->model != nullptr) return true;
+  PyErr_SetString(PyExc_RuntimeError, "WinProbModel is not initialized");
+  return false;
+}
+
+// (score_diff, time_left, possession=0.5)
+int parse_state(PyObject *const *args, Py_ssize_t nargs, const char *name, double *state) {
+  if (nargs < 2 || nargs > 3) {
+    PyErr_Format(PyExc_TypeError, "%s() takes 2 or 3 arguments (%zd given)", name, nargs);
+    return -1;
+  }
+  state[2] = 0.5;
+  for (Py_ssize_t i = 0; i < nargs; ++i) state[i] = PyFloat_AsDouble(args[i]);
+  return PyErr_Occurred() ? -1 : 0;
+}
+
+PyObject *WinProbModel_prob(WinProbModelObject *self, PyObject *const *args, Py_ssize_t nargs) {
+  double state[3];
+  if (!has_model(self) || parse_state(args, nargs, "prob", state) < 0) return nullptr;
+  return PyFloat_FromDouble(self->model->prob(state[0], state[1], state[2]));
+}
+
+PyObject *WinProbModel_prob_exact(WinProbModelObject *self, PyObject *const *args, Py_ssize_t nargs) {
+  double state[3];
+  if (!has_model(self) || parse_state(args, nargs, "prob_exact", state) < 0) return nullptr;
+  return PyFloat_FromDouble(self->model->prob_exact(state[0], state[1], state[2]));
+}
+
+PyMethodDef WinProbModel_methods[] = {
+    {"prob", reinterpret_cast<PyCFunction>(reinterpret_cast<void (*)(void)>(WinProbModel_prob)), METH_FASTCALL,
+     "prob(score_diff, time_left, possession=0.5)\n\nWin probability of the home team, from the lookup table where possible."},
+    {"prob_exact", reinterpret_cast<PyCFunction>(reinterpret_cast<void (*)(void)>(WinProbModel_prob_exact)), METH_FASTCALL,
+     "prob_exact(score_diff, time_left, possession=0.5)"},
+    {nullptr, nullptr, 0, nullptr},
+};
+
+// -- types and module ------------------------------------------------------------
+
+PyTypeObject make_type(const char *name, Py_ssize_t size, const char *doc) {
+  PyTypeObject type = {PyVarObject_HEAD_INIT(nullptr, 0)};
+  type.tp_name = name;
+  type.tp_basicsize = size;
+  type.tp_flags = Py_TPFLAGS_DEFAULT;
+  type.tp_doc = doc;
+  return type;
+}
+
+PyTypeObject OrderBookType = make_type("_core.OrderBook", sizeof(OrderBookObject),
+                                       "Price-level order book with O(1) level updates and cached top of book.");
+PyTypeObject LevelsType = make_type("_core.Levels", sizeof(LevelsObject), "Read-only quantities of one book side by tick.");
+PyTypeObject OrderRegistryType = make_type("_core.OrderRegistry", sizeof(OrderRegistryObject),
+                                           "Open orders with per-side counts, a price index and an expiry heap.");
+PyTypeObject WinProbModelType = make_type("_core.WinProbModel", sizeof(WinProbModelObject),
+                                          "Logistic win-probability model with a precomputed lookup table.");
+
+PyModuleDef core_module = {
+    PyModuleDef_HEAD_INIT, "_core", "Native strategy core: order book, order registry and win-probability table.", -1,
+};
+
+int add_type(PyObject *module, PyTypeObject *type, const char *name) {
+  if (PyType_Ready(type) < 0) return -1;
+  Py_INCREF(type);
+  if (PyModule_AddObject(module, name, reinterpret_cast<PyObject *>(type)) < 0) {
+    Py_DECREF(type);
+    return -1;
+  }
+  return 0;
+}
+
+}  // namespace
+
+PyMODINIT_FUNC PyInit__core(void) {
+  OrderBookType.tp_new = OrderBook_new;
+  OrderBookType.tp_dealloc = reinterpret_cast<destructor>(OrderBook_dealloc);
+  OrderBookType.tp_methods = OrderBook_methods;
+  OrderBookType.tp_getset = OrderBook_getset;
+
+  LevelsType.tp_dealloc = reinterpret_cast<destructor>(Levels_dealloc);
+  LevelsType.tp_as_sequence = &Levels_as_sequence;
+
+  OrderRegistryType.tp_new = OrderRegistry_new;
+  OrderRegistryType.tp_dealloc = reinterpret_cast<destructor>(OrderRegistry_dealloc);
+  OrderRegistryType.tp_methods = OrderRegistry_methods;
+  OrderRegistryType.tp_as_sequence = &OrderRegistry_as_sequence;
+  OrderRegistryType.tp_iter = reinterpret_cast<getiterfunc>(OrderRegistry_iter);
+
+  WinProbModelType.tp_new = PyType_GenericNew;
+  WinProbModelType.tp_init = reinterpret_cast<initproc>(WinProbModel_init);
+  WinProbModelType.tp_dealloc = reinterpret_cast<destructor>(WinProbModel_dealloc);
+  WinProbModelType.tp_methods = WinProbModel_methods;
+
+  PyObject *records = PyImport_ImportModule("records");
+  if (records == nullptr) return nullptr;
+  order_type = PyObject_GetAttrString(records, "Order");
+  Py_DECREF(records);
+  if (order_type == nullptr) return nullptr;
+
+  PyObject *module = PyModule_Create(&core_module);
+  if (module == nullptr) return nullptr;
+  if (add_type(module, &OrderBookType, "OrderBook") < 0 || add_type(module, &LevelsType, "Levels") < 0 ||
+      add_type(module, &OrderRegistryType, "OrderRegistry") < 0 || add_type(module, &WinProbModelType, "WinProbModel") < 0) {
+    Py_DECREF(module);
+    return nullptr;
+  }
+  return module;
+}
@@ -0,0 +1,420 @@
+"""Deterministic event-replay backtester for the Strategy callbacks.
+
+A recorded game is a JSONL file with one exchange/game message per line::
+
+    {"type": "game_event", "event_type": "SCORE", "home_away": "home", "home_score": 2, ...}
+    {"type": "orderbook", "side": "BUY", "price": 51.5, "quantity": 10}
+    {"type": "snapshot", "bids": [[51.5, 10], ...], "asks": [[52.0, 4], ...]}
+    {"type": "trade", "side": "SELL", "price": 51.5, "quantity": 2}
+
+Game events carry the same twelve fields as ``Strategy.on_game_event_update``;
+missing optional fields default to ``None``.
+
+The :class:`Exchange` replaces the ``place_market_order``/``place_limit_order``/
+``cancel_order`` stubs of a strategy module and matches the strategy's orders
+against the recorded market with price-time priority:
+
+* incoming limit orders that cross the recorded book take liquidity level by
+  level at the resting prices, and the remainder rests unless ``ioc``;
+* market orders walk the opposite side of the recorded book;
+* resting orders fill at their own price when a recorded trade prints at or
+  through them on their side (an aggressive SELL hits our bids, an aggressive
+  BUY lifts our offers), or when the recorded book moves through them, level
+  by level until it no longer crosses them.
+
+The exchange also rebinds the module's ``clock`` to replay time: the game
+seconds played as of the last game event. Message budgets and re-quote
+coalescing then depend only on the recording, not on how fast it replays.
+
+Other participants never see our orders, so queue position at equal prices is
+not modelled. Fills are queued and delivered through ``on_account_update``
+once the callback that caused them has returned, as the live exchange does.
+
+Usage::
+
+    python backtest.py template.py games/*.jsonl
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from itertools import count
+from types import ModuleType
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from orderbook import MAX_TICK, MIN_TICK, NO_ASK, NO_BID, OrderBook, to_tick
+from records import GameEvent
+
+GAME_EVENT, ORDERBOOK, SNAPSHOT, TRADE = range(4)
+BUY, SELL = 0, 1
+
+GAME_EVENT_FIELDS = (
+    "event_type",
+    "home_away",
+    "home_score",
+    "away_score",
+    "player_name",
+    "substituted_player_name",
+    "shot_type",
+    "assist_player",
+    "rebound_type",
+    "coordinate_x",
+    "coordinate_y",
+    "time_seconds",
+)
+
+_SIDE_CODES = {"BUY": BUY, "SELL": SELL, "buy": BUY, "sell": SELL, 0: BUY, 1: SELL}
+
+_module_ids = count()
+
+
+def _parse_record(rec: dict) -> tuple:
+    kind = rec["type"]
+    if kind == "orderbook":
+        return (ORDERBOOK, _SIDE_CODES[rec["side"]], float(rec["quantity"]), float(rec["price"]))
+    if kind == "trade":
+        return (TRADE, _SIDE_CODES[rec["side"]], float(rec["quantity"]), float(rec["price"]))
+    if kind == "game_event":
+        return (GAME_EVENT, GameEvent(*(rec.get(name) for name in GAME_EVENT_FIELDS)))
+    if kind == "snapshot":
+        bids = tuple((float(p), float(q)) for p, q in rec["bids"])
+        asks = tuple((float(p), float(q)) for p, q in rec["asks"])
+        return (SNAPSHOT, bids, asks)
+    raise ValueError(f"unknown event type: {kind!r}")
+
+
+def load_events(path: str) -> List[tuple]:
+    """Parse a recorded game into compact event tuples ready for replay.
+
+    Parameters
+    ----------
+    path
+        Path to a JSONL game recording, or a ``.qcr`` capture written by
+        :class:`recorder.Recorder`
+
+    Returns
+    -------
+    events
+        List of tuples whose first element is one of ``GAME_EVENT``,
+        ``ORDERBOOK``, ``SNAPSHOT`` or ``TRADE``; game events are carried as
+        :class:`records.GameEvent`
+    """
+    if path.endswith(".qcr"):
+        from recorder import read_events
+
+        return read_events(path)
+    with open(path) as f:
+        return [_parse_record(json.loads(line)) for line in f if line.strip()]
+
+
+def load_strategy_module(path: str) -> ModuleType:
+    """Import a strategy file as a fresh, private module.
+
+    Every call returns a new module object, so the order functions bound into
+    it by :meth:`Exchange.bind` never leak between independent replays.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    name = f"_strategy_{os.path.splitext(os.path.basename(path))[0]}_{next(_module_ids)}"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@dataclass
+class BacktestResult:
+    pnl: float
+    position: float
+    capital: float
+    settlement: float
+    fills: int
+    filled_qty: float
+    orders_placed: int
+    orders_cancelled: int
+    events: int
+    elapsed_sec: float
+
+
+class Exchange:
+    """Local matching engine standing in for the live exchange.
+
+    Parameters
+    ----------
+    initial_capital
+        Cash the account starts with
+    """
+
+    def __init__(self, initial_capital: float = 100_000.0) -> None:
+        self.initial_capital = initial_capital
+        self.capital = initial_capital
+        self.position = 0.0
+        self.book = OrderBook()  # recorded liquidity from the other participants
+        self.orders: Dict[int, list] = {}  # order_id -> [side, tick, remaining]
+        self.resting: Tuple[Dict[int, Deque[int]], Dict[int, Deque[int]]] = ({}, {})
+        self.pending_fills: Deque[Tuple[int, float, float, float]] = deque()
+        self.next_order_id = 1
+        self.fills = 0
+        self.filled_qty = 0.0
+        self.orders_placed = 0
+        self.orders_cancelled = 0
+        self.now = 0.0
+        self.start_time: Optional[float] = None  # first positive game clock seen
+
+    def bind(self, module: ModuleType) -> None:
+        """Route a strategy module's order functions and clock to this exchange."""
+        module.place_market_order = self.place_market_order
+        module.place_limit_order = self.place_limit_order
+        module.cancel_order = self.cancel_order
+        module.clock = self.clock
+
+    def clock(self) -> float:
+        """Replay time: game seconds played as of the last game event."""
+        return self.now
+
+    def _advance(self, time_left: Optional[float]) -> None:
+        if time_left is None:
+            return
+        if self.start_time is None:
+            if time_left <= 0:
+                return
+            self.start_time = time_left
+        self.now = max(self.now, self.start_time - time_left)
+
+    # -- order entry ---------------------------------------------------------
+
+    def place_market_order(self, side, ticker, quantity: float) -> None:
+        if quantity <= 0:
+            return
+        self.orders_placed += 1
+        code = side.value
+        self._take(code, quantity, MAX_TICK if code == BUY else MIN_TICK)
+
+    def place_limit_order(self, side, ticker, quantity: float, price: float, ioc: bool = False) -> int:
+        tick = to_tick(price)
+        if quantity <= 0 or tick < MIN_TICK or tick > MAX_TICK:
+            return 0
+        self.orders_placed += 1
+        order_id = self.next_order_id
+        self.next_order_id += 1
+        code = side.value
+        remaining = self._take(code, quantity, tick)
+        if remaining > 0 and not ioc:
+            self.orders[order_id] = [code, tick, remaining]
+            level = self.resting[code].get(tick)
+            if level is None:
+                level = self.resting[code][tick] = deque()
+            level.append(order_id)
+        return order_id
+
+    def cancel_order(self, ticker, order_id: int) -> bool:
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return False
+        self.orders_cancelled += 1
+        self._unlink(order_id, order[0], order[1])
+        return True
+
+    # -- matching ------------------------------------------------------------
+
+    def _fill(self, code: int, price: float, quantity: float) -> None:
+        if code == BUY:
+            self.position += quantity
+            self.capital -= price * quantity
+        else:
+            self.position -= quantity
+            self.capital += price * quantity
+        self.fills += 1
+        self.filled_qty += quantity
+        self.pending_fills.append((code, price, quantity, self.capital))
+
+    def _take(self, code: int, quantity: float, limit_tick: int) -> float:
+        """Take recorded liquidity up to ``limit_tick``; return the unfilled quantity."""
+        book = self.book
+        if code == BUY:
+            levels = book.ask_qty
+            while quantity > 0 and book.best_ask_tick <= limit_tick and book.best_ask_tick != NO_ASK:
+                tick = book.best_ask_tick
+                traded = min(quantity, levels[tick])
+                self._fill(BUY, tick / 100, traded)
+                book.update(False, tick / 100, levels[tick] - traded)
+                quantity -= traded
+        else:
+            levels = book.bid_qty
+            while quantity > 0 and book.best_bid_tick >= limit_tick and book.best_bid_tick != NO_BID:
+                tick = book.best_bid_tick
+                traded = min(quantity, levels[tick])
+                self._fill(SELL, tick / 100, traded)
+                book.update(True, tick / 100, levels[tick] - traded)
+                quantity -= traded
+        return quantity
+
+    def _unlink(self, order_id: int, code: int, tick: int) -> None:
+        level = self.resting[code][tick]
+        level.remove(order_id)
+        if not level:
+            del self.resting[code][tick]
+
+    def _fill_resting(self, code: int, through_tick: int, quantity: float) -> float:
+        """Fill our resting orders priced at or through ``through_tick``.
+
+        Orders are visited best price first and oldest first within a price.
+        Returns the quantity left over once our orders are exhausted.
+        """
+        levels = self.resting[code]
+        if code == BUY:
+            ticks = sorted((t for t in levels if t >= through_tick), reverse=True)
+        else:
+            ticks = sorted(t for t in levels if t <= through_tick)
+        for tick in ticks:
+            level = levels[tick]
+            while level and quantity > 0:
+                order_id = level[0]
+                order = self.orders[order_id]
+                traded = min(quantity, order[2])
+                self._fill(code, tick / 100, traded)
+                quantity -= traded
+                order[2] -= traded
+                if order[2] <= 0:
+                    level.popleft()
+                    del self.orders[order_id]
+            if not level:
+                del levels[tick]
+            if quantity <= 0:
+                break
+        return quantity
+
+    def _cross_book(self) -> None:
+        """Fill resting orders that the recorded book has moved through."""
+        book = self.book
+        while self.resting[BUY] and book.best_ask_tick != NO_ASK:
+            tick = book.best_ask_tick
+            if max(self.resting[BUY]) < tick:
+                break
+            left = self._fill_resting(BUY, tick, book.ask_qty[tick])
+            book.update(False, tick / 100, left)
+            if left > 0:  # our bids at or above this level are used up
+                break
+        while self.resting[SELL] and book.best_bid_tick != NO_BID:
+            tick = book.best_bid_tick
+            if min(self.resting[SELL]) > tick:
+                break
+            left = self._fill_resting(SELL, tick, book.bid_qty[tick])
+            book.update(True, tick / 100, left)
+            if left > 0:
+                break
+
+    # -- replay --------------------------------------------------------------
+
+    def run(self, module: ModuleType, strategy, events: Sequence[tuple]) -> BacktestResult:
+        """Replay ``events`` into ``strategy`` and settle the final position.
+
+        Parameters
+        ----------
+        module
+            Strategy module, used for its ``Side`` and ``Ticker`` enums
+        strategy
+            Strategy instance whose module has been bound to this exchange
+        events
+            Events as returned by :func:`load_events`
+        """
+        sides = (module.Side.BUY, module.Side.SELL)
+        ticker = module.Ticker.TEAM_A
+        book = self.book
+        pending = self.pending_fills
+        home_score = away_score = 0
+        start = time.perf_counter()
+
+        for event in events:
+            kind = event[0]
+            if kind == ORDERBOOK:
+                _, code, quantity, price = event
+                book.update(code == BUY, price, quantity)
+                if quantity > 0 and (self.resting[BUY] or self.resting[SELL]):
+                    self._cross_book()
+                strategy.on_orderbook_update(ticker, sides[code], quantity, price)
+            elif kind == TRADE:
+                _, code, quantity, price = event
+                # the aggressor's side says whose quotes the print took
+                passive = SELL if code == BUY else BUY
+                if self.resting[passive]:
+                    self._fill_resting(passive, to_tick(price), quantity)
+                strategy.on_trade_update(ticker, sides[code], quantity, price)
+            elif kind == GAME_EVENT:
+                game_event = event[1]
+                home_score, away_score = game_event.home_score, game_event.away_score
+                self._advance(game_event.time)
+                strategy.on_game_event_update(*game_event.args())
+            else:
+                _, bids, asks = event
+                book.load_snapshot(bids, asks)
+                self._cross_book()
+                strategy.on_orderbook_snapshot(ticker, list(bids), list(asks))
+
+            while pending:
+                code, price, quantity, capital = pending.popleft()
+                strategy.on_account_update(ticker, sides[code], price, quantity, capital)
+
+        elapsed = time.perf_counter() - start
+        settlement = 100.0 if home_score > away_score else 0.0
+        return BacktestResult(
+            pnl=self.capital - self.initial_capital + self.position * settlement,
+            position=self.position,
+            capital=self.capital,
+            settlement=settlement,
+            fills=self.fills,
+            filled_qty=self.filled_qty,
+            orders_placed=self.orders_placed,
+            orders_cancelled=self.orders_cancelled,
+            events=len(events),
+            elapsed_sec=elapsed,
+        )
+
+
+def run_backtest(
+    module: ModuleType,
+    events: Sequence[tuple],
+    strategy_factory: Optional[Callable[[], object]] = None,
+    initial_capital: float = 100_000.0,
+) -> BacktestResult:
+    """Replay one game through a fresh exchange and strategy instance.
+
+    Parameters
+    ----------
+    module
+        Strategy module, typically from :func:`load_strategy_module`
+    events
+        Events as returned by :func:`load_events`
+    strategy_factory
+        Callable building the strategy; defaults to ``module.Strategy``
+    initial_capital
+        Cash the simulated account starts with
+    """
+    exchange = Exchange(initial_capital)
+    exchange.bind(module)
+    strategy = (strategy_factory or module.Strategy)()
+    return exchange.run(module, strategy, events)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded games through a strategy.")
+    parser.add_argument("strategy", help="path to the strategy file, e.g. template.py")
+    parser.add_argument("games", nargs="+", help="recorded game files (JSONL)")
+    args = parser.parse_args(argv)
+
+    module = load_strategy_module(args.strategy)
+    for path in args.games:
+        result = run_backtest(module, load_events(path))
+        # strategies print to stdout, keep the results on their own stream
+        print(json.dumps({"game": path, **asdict(result)}), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
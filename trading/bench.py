@@ -0,0 +1,450 @@
+"""Reproducible benchmarks for the strategy callbacks.
+
+Every input comes from seeded generators, so two runs with the same seed feed
+byte-identical event streams:
+
+* :func:`book_deltas`: ``on_orderbook_update`` traffic on a book holding
+  ``depth`` levels per side, with the top of book drifting;
+* :func:`snapshots`: full ``depth``-level books, each a small perturbation
+  of the last;
+* :func:`play_by_play`: a game's worth of ``on_game_event_update`` calls;
+* :func:`game_stream`: all of the above interleaved into one game, with one
+  play-by-play event per ``book_per_event`` book updates.
+
+Each case is run on a fresh strategy instance whose module's order functions
+are stubbed out. Three figures are recorded per case, next to its ``calls``:
+
+``ns_per_call``
+    Best of ``repeat`` timed runs, divided by the number of calls
+``net_blocks_per_call``
+    Change in allocated Python memory blocks over the run, per call. This
+    is a leak detector, not an allocation count: it measures state that
+    survives the run, and it can be slightly negative when a run frees more
+    than it keeps
+``peak_kib``
+    Peak traced memory during the run, from ``tracemalloc``
+
+Results are keyed ``<strategy>/<case>/<parameter>`` and can be saved as a
+JSON baseline, then compared against one::
+
+    python bench.py --save baseline.json
+    python bench.py --compare baseline.json --threshold 0.15
+
+A case regresses when its ``ns_per_call`` or ``peak_kib`` exceeds the
+baseline by more than ``threshold``, or when its ``net_blocks_per_call``
+grows by more than :data:`LEAK_TOLERANCE` (plus :data:`BLOCK_SLACK` blocks
+over the run). Compare mode then exits with status 1. Baselines are only
+meaningful on the machine (and ``QC_NATIVE`` setting) that wrote them.
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tracemalloc
+from time import monotonic, perf_counter_ns
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from backtest import GAME_EVENT, ORDERBOOK, SNAPSHOT, TRADE, BUY, SELL, Exchange, load_strategy_module
+from records import GameEvent
+
+STRATEGIES = ("template.py", "woodytest.py")
+DEPTHS = (10, 100, 1000)
+BOOK_PER_EVENT = (5, 50)
+HOT_PATHS = ("evaluate_and_trade", "trade")
+LEAK_TOLERANCE = 0.01  # allowed growth of net_blocks_per_call over the baseline
+BLOCK_SLACK = 64  # blocks per run allowed on top, for caches warmed during short cases
+PEAK_SLACK_KIB = 16.0  # tracemalloc noise allowed on top of the relative peak_kib threshold
+
+Levels = Tuple[Tuple[float, float], ...]
+
+# -- generators ---------------------------------------------------------------
+
+
+def book_deltas(seed: int, n: int, depth: int, mid_tick: int = 5000) -> List[Tuple[int, float, float]]:
+    """``n`` orderbook updates ``(side code, quantity, price)`` on a ``depth``-level book.
+
+    The first ``2 * depth`` updates build the book. After that, updates
+    resize or empty random levels within ``depth`` ticks of the touch, and
+    about one in twenty moves the mid by a tick.
+    """
+    rng = random.Random(seed)
+    out: List[Tuple[int, float, float]] = []
+    for i in range(depth):
+        out.append((BUY, float(rng.randint(1, 50)), (mid_tick - 1 - i) / 100))
+        out.append((SELL, float(rng.randint(1, 50)), (mid_tick + 1 + i) / 100))
+    while len(out) < n:
+        if rng.random() < 0.05:
+            mid_tick = min(max(mid_tick + rng.choice((-1, 1)), depth + 2), 9997 - depth)
+        code = BUY if rng.random() < 0.5 else SELL
+        offset = 1 + min(int(rng.expovariate(3.0 / depth)), depth - 1)
+        tick = mid_tick - offset if code == BUY else mid_tick + offset
+        quantity = 0.0 if rng.random() < 0.2 else float(rng.randint(1, 50))
+        out.append((code, quantity, tick / 100))
+    return out[:n]
+
+
+def snapshots(seed: int, n: int, depth: int, mid_tick: int = 5000) -> List[Tuple[Levels, Levels]]:
+    """``n`` consecutive ``(bids, asks)`` snapshots of ``depth`` levels per side.
+
+    Between snapshots a few levels change size and the mid occasionally
+    moves by a tick, as in a periodic snapshot of a quiet market.
+    """
+    rng = random.Random(seed)
+    bid_qty = [float(rng.randint(1, 50)) for _ in range(depth)]
+    ask_qty = [float(rng.randint(1, 50)) for _ in range(depth)]
+    out = []
+    for _ in range(n):
+        if rng.random() < 0.1:
+            mid_tick = min(max(mid_tick + rng.choice((-1, 1)), depth + 2), 9997 - depth)
+        for _ in range(max(1, depth // 20)):
+            levels = bid_qty if rng.random() < 0.5 else ask_qty
+            levels[rng.randrange(depth)] = float(rng.randint(1, 50))
+        bids = tuple(((mid_tick - 1 - i) / 100, bid_qty[i]) for i in range(depth))
+        asks = tuple(((mid_tick + 1 + i) / 100, ask_qty[i]) for i in range(depth))
+        out.append((bids, asks))
+    return out
+
+
+_EVENT_WEIGHTS = (
+    ("SCORE", 30),
+    ("MISSED", 25),
+    ("REBOUND", 25),
+    ("FOUL", 8),
+    ("TURNOVER", 6),
+    ("STEAL", 3),
+    ("SUBSTITUTION", 5),
+    ("TIMEOUT", 1),
+    ("BLOCK", 2),
+)
+_SHOTS = (("THREE_POINT", 3), ("TWO_POINT", 2), ("LAYUP", 2), ("DUNK", 2), ("FREE_THROW", 1))
+
+
+def play_by_play(seed: int, n: int, game_length: float = 2880.0) -> List[GameEvent]:
+    """``n`` play-by-play events spread evenly over a game, without ``END_GAME``."""
+    rng = random.Random(seed)
+    types = [name for name, _ in _EVENT_WEIGHTS]
+    weights = [weight for _, weight in _EVENT_WEIGHTS]
+    home = away = 0
+    out = []
+    for i in range(n):
+        event_type = rng.choices(types, weights)[0]
+        team = "home" if rng.random() < 0.5 else "away"
+        shot = None
+        if event_type in ("SCORE", "MISSED"):
+            shot, points = _SHOTS[rng.randrange(len(_SHOTS))]
+            if event_type == "SCORE":
+                if team == "home":
+                    home += points
+                else:
+                    away += points
+        player = f"player_{team}_{rng.randint(1, 12)}"
+        time_left = game_length * (1.0 - (i + 1) / (n + 1))
+        out.append(
+            GameEvent(
+                event_type,
+                team,
+                home,
+                away,
+                player,
+                f"player_{team}_{rng.randint(1, 12)}" if event_type == "SUBSTITUTION" else None,
+                shot,
+                None,
+                "DEFENSIVE" if event_type == "REBOUND" else None,
+                rng.uniform(-25, 25) if shot else None,
+                rng.uniform(0, 47) if shot else None,
+                time_left,
+            )
+        )
+    return out
+
+
+def game_stream(seed: int, n_events: int, depth: int, book_per_event: int) -> List[tuple]:
+    """A whole game as backtest event tuples, ending in ``END_GAME``.
+
+    Each play-by-play event is followed by ``book_per_event`` book updates,
+    one trade print per ten updates, and a snapshot every 100 updates.
+    """
+    rng = random.Random(seed)
+    pbp = play_by_play(seed, n_events)
+    deltas = book_deltas(seed + 1, 2 * depth + n_events * book_per_event, depth)
+    books = snapshots(seed + 2, max(1, len(deltas) // 100), depth)
+    out: List[tuple] = [(SNAPSHOT, *books[0])]
+    updates = iter(deltas[2 * depth:])
+    count = 0
+    for event in pbp:
+        out.append((GAME_EVENT, event))
+        for _ in range(book_per_event):
+            code, quantity, price = next(updates)
+            out.append((ORDERBOOK, code, quantity, price))
+            count += 1
+            if count % 10 == 0:
+                out.append((TRADE, rng.choice((BUY, SELL)), float(rng.randint(1, 5)), price))
+            if count % 100 == 0:
+                out.append((SNAPSHOT, *books[(count // 100) % len(books)]))
+    last = pbp[-1]
+    out.append((GAME_EVENT, GameEvent("END_GAME", "unknown", last.home_score, last.away_score, time_seconds=0.0)))
+    return out
+
+
+# -- harness ---------------------------------------------------------------------
+
+
+class _StubExchange:
+    """Order entry that accepts everything and never fills."""
+
+    def __init__(self) -> None:
+        self.next_order_id = 0
+
+    bind = Exchange.bind
+    clock = staticmethod(monotonic)
+
+    def place_market_order(self, side, ticker, quantity) -> None:
+        return None
+
+    def place_limit_order(self, side, ticker, quantity, price, ioc=False) -> int:
+        self.next_order_id += 1
+        return self.next_order_id
+
+    def cancel_order(self, ticker, order_id) -> bool:
+        return True
+
+
+def _new_strategy(module: ModuleType, exchange: Any = None) -> Any:
+    (exchange or _StubExchange()).bind(module)
+    params = module.StrategyParams()
+    if hasattr(params, "max_messages_per_sec"):
+        params.max_messages_per_sec = None  # the callback cases never advance a replay clock
+    return module.Strategy(params)
+
+
+# A case builds a fresh strategy and returns (callable, argument tuples, units),
+# where units is what the total time is divided by.
+Setup = Callable[[ModuleType], Tuple[Callable, List[tuple], int]]
+
+
+def _primed(module: ModuleType, depth: int, seed: int) -> Any:
+    """Fresh strategy with a ``depth``-level book and a game in progress."""
+    strategy = _new_strategy(module)
+    bids, asks = snapshots(seed, 1, depth)[0]
+    strategy.on_orderbook_snapshot(module.Ticker.TEAM_A, list(bids), list(asks))
+    for event in play_by_play(seed, 20)[:10]:
+        strategy.on_game_event_update(*event.args())
+    return strategy
+
+
+def orderbook_case(n: int, depth: int, seed: int) -> Setup:
+    deltas = book_deltas(seed, n + 2 * depth, depth)
+
+    def setup(module: ModuleType):
+        strategy = _primed(module, depth, seed)
+        ticker, sides = module.Ticker.TEAM_A, (module.Side.BUY, module.Side.SELL)
+        calls = [(ticker, sides[code], q, p) for code, q, p in deltas[2 * depth:]]
+        return strategy.on_orderbook_update, calls, len(calls)
+
+    return setup
+
+
+def snapshot_case(n: int, depth: int, seed: int) -> Setup:
+    books = snapshots(seed, n, depth)
+
+    def setup(module: ModuleType):
+        strategy = _primed(module, depth, seed)
+        ticker = module.Ticker.TEAM_A
+        return strategy.on_orderbook_snapshot, [(ticker, list(bids), list(asks)) for bids, asks in books], len(books)
+
+    return setup
+
+
+def game_event_case(n: int, depth: int, seed: int) -> Setup:
+    events = [event.args() for event in play_by_play(seed, n)]
+
+    def setup(module: ModuleType):
+        strategy = _primed(module, depth, seed)
+        return strategy.on_game_event_update, events, len(events)
+
+    return setup
+
+
+def hot_path_case(n: int, depth: int, seed: int) -> Setup:
+    """The strategy's evaluation (``evaluate_and_trade`` or ``trade``) on its own."""
+
+    def setup(module: ModuleType):
+        strategy = _primed(module, depth, seed)
+        name = next(name for name in HOT_PATHS if hasattr(strategy, name))
+        return getattr(strategy, name), [()] * n, n
+
+    return setup
+
+
+def game_case(n: int, depth: int, seed: int, book_per_event: int) -> Setup:
+    """A whole replayed game through the backtest exchange; ns per event."""
+    events = game_stream(seed, max(1, n // (book_per_event + 1)), depth, book_per_event)
+
+    def setup(module: ModuleType):
+        exchange = Exchange()
+        strategy = _new_strategy(module, exchange)
+        # one call replays every event
+        return lambda: exchange.run(module, strategy, events), [()], len(events)
+
+    return setup
+
+
+def measure(module: ModuleType, setup: Setup, repeat: int) -> Dict[str, float]:
+    """Time ``setup``'s calls ``repeat`` times on fresh strategies, then trace one more run."""
+
+    best = float("inf")
+    for _ in range(repeat):
+        fn, calls, units = setup(module)
+        gc.collect()
+        start = perf_counter_ns()
+        for args in calls:
+            fn(*args)
+        best = min(best, perf_counter_ns() - start)
+
+    fn, calls, units = setup(module)
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    for args in calls:
+        fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+    return {
+        "ns_per_call": round(best / units, 1),
+        "net_blocks_per_call": round((sys.getallocatedblocks() - blocks) / units, 3),
+        "peak_kib": round(peak / 1024, 1),
+        "calls": units,
+    }
+
+
+def cases(n: int, depths: Sequence[int], book_per_event: Sequence[int], seed: int) -> Dict[str, Setup]:
+    out: Dict[str, Setup] = {}
+    for depth in depths:
+        out[f"orderbook_update/depth={depth}"] = orderbook_case(n, depth, seed)
+        out[f"orderbook_snapshot/depth={depth}"] = snapshot_case(max(1, n // depth), depth, seed)
+        out[f"hot_path/depth={depth}"] = hot_path_case(n, depth, seed)
+    out["game_event_update/events"] = game_event_case(min(n, 2000), 10, seed)
+    for rate in book_per_event:
+        out[f"game/book_per_event={rate}"] = game_case(n, 100, seed, rate)
+    return out
+
+
+def run(
+    strategies: Sequence[str] = STRATEGIES,
+    depths: Sequence[int] = DEPTHS,
+    book_per_event: Sequence[int] = BOOK_PER_EVENT,
+    n: int = 20000,
+    repeat: int = 3,
+    seed: int = 0,
+) -> Dict[str, Dict[str, float]]:
+    """Benchmark every case for every strategy file; keys are ``<strategy>/<case>``."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    suite = cases(n, depths, book_per_event, seed)
+    results = {}
+    for path in strategies:
+        module = load_strategy_module(path if os.path.isabs(path) else os.path.join(here, path))
+        for name, setup in suite.items():
+            results[f"{os.path.basename(path)}/{name}"] = measure(module, setup, repeat)
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    from native import core
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "native_core": core is not None,
+        "log_level": os.environ.get("QC_LOG_LEVEL", "INFO"),
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float
+) -> List[Tuple[str, str, float, float, float]]:
+    """Figures that grew beyond what the baseline allows.
+
+    ``ns_per_call`` and ``peak_kib`` may grow by ``threshold`` (a fraction,
+    with ``peak_kib`` also allowed :data:`PEAK_SLACK_KIB` of noise).
+    ``net_blocks_per_call`` is near zero and can change sign, so it is
+    compared by absolute growth against :data:`LEAK_TOLERANCE`, plus
+    :data:`BLOCK_SLACK` spread over the case's calls.
+
+    Returns
+    -------
+    regressions
+        ``(case, figure, baseline, current, change)`` per regressed figure;
+        ``change`` is relative for the first two figures and absolute for
+        ``net_blocks_per_call``
+    """
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        before, after = reference["ns_per_call"], current["ns_per_call"]
+        if after > before * (1.0 + threshold):
+            regressions.append((key, "ns_per_call", before, after, after / before - 1.0))
+        before, after = reference.get("peak_kib"), current["peak_kib"]
+        if before is not None and after > before * (1.0 + threshold) + PEAK_SLACK_KIB:
+            regressions.append((key, "peak_kib", before, after, after / before - 1.0 if before else math.inf))
+        before, after = reference.get("net_blocks_per_call"), current["net_blocks_per_call"]
+        if before is not None and after - before > LEAK_TOLERANCE + BLOCK_SLACK / current["calls"]:
+            regressions.append((key, "net_blocks_per_call", before, after, after - before))
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the strategy callbacks on seeded synthetic streams.")
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES))
+    parser.add_argument("--depths", nargs="+", type=int, default=list(DEPTHS))
+    parser.add_argument("--book-per-event", nargs="+", type=int, default=list(BOOK_PER_EVENT),
+                        help="book updates per play-by-play event in the whole-game cases")
+    parser.add_argument("-n", type=int, default=20000, help="calls per case")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", help="JSON baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed ns/call and peak memory growth, as a fraction")
+    args = parser.parse_args(argv)
+
+    # the shared event log is configured on first use; keep its I/O out of the timings
+    os.environ.setdefault("QC_LOG_LEVEL", "OFF")
+    results = run(args.strategies, args.depths, args.book_per_event, args.n, args.repeat, args.seed)
+
+    width = max(len(key) for key in results)
+    for key, result in results.items():
+        print(f"{key:<{width}}  {result['ns_per_call']:>12,.1f} ns  {result['net_blocks_per_call']:>8.3f} blk  "
+              f"{result['peak_kib']:>9,.1f} KiB")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"environment": environment(), "seed": args.seed, "n": args.n, "results": results}, f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if (baseline["seed"], baseline["n"]) != (args.seed, args.n):
+            # other streams, so the per-call figures are not comparable
+            parser.error(f"{args.compare} was recorded with --seed {baseline['seed']} -n {baseline['n']}")
+        regressions = compare(results, baseline["results"], args.threshold)
+        for key, figure, before, after, change in regressions:
+            shown = f"{change:+.3f}" if figure == "net_blocks_per_call" else f"{change:+.0%}"
+            print(f"REGRESSION {key} {figure}: {before:,.3f} -> {after:,.3f} ({shown})")
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
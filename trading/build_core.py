@@ -0,0 +1,33 @@
+"""Build the native strategy core next to the strategy files.
+
+Usage::
+
+    python build_core.py            # same as: build_ext --inplace
+
+Compiles ``_core.cpp`` (CPython bindings for ``core.hpp``) into ``_core``. The
+strategies work without it; see :mod:`native`.
+"""
+
+import os
+import sys
+
+from setuptools import Extension, setup
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+if __name__ == "__main__":
+    os.chdir(HERE)
+    setup(
+        name="qc-core",
+        ext_modules=[
+            Extension(
+                "_core",
+                ["_core.cpp"],
+                depends=["core.hpp"],
+                language="c++",
+                # no FMA contraction, so probabilities match winprob.py bit for bit
+                extra_compile_args=["-std=c++17", "-O2", "-ffp-contract=off"],
+            )
+        ],
+        script_args=sys.argv[1:] or ["build_ext", "--inplace"],
+    )
@@ -0,0 +1,392 @@
+/*
+ * Quant Challenge 2025
+ *
+ * Strategy core shared by template.hpp and the Python strategies.
+ *
+ * Header-only C++17 versions of the structures in orderbook.py, orders.py and
+ * winprob.py, with the same semantics:
+ *
+ *  - OrderBook: per-side quantity arrays indexed by 0.01 tick, a bitmap of
+ *    populated ticks and a cached top of book.
+ *  - OrderRegistry: our open orders with per-side counts, a FIFO index per
+ *    price level and an expiry heap with lazy deletion.
+ *  - WinProbModel: the logistic win-probability model with its lookup table.
+ *
+ * _core.cpp exposes these to Python; the pure-Python modules remain the
+ * fallback when the extension is not built.
+ */
+
+#pragma once
+
+#include <algorithm>
+#include <array>
+#include <cmath>
+#include <cstdint>
+#include <deque>
+#include <optional>
+#include <queue>
+#include <unordered_map>
+#include <utility>
+#include <vector>
+
+namespace qc {
+
+constexpr int MIN_TICK = 1;     // 0.01
+constexpr int MAX_TICK = 9999;  // 99.99
+constexpr int NUM_TICKS = MAX_TICK + 1;
+constexpr int NO_BID = 0;
+constexpr int NO_ASK = MAX_TICK + 1;
+
+// Python's round() rounds half to even, as does nearbyint in the default mode
+inline int to_tick(double price) { return static_cast<int>(std::nearbyint(price * 100)); }
+inline double to_price(int tick) { return tick / 100.0; }
+
+class OrderBook {
+public:
+  OrderBook() { clear(); }
+
+  void clear() {
+    bid_qty_.fill(0.0);
+    ask_qty_.fill(0.0);
+    bid_bits_.fill(0);
+    ask_bits_.fill(0);
+    best_bid_tick_ = NO_BID;
+    best_ask_tick_ = NO_ASK;
+  }
+
+  /** Set the resting quantity at price; a quantity <= 0 removes the level. */
+  void update(bool is_bid, double price, double quantity) {
+    int tick = to_tick(price);
+    if (tick < MIN_TICK || tick > MAX_TICK) return;
+    if (is_bid) set_bid(tick, quantity);
+    else set_ask(tick, quantity);
+  }
+
+  void set_bid(int tick, double quantity) {
+    bool had_level = bid_qty_[tick] > 0;
+    if (quantity > 0) {
+      bid_qty_[tick] = quantity;
+      if (!had_level) {
+        set_bit(bid_bits_, tick);
+        if (tick > best_bid_tick_) best_bid_tick_ = tick;
+      }
+    } else if (had_level) {
+      bid_qty_[tick] = 0.0;
+      clear_bit(bid_bits_, tick);
+      if (tick == best_bid_tick_) best_bid_tick_ = highest_below(bid_bits_, tick);
+    }
+  }
+
+  void set_ask(int tick, double quantity) {
+    bool had_level = ask_qty_[tick] > 0;
+    if (quantity > 0) {
+      ask_qty_[tick] = quantity;
+      if (!had_level) {
+        set_bit(ask_bits_, tick);
+        if (tick < best_ask_tick_) best_ask_tick_ = tick;
+      }
+    } else if (had_level) {
+      ask_qty_[tick] = 0.0;
+      clear_bit(ask_bits_, tick);
+      if (tick == best_ask_tick_) best_ask_tick_ = lowest_above(ask_bits_, tick);
+    }
+  }
+
+  /**
+   * Make the book match a snapshot of (tick, quantity) levels, touching only the
+   * levels that differ. Returns how many levels were added, resized or removed.
+   */
+  int load_snapshot(const std::vector<std::pair<int, double>> &bids,
+                    const std::vector<std::pair<int, double>> &asks) {
+    return reconcile(true, bids) + reconcile(false, asks);
+  }
+
+  int best_bid_tick() const { return best_bid_tick_; }
+  int best_ask_tick() const { return best_ask_tick_; }
+  double best_bid() const { return best_bid_tick_ / 100.0; }
+  double best_ask() const { return best_ask_tick_ / 100.0; }
+  bool has_bids() const { return best_bid_tick_ != NO_BID; }
+  bool has_asks() const { return best_ask_tick_ != NO_ASK; }
+  bool is_two_sided() const { return has_bids() && has_asks(); }
+  double mid() const { return (best_bid_tick_ + best_ask_tick_) / 200.0; }
+  double bid_qty(int tick) const { return bid_qty_[tick]; }
+  double ask_qty(int tick) const { return ask_qty_[tick]; }
+
+  /** Populated bid ticks, best (highest) first. */
+  std::vector<int> bid_ticks() const {
+    std::vector<int> out;
+    for (int tick = best_bid_tick_; tick != NO_BID; tick = highest_below(bid_bits_, tick)) out.push_back(tick);
+    return out;
+  }
+
+  /** Populated ask ticks, best (lowest) first. */
+  std::vector<int> ask_ticks() const {
+    std::vector<int> out;
+    for (int tick = best_ask_tick_; tick != NO_ASK; tick = lowest_above(ask_bits_, tick)) out.push_back(tick);
+    return out;
+  }
+
+private:
+  static constexpr int WORDS = (NUM_TICKS + 63) / 64;
+  using Bits = std::array<std::uint64_t, WORDS>;
+
+  static void set_bit(Bits &bits, int tick) { bits[tick >> 6] |= std::uint64_t{1} << (tick & 63); }
+  static void clear_bit(Bits &bits, int tick) { bits[tick >> 6] &= ~(std::uint64_t{1} << (tick & 63)); }
+
+  int reconcile(bool is_bid, const std::vector<std::pair<int, double>> &levels) {
+    const auto &qty = is_bid ? bid_qty_ : ask_qty_;
+    Bits seen{};
+    int drift = 0;
+    for (const auto &[tick, quantity] : levels) {
+      if (tick < MIN_TICK || tick > MAX_TICK || !(quantity > 0)) continue;
+      set_bit(seen, tick);
+      if (qty[tick] != quantity) {
+        if (is_bid) set_bid(tick, quantity);
+        else set_ask(tick, quantity);
+        ++drift;
+      }
+    }
+    // populated levels the snapshot does not list
+    const Bits &bits = is_bid ? bid_bits_ : ask_bits_;
+    for (int w = 0; w < WORDS; ++w) {
+      std::uint64_t stale = bits[w] & ~seen[w];
+      while (stale) {
+        int tick = (w << 6) + __builtin_ctzll(stale);
+        stale &= stale - 1;
+        if (is_bid) set_bid(tick, 0.0);
+        else set_ask(tick, 0.0);
+        ++drift;
+      }
+    }
+    return drift;
+  }
+
+  // highest populated tick strictly below `tick`, or NO_BID
+  static int highest_below(const Bits &bits, int tick) {
+    int w = tick >> 6;
+    std::uint64_t word = bits[w] & ((std::uint64_t{1} << (tick & 63)) - 1);
+    while (true) {
+      if (word) return (w << 6) + 63 - __builtin_clzll(word);
+      if (--w < 0) return NO_BID;
+      word = bits[w];
+    }
+  }
+
+  // lowest populated tick strictly above `tick`, or NO_ASK
+  static int lowest_above(const Bits &bits, int tick) {
+    int w = tick >> 6;
+    int b = tick & 63;
+    std::uint64_t word = b == 63 ? 0 : bits[w] & (~std::uint64_t{0} << (b + 1));
+    while (true) {
+      if (word) return (w << 6) + __builtin_ctzll(word);
+      if (++w >= WORDS) return NO_ASK;
+      word = bits[w];
+    }
+  }
+
+  std::array<double, NUM_TICKS> bid_qty_;
+  std::array<double, NUM_TICKS> ask_qty_;
+  Bits bid_bits_;
+  Bits ask_bits_;
+  int best_bid_tick_;
+  int best_ask_tick_;
+};
+
+struct Order {
+  std::int64_t order_id;
+  int side;  // 0 buy, 1 sell
+  int tick;
+  double price;
+  double qty;
+  double placed_at_time;
+  std::uint64_t seq;  // distinguishes re-added ids in the expiry heap
+};
+
+class OrderRegistry {
+public:
+  std::size_t size() const { return orders_.size(); }
+  bool contains(std::int64_t order_id) const { return orders_.count(order_id) != 0; }
+  int count(int side) const { return counts_[side]; }
+
+  const Order *get(std::int64_t order_id) const {
+    auto it = orders_.find(order_id);
+    return it == orders_.end() ? nullptr : &it->second;
+  }
+
+  std::vector<std::int64_t> ids() const {
+    std::vector<std::int64_t> out;
+    out.reserve(orders_.size());
+    for (const auto &entry : orders_) out.push_back(entry.first);
+    return out;
+  }
+
+  /** Register a newly placed order, replacing any order with the same id. */
+  const Order &add(std::int64_t order_id, int side, double price, double qty, double placed_at_time) {
+    remove(order_id);
+    Order order{order_id, side, to_tick(price), price, qty, placed_at_time, next_seq_++};
+    by_price_[key(side, order.tick)].push_back(order_id);
+    expiry_.push(Expiry{placed_at_time, order.seq, order_id});
+    counts_[side] += 1;
+    return orders_.emplace(order_id, order).first->second;
+  }
+
+  /** Forget an order (cancelled or fully filled), returning it if it was open. */
+  std::optional<Order> remove(std::int64_t order_id) {
+    auto it = orders_.find(order_id);
+    if (it == orders_.end()) return std::nullopt;
+    Order order = it->second;
+    orders_.erase(it);
+    counts_[order.side] -= 1;
+    auto level = by_price_.find(key(order.side, order.tick));
+    auto &ids = level->second;
+    ids.erase(std::find(ids.begin(), ids.end(), order_id));
+    if (ids.empty()) by_price_.erase(level);
+    return order;
+  }
+
+  /** Apply a fill to the oldest open order at price on side; returns its id. */
+  std::optional<std::int64_t> match_fill(int side, double price, double quantity) {
+    auto level = by_price_.find(key(side, to_tick(price)));
+    if (level == by_price_.end() || level->second.empty()) return std::nullopt;
+    std::int64_t order_id = level->second.front();
+    Order &order = orders_.at(order_id);
+    order.qty -= quantity;
+    if (order.qty <= 0) remove(order_id);
+    return order_id;
+  }
+
+  /** Remove and return the ids of orders older than lifetime at time now. */
+  std::vector<std::int64_t> pop_expired(double now, double lifetime) {
+    std::vector<std::int64_t> expired;
+    double cutoff = now - lifetime;
+    while (!expiry_.empty() && expiry_.top().placed_at_time < cutoff) {
+      Expiry entry = expiry_.top();
+      expiry_.pop();
+      auto it = orders_.find(entry.order_id);
+      if (it != orders_.end() && it->second.seq == entry.seq) {
+        remove(entry.order_id);
+        expired.push_back(entry.order_id);
+      }
+    }
+    return expired;
+  }
+
+  void clear() {
+    orders_.clear();
+    counts_ = {0, 0};
+    by_price_.clear();
+    expiry_ = {};
+  }
+
+private:
+  struct Expiry {
+    double placed_at_time;
+    std::uint64_t seq;
+    std::int64_t order_id;
+    bool operator>(const Expiry &other) const {
+      return placed_at_time != other.placed_at_time ? placed_at_time > other.placed_at_time : seq > other.seq;
+    }
+  };
+
+  static std::int64_t key(int side, int tick) {
+    return (static_cast<std::int64_t>(side) << 32) | static_cast<std::uint32_t>(tick);
+  }
+
+  std::unordered_map<std::int64_t, Order> orders_;
+  std::array<int, 2> counts_{0, 0};
+  std::unordered_map<std::int64_t, std::deque<std::int64_t>> by_price_;
+  std::priority_queue<Expiry, std::vector<Expiry>, std::greater<Expiry>> expiry_;
+  std::uint64_t next_seq_ = 0;
+};
+
+/**
+ * logit = c0 + c1*S + c2*S*(t/game_length) + c3*S/max(1, t) + c4*P, evaluated in
+ * the same order as winprob.py so both give bit-identical probabilities.
+ */
+class WinProbModel {
+public:
+  WinProbModel(std::array<double, 5> coef, double clip_low = 0.0, double clip_high = 1.0,
+               double game_length = 2880.0, int max_score_diff = 60, double time_step = 5.0,
+               double exact_below = 60.0)
+      : coef_(coef), low_(clip_low), high_(clip_high), game_length_(game_length),
+        max_score_diff_(max_score_diff), time_step_(time_step), exact_below_(exact_below),
+        n_scores_(2 * max_score_diff + 1),
+        n_times_(static_cast<int>(std::ceil(game_length / time_step)) + 1) {
+    build_table();
+  }
+
+  /** sigmoid(0.5 + 0.4 * S / t), clipped to [0.01, 0.99], as template.py uses. */
+  static WinProbModel template_preset() { return WinProbModel({0.5, 0.0, 0.0, 0.4, 0.0}, 0.01, 0.99); }
+
+  double game_length() const { return game_length_; }
+
+  double logit(double score_diff, double time_left, double possession = 0.5) const {
+    return coef_[0] + coef_[1] * score_diff + coef_[2] * score_diff * (time_left / game_length_) +
+           coef_[3] * score_diff / std::max(1.0, time_left) + coef_[4] * possession;
+  }
+
+  double prob_exact(double score_diff, double time_left, double possession = 0.5) const {
+    double z = logit(score_diff, time_left, possession);
+    double p;
+    if (z >= 0) {
+      p = 1.0 / (1.0 + std::exp(-z));
+    } else {
+      double e = std::exp(z);
+      p = e / (1.0 + e);
+    }
+    return clip(p);
+  }
+
+  /**
+   * Win probability of the home team, from the lookup table where possible. Times
+   * below exact_below, NaN or infinite use prob_exact, as winprob.py does.
+   */
+  double prob(double score_diff, double time_left, double possession = 0.5) const {
+    int p = possession == 0.0 ? 0 : possession == 0.5 ? 1 : possession == 1.0 ? 2 : -1;
+    double s = score_diff + max_score_diff_;
+    // NaN and infinite times have no table row; the negated test also sends NaN there
+    if (!(time_left >= exact_below_ && std::isfinite(time_left)) || p < 0 || s < 0 || s >= n_scores_ ||
+        s != std::floor(s))
+      return prob_exact(score_diff, time_left, possession);
+    double x = time_left / time_step_;
+    int i = static_cast<int>(x);
+    if (i >= n_times_ - 1) {
+      i = n_times_ - 2;
+      x = i + 1.0;
+    }
+    std::size_t base = (static_cast<std::size_t>(p) * n_scores_ + static_cast<std::size_t>(s)) * n_times_ + i;
+    double lo = table_[base];
+    return lo + (table_[base + 1] - lo) * (x - i);
+  }
+
+private:
+  double clip(double p) const { return p < low_ ? low_ : p > high_ ? high_ : p; }
+
+  void build_table() {
+    std::vector<double> slopes(n_times_);
+    for (int i = 0; i < n_times_; ++i) {
+      double t = i * time_step_;
+      slopes[i] = coef_[1] + coef_[2] * (t / game_length_) + coef_[3] / std::max(1.0, t);
+    }
+    table_.reserve(static_cast<std::size_t>(3) * n_scores_ * n_times_);
+    for (double possession : {0.0, 0.5, 1.0}) {
+      double offset = coef_[0] + coef_[4] * possession;
+      for (int s = -max_score_diff_; s <= max_score_diff_; ++s) {
+        for (double slope : slopes) {
+          double z = offset + slope * s;
+          double p = z >= 0 ? 1.0 / (1.0 + std::exp(-z)) : 1.0 - 1.0 / (1.0 + std::exp(z));
+          table_.push_back(clip(p));
+        }
+      }
+    }
+  }
+
+  std::array<double, 5> coef_;
+  double low_, high_, game_length_;
+  int max_score_diff_;
+  double time_step_, exact_below_;
+  int n_scores_, n_times_;
+  std::vector<double> table_;
+};
+
+}  // namespace qc
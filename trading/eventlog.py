@@ -0,0 +1,174 @@
+"""Non-blocking structured event log for the trading callbacks.
+
+Callbacks append a small tuple to a preallocated ring buffer and return; a
+daemon writer thread drains the buffer in batches and does all formatting and
+I/O. Producers claim a slot under a short lock, so callbacks running on
+several threads (see :mod:`host`) cannot overwrite each other's records; the
+writer only advances the tail and needs no lock against them. If the writer
+falls behind and the ring fills up, new records are dropped and counted
+instead of blocking.
+
+Configuration for the shared process-wide log comes from the environment:
+
+``QC_LOG_LEVEL``
+    DEBUG, INFO (default), WARNING, ERROR or OFF
+``QC_LOG_PATH``
+    File to append to; defaults to stdout
+``QC_LOG_FORMAT``
+    ``text`` (default, one readable line per record) or ``jsonl``
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, List, Optional, TextIO
+
+DEBUG, INFO, WARNING, ERROR, OFF = 10, 20, 30, 40, 100
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+LEVELS["OFF"] = OFF
+
+
+class EventLog:
+    """Ring-buffered event log with a background batch writer.
+
+    Parameters
+    ----------
+    path
+        File to append records to; None writes to the current ``sys.stdout``
+    level
+        Records below this level are discarded at the call site
+    capacity
+        Ring buffer size, rounded up to a power of two
+    flush_interval
+        Seconds the writer sleeps between batches
+    fmt
+        ``"text"`` or ``"jsonl"``
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        level: int = INFO,
+        capacity: int = 1 << 16,
+        flush_interval: float = 0.05,
+        fmt: str = "text",
+    ) -> None:
+        if fmt not in ("text", "jsonl"):
+            raise ValueError(f"unknown log format: {fmt!r}")
+        size = 1 << max(0, capacity - 1).bit_length()
+        self.level = level
+        self.fmt = fmt
+        self.flush_interval = flush_interval
+        self.dropped = 0  # only ever incremented by a producer holding _produce_lock
+        self._reported_dropped = 0
+        self._ring: List[Optional[tuple]] = [None] * size
+        self._mask = size - 1
+        self._head = 0  # next slot to write, only advanced under _produce_lock
+        self._tail = 0  # next slot to read, only advanced by the writer
+        self._file: Optional[TextIO] = open(path, "a") if path else None
+        self._produce_lock = threading.Lock()  # callbacks may log from several threads
+        self._drain_lock = threading.Lock()  # flush() may race the writer thread
+        self._wake = threading.Event()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="eventlog-writer", daemon=True)
+        self._writer.start()
+
+    # -- producer side ------------------------------------------------------
+
+    def log(self, level: int, kind: str, **fields: Any) -> None:
+        """Append a record of type ``kind`` with ``fields`` if ``level`` passes."""
+        if level < self.level:
+            return
+        record = (time.monotonic_ns(), level, kind, fields)
+        with self._produce_lock:
+            head = self._head
+            if head - self._tail > self._mask:
+                self.dropped += 1
+                return
+            self._ring[head & self._mask] = record
+            self._head = head + 1
+
+    def debug(self, kind: str, **fields: Any) -> None:
+        self.log(DEBUG, kind, **fields)
+
+    def info(self, kind: str, **fields: Any) -> None:
+        self.log(INFO, kind, **fields)
+
+    def warning(self, kind: str, **fields: Any) -> None:
+        self.log(WARNING, kind, **fields)
+
+    def error(self, kind: str, **fields: Any) -> None:
+        self.log(ERROR, kind, **fields)
+
+    # -- writer side --------------------------------------------------------
+
+    def _format(self, record: tuple) -> str:
+        ts, level, kind, fields = record
+        if self.fmt == "jsonl":
+            return json.dumps({"t": ts, "level": LEVEL_NAMES[level], "event": kind, **fields}, default=str)
+        return " ".join([kind, *(f"{key}={value}" for key, value in fields.items())])
+
+    def _drain(self) -> None:
+        with self._drain_lock:
+            self._drain_locked()
+
+    def _drain_locked(self) -> None:
+        head = self._head
+        tail = self._tail
+        if head == tail and self.dropped == self._reported_dropped:
+            return
+        ring, mask = self._ring, self._mask
+        lines = []
+        for i in range(tail, head):
+            lines.append(self._format(ring[i & mask]))
+            ring[i & mask] = None
+        self._tail = head
+        dropped = self.dropped
+        if dropped != self._reported_dropped:
+            count = dropped - self._reported_dropped
+            self._reported_dropped = dropped
+            lines.append(self._format((time.monotonic_ns(), WARNING, "log_dropped", {"count": count})))
+        out = self._file or sys.stdout
+        out.write("\n".join(lines) + "\n")
+        out.flush()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._drain()
+
+    def flush(self) -> None:
+        """Write out everything logged so far from the calling thread."""
+        self._drain()
+
+    def close(self) -> None:
+        """Stop the writer thread and write any remaining records."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._writer.join()
+        self._drain()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+_default_log: Optional[EventLog] = None
+
+
+def get_log() -> EventLog:
+    """Process-wide log shared by every strategy instance, configured from the environment."""
+    global _default_log
+    if _default_log is None:
+        _default_log = EventLog(
+            path=os.environ.get("QC_LOG_PATH") or None,
+            level=LEVELS[os.environ.get("QC_LOG_LEVEL", "INFO").upper()],
+            fmt=os.environ.get("QC_LOG_FORMAT", "text"),
+        )
+        atexit.register(_default_log.close)
+    return _default_log
@@ -0,0 +1,224 @@
+"""Incrementally kept game state with a fixed-layout feature vector.
+
+:class:`GameState` folds each play-by-play event into running per-team
+totals: possession, the current scoring run, shots attempted and made by
+shot type, fouls, timeouts and the number of possessions. Each event touches
+a handful of counters and rewrites only the features they feed, so reading
+the state never rescans the game.
+
+``GameState.features`` is an ``array('d')`` with the layout given by the
+index constants below; ``FEATURE_NAMES`` names every slot. Per-team features
+take two slots, home then away, so team ``t`` (a :class:`records.TeamCode`
+value) lives at ``FOULS + t``. Shooting percentages take one slot per team
+and :class:`records.ShotCode`, at ``SHOT_PCT + t * NUM_SHOTS + shot``; the
+``ShotCode.NONE`` slot counts every shot, including misses the feed sends
+without a shot type. A percentage reads 0.0 until the team's first attempt.
+"""
+
+from array import array
+from typing import List, Optional, Tuple
+
+from records import EventCode, ShotCode, TeamCode
+
+HOME = TeamCode.HOME.value
+AWAY = TeamCode.AWAY.value
+UNKNOWN = TeamCode.UNKNOWN.value
+
+NUM_SHOTS = len(ShotCode)
+
+SCORE_DIFF = 0  # home minus away
+TIME_LEFT = 1  # game seconds remaining at the last event
+POSSESSION = 2  # 1.0 home, 0.0 away, 0.5 unknown, as winprob expects
+RUN = 3  # points of the current scoring run, positive for home
+POSSESSIONS = 4  # possession changes so far
+PACE = 5  # possession changes per minute played
+FOULS = 6  # + team
+PERIOD_FOULS = 8  # + team, since the start of the period
+TIMEOUTS = 10  # + team
+SHOT_PCT = 12  # + team * NUM_SHOTS + shot code
+NUM_FEATURES = SHOT_PCT + 2 * NUM_SHOTS
+
+FEATURE_NAMES: Tuple[str, ...] = (
+    "score_diff",
+    "time_left",
+    "possession",
+    "run",
+    "possessions",
+    "pace",
+    "home_fouls",
+    "away_fouls",
+    "home_period_fouls",
+    "away_period_fouls",
+    "home_timeouts",
+    "away_timeouts",
+    *(
+        f"{team}_{'all' if shot == ShotCode.NONE else shot.name.lower()}_pct"
+        for team in ("home", "away")
+        for shot in ShotCode
+    ),
+)
+
+_POSSESSION_VALUE = (1.0, 0.0, 0.5)  # by team code
+_POINTS = {ShotCode.THREE_POINT.value: 3, ShotCode.FREE_THROW.value: 1}  # anything else scores 2
+_ALL = ShotCode.NONE.value
+
+_EV_JUMP_BALL = EventCode.JUMP_BALL.value
+_EV_SCORE = EventCode.SCORE.value
+_EV_MISSED = EventCode.MISSED.value
+_EV_REBOUND = EventCode.REBOUND.value
+_EV_STEAL = EventCode.STEAL.value
+_EV_TURNOVER = EventCode.TURNOVER.value
+_EV_FOUL = EventCode.FOUL.value
+_EV_TIMEOUT = EventCode.TIMEOUT.value
+_EV_START_PERIOD = EventCode.START_PERIOD.value
+
+
+class GameState:
+    """Running state of one game, updated in O(1) per play-by-play event."""
+
+    __slots__ = (
+        "features",
+        "home_score",
+        "away_score",
+        "time_left",
+        "start_time",
+        "possession",
+        "last_shooter",
+        "streak_team",
+        "streak_points",
+        "possessions",
+        "attempts",
+        "makes",
+        "fouls",
+        "period_fouls",
+        "timeouts",
+    )
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the game; the next event starts a new one."""
+        self.features = array("d", bytes(8 * NUM_FEATURES))
+        self.features[POSSESSION] = 0.5
+        self.home_score = 0
+        self.away_score = 0
+        self.time_left = 0.0
+        self.start_time: Optional[float] = None  # first positive time seen
+        self.possession = UNKNOWN
+        self.last_shooter = UNKNOWN
+        self.streak_team = UNKNOWN
+        self.streak_points = 0
+        self.possessions = 0
+        # [team][shot code]; shot code NONE is the total over every shot
+        self.attempts: List[List[int]] = [[0] * NUM_SHOTS, [0] * NUM_SHOTS]
+        self.makes: List[List[int]] = [[0] * NUM_SHOTS, [0] * NUM_SHOTS]
+        self.fouls = [0, 0]
+        self.period_fouls = [0, 0]
+        self.timeouts = [0, 0]
+
+    def update(
+        self,
+        code: int,
+        team: int,
+        home_score: int,
+        away_score: int,
+        shot: int,
+        time_seconds: Optional[float],
+    ) -> None:
+        """Apply one event, given as codes from :mod:`records`.
+
+        Parameters
+        ----------
+        code
+            Event code, see :func:`records.event_code`
+        team
+            Team code of the acting team, see :func:`records.team_code`
+        home_score, away_score
+            Score after the event
+        shot
+            Shot code, see :func:`records.shot_code`
+        time_seconds
+            Game seconds remaining, or None to keep the last known time
+        """
+        features = self.features
+        self.home_score = home_score
+        self.away_score = away_score
+        features[SCORE_DIFF] = home_score - away_score
+        if time_seconds is not None:
+            self.time_left = time_seconds
+            features[TIME_LEFT] = time_seconds
+            if self.start_time is None and time_seconds > 0:
+                self.start_time = time_seconds
+
+        possession = self.possession
+        if code == _EV_SCORE:
+            self._shot(team, shot, True)
+            points = _POINTS.get(shot, 2)
+            if self.streak_team != team:
+                self.streak_team = team
+                self.streak_points = points
+            else:
+                self.streak_points += points
+            features[RUN] = self.streak_points if team == HOME else -self.streak_points if team == AWAY else 0.0
+            if possession == HOME:
+                possession = AWAY
+            elif possession == AWAY:
+                possession = HOME
+        elif code == _EV_MISSED:
+            self._shot(team, shot, False)
+            self.last_shooter = team
+        elif code == _EV_REBOUND or code == _EV_STEAL:
+            possession = team
+        elif code == _EV_TURNOVER:
+            possession = AWAY if team == HOME else HOME
+        elif code == _EV_JUMP_BALL:
+            if team != UNKNOWN:
+                possession = team
+        elif code == _EV_FOUL:
+            if team != UNKNOWN:
+                self.fouls[team] += 1
+                self.period_fouls[team] += 1
+                features[FOULS + team] = self.fouls[team]
+                features[PERIOD_FOULS + team] = self.period_fouls[team]
+        elif code == _EV_TIMEOUT:
+            if team != UNKNOWN:
+                self.timeouts[team] += 1
+                features[TIMEOUTS + team] = self.timeouts[team]
+        elif code == _EV_START_PERIOD:
+            self.period_fouls = [0, 0]
+            features[PERIOD_FOULS + HOME] = 0.0
+            features[PERIOD_FOULS + AWAY] = 0.0
+
+        if possession != self.possession:
+            if possession != UNKNOWN and self.possession != UNKNOWN:
+                self.possessions += 1
+                features[POSSESSIONS] = self.possessions
+            self.possession = possession
+            features[POSSESSION] = _POSSESSION_VALUE[possession]
+        played = self.elapsed()
+        features[PACE] = self.possessions * 60.0 / played if played > 0 else 0.0
+
+    def _shot(self, team: int, shot: int, made: bool) -> None:
+        if team == UNKNOWN:
+            return
+        attempts = self.attempts[team]
+        makes = self.makes[team]
+        base = SHOT_PCT + team * NUM_SHOTS
+        for code in (_ALL, shot) if shot != _ALL else (_ALL,):
+            attempts[code] += 1
+            if made:
+                makes[code] += 1
+            self.features[base + code] = makes[code] / attempts[code]
+
+    def elapsed(self) -> float:
+        """Game seconds played since the first timed event."""
+        return self.start_time - self.time_left if self.start_time is not None else 0.0
+
+    def shot_pct(self, team: int, shot: int = _ALL) -> float:
+        """Share of ``team``'s shots of type ``shot`` made; every shot by default."""
+        return self.features[SHOT_PCT + team * NUM_SHOTS + shot]
+
+    def as_dict(self) -> dict:
+        """The feature vector keyed by :data:`FEATURE_NAMES`, for logging."""
+        return dict(zip(FEATURE_NAMES, self.features))
@@ -0,0 +1,299 @@
+"""Run many concurrent games in one process, one isolated strategy per ticker.
+
+A strategy file assumes it trades a single game. ``reset_state`` runs on
+``END_GAME``, every order goes to ``Ticker.TEAM_A`` and the order functions
+are module globals. :class:`StrategyHost` gives each ticker its own freshly
+imported copy of the strategy module (see
+:func:`backtest.load_strategy_module`) and its own ``Strategy`` instance. The
+copy's order functions are rebound to send to that ticker through the shared
+gateway, and incoming sides are translated to the copy's own ``Side``
+members.
+
+The feed calls the host's callbacks with the ticker first. They only enqueue
+and never run strategy code. Each game has an asyncio queue drained by its
+own task. The task hands batches of at most ``max_batch`` callbacks to a
+worker pool, or runs them inline with ``workers=0``. A game has at most one
+batch in flight, so its callbacks run in order. The pool serves waiting games
+first come first served, so a burst in one game delays the others by about
+one batch, not by the whole burst.
+
+Per game, :meth:`StrategyHost.stats` reports the queue depth (current and
+peak) and the lag, meaning how long the oldest callback of a batch waited
+before it started. :meth:`StrategyHost.report` logs them.
+
+With more than one worker, strategy callbacks run on several threads at
+once, so the gateway must then be thread-safe; the shared event log already
+is. Extra workers only help when callbacks wait on I/O such as a blocking
+gateway: pure-Python strategy code holds the GIL, so games do not compute in
+parallel.
+
+Each game's private module is registered in ``sys.modules`` while it is
+hosted and removed again by :meth:`StrategyHost.remove_game`, so a
+long-running host does not accumulate one module per game.
+"""
+
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from backtest import load_strategy_module
+from eventlog import get_log
+from records import side_code
+
+# (enqueued at, callback name, arguments)
+Message = Tuple[float, str, tuple]
+
+
+class GameSession:
+    """One game: a private strategy module and instance, its queue and its metrics.
+
+    Parameters
+    ----------
+    ticker
+        Ticker of the game on the exchange
+    module
+        Private strategy module whose order functions this session rebinds
+    strategy
+        Strategy instance built from ``module``
+    gateway
+        Object with the exchange's ``place_market_order``,
+        ``place_limit_order`` and ``cancel_order``
+    gateway_sides
+        (buy, sell) side objects the gateway expects; None passes the
+        strategy's own ``Side`` members through
+    """
+
+    def __init__(
+        self,
+        ticker: Hashable,
+        module: ModuleType,
+        strategy: Any,
+        gateway: Any,
+        gateway_sides: Optional[Sequence[Any]] = None,
+    ) -> None:
+        self.ticker = ticker
+        self.module = module
+        self.strategy = strategy
+        self.queue: "asyncio.Queue[Message]" = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+        self.sides = (module.Side.BUY, module.Side.SELL)
+        self.local_ticker = module.Ticker.TEAM_A
+        self.log = get_log()
+        self._bind(gateway, gateway_sides)
+        self.reset_stats()
+
+    def _bind(self, gateway: Any, gateway_sides: Optional[Sequence[Any]]) -> None:
+        ticker = self.ticker
+        out = (lambda side: gateway_sides[side_code(side)]) if gateway_sides is not None else (lambda side: side)
+
+        def place_market_order(side, _ticker, quantity):
+            return gateway.place_market_order(out(side), ticker, quantity)
+
+        def place_limit_order(side, _ticker, quantity, price, ioc=False):
+            return gateway.place_limit_order(out(side), ticker, quantity, price, ioc)
+
+        def cancel_order(_ticker, order_id):
+            return gateway.cancel_order(ticker, order_id)
+
+        self.module.place_market_order = place_market_order
+        self.module.place_limit_order = place_limit_order
+        self.module.cancel_order = cancel_order
+
+    def side(self, side: Any) -> Any:
+        """The strategy module's own ``Side`` member for a feed side."""
+        return self.sides[side_code(side)]
+
+    # -- metrics -----------------------------------------------------------------
+
+    def reset_stats(self) -> None:
+        self.processed = 0
+        self.batches = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.busy = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.queue.qsize(),
+            "max_depth": self.max_depth,
+            "processed": self.processed,
+            "batches": self.batches,
+            "errors": self.errors,
+            "lag_ms": round(self.lag * 1e3, 3),
+            "max_lag_ms": round(self.max_lag * 1e3, 3),
+            "busy_ms": round(self.busy * 1e3, 3),
+        }
+
+    # -- dispatch -----------------------------------------------------------------
+
+    def put(self, message: Message) -> None:
+        self.queue.put_nowait(message)
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def run_batch(self, batch: List[Message]) -> None:
+        """Deliver a batch of callbacks in order; one failing callback does not stop the game."""
+        strategy = self.strategy
+        start = time.perf_counter()
+        for _, name, args in batch:
+            try:
+                getattr(strategy, name)(*args)
+            except Exception as exc:
+                self.errors += 1
+                self.log.error("host_callback_failed", ticker=self.ticker, callback=name, error=repr(exc))
+        self.busy += time.perf_counter() - start
+        self.processed += len(batch)
+        self.batches += 1
+
+
+class StrategyHost:
+    """Multiplex per-ticker callback streams onto isolated strategy instances.
+
+    Parameters
+    ----------
+    strategy_path
+        Strategy file, e.g. ``template.py``; imported afresh for every game
+    gateway
+        Exchange order entry shared by all games
+    strategy_factory
+        ``factory(module) -> strategy``; defaults to ``module.Strategy()``
+    workers
+        Threads that run strategy callbacks; 0 runs them on the event loop
+    max_batch
+        Most callbacks of one game handed to a worker at a time
+    gateway_sides
+        (buy, sell) side objects the gateway expects, see :class:`GameSession`
+    """
+
+    def __init__(
+        self,
+        strategy_path: str,
+        gateway: Any,
+        strategy_factory: Optional[Callable[[ModuleType], Any]] = None,
+        workers: int = 1,
+        max_batch: int = 32,
+        gateway_sides: Optional[Sequence[Any]] = None,
+    ) -> None:
+        self.strategy_path = strategy_path
+        self.gateway = gateway
+        self.strategy_factory = strategy_factory or (lambda module: module.Strategy())
+        self.max_batch = max_batch
+        self.gateway_sides = gateway_sides
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="strategy") if workers > 0 else None
+        self.sessions: Dict[Hashable, GameSession] = {}
+        self.log = get_log()
+
+    # -- games -------------------------------------------------------------------
+
+    def add_game(self, ticker: Hashable) -> GameSession:
+        """Start hosting ``ticker``; must be called from the event loop."""
+        session = self.sessions.get(ticker)
+        if session is not None:
+            return session
+        module = load_strategy_module(self.strategy_path)
+        session = GameSession(ticker, module, None, self.gateway, self.gateway_sides)
+        # the strategy may place orders from __init__, so bind before building it
+        session.strategy = self.strategy_factory(module)
+        session.task = asyncio.get_running_loop().create_task(self._consume(session), name=f"game-{ticker}")
+        self.sessions[ticker] = session
+        return session
+
+    async def remove_game(self, ticker: Hashable) -> None:
+        """Deliver what is queued for ``ticker``, then stop hosting it."""
+        session = self.sessions.pop(ticker, None)
+        if session is None:
+            return
+        await session.queue.join()
+        session.task.cancel()
+        sys.modules.pop(session.module.__name__, None)
+
+    async def drain(self) -> None:
+        """Wait until every queued callback has been delivered."""
+        await asyncio.gather(*(session.queue.join() for session in list(self.sessions.values())))
+
+    async def close(self) -> None:
+        """Drain, stop every game and shut the worker pool down."""
+        await self.drain()
+        for ticker in list(self.sessions):
+            await self.remove_game(ticker)
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+    async def _consume(self, session: GameSession) -> None:
+        loop = asyncio.get_running_loop()
+        queue = session.queue
+        max_batch = self.max_batch
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            lag = loop.time() - batch[0][0]
+            session.lag = lag
+            if lag > session.max_lag:
+                session.max_lag = lag
+            try:
+                if self.executor is None:
+                    session.run_batch(batch)
+                else:
+                    await loop.run_in_executor(self.executor, session.run_batch, batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+            if self.executor is None:
+                await asyncio.sleep(0)  # let the other games and the feed run
+
+    # -- feed callbacks (ticker first; enqueue only) -------------------------------
+
+    def submit(self, ticker: Hashable, name: str, args: tuple) -> None:
+        """Queue ``strategy.<name>(*args)`` for ``ticker``, adding the game if new."""
+        session = self.sessions.get(ticker) or self.add_game(ticker)
+        session.put((asyncio.get_running_loop().time(), name, args))
+
+    def submit_threadsafe(self, loop: asyncio.AbstractEventLoop, ticker: Hashable, name: str, args: tuple) -> None:
+        """:meth:`submit` from a feed thread other than the event loop's."""
+        loop.call_soon_threadsafe(self.submit, ticker, name, args)
+
+    def _market(self, ticker: Hashable, name: str, side: Any, *rest: Any) -> None:
+        # the strategy sees its own Side members and its single-game ticker
+        session = self.sessions.get(ticker) or self.add_game(ticker)
+        session.put((asyncio.get_running_loop().time(), name, (session.local_ticker, session.side(side), *rest)))
+
+    def on_trade_update(self, ticker: Hashable, side: Any, quantity: float, price: float) -> None:
+        self._market(ticker, "on_trade_update", side, quantity, price)
+
+    def on_orderbook_update(self, ticker: Hashable, side: Any, quantity: float, price: float) -> None:
+        self._market(ticker, "on_orderbook_update", side, quantity, price)
+
+    def on_account_update(self, ticker: Hashable, side: Any, price: float, quantity: float, capital_remaining: float) -> None:
+        self._market(ticker, "on_account_update", side, price, quantity, capital_remaining)
+
+    def on_orderbook_snapshot(self, ticker: Hashable, bids: list, asks: list) -> None:
+        session = self.sessions.get(ticker) or self.add_game(ticker)
+        session.put((asyncio.get_running_loop().time(), "on_orderbook_snapshot", (session.local_ticker, bids, asks)))
+
+    def on_game_event_update(self, ticker: Hashable, *args: Any) -> None:
+        """The twelve ``Strategy.on_game_event_update`` arguments, after the ticker."""
+        self.submit(ticker, "on_game_event_update", args)
+
+    # -- metrics -------------------------------------------------------------------
+
+    def stats(self) -> Dict[Hashable, Dict[str, Any]]:
+        """Queue depth, lag and throughput per game."""
+        return {ticker: session.stats() for ticker, session in self.sessions.items()}
+
+    def report(self) -> None:
+        """Log one ``host`` record per game."""
+        for ticker, stats in self.stats().items():
+            self.log.info("host", ticker=ticker, **stats)
+
+    async def report_every(self, interval: float) -> None:
+        """Log :meth:`report` every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            self.report()
@@ -0,0 +1,28 @@
+"""Optional native strategy core.
+
+``_core`` is a CPython extension over ``core.hpp``, the C++ order book, order
+registry and win-probability table that ``template.hpp`` uses. Build it with::
+
+    python build_core.py
+
+:mod:`orderbook`, :mod:`orders` and :mod:`winprob` use it when ``core`` is
+not None and keep their pure-Python classes as the fallback. Set
+``QC_NATIVE=0`` to force the fallback, e.g. to compare the two.
+"""
+
+import os
+from types import ModuleType
+from typing import Optional
+
+
+def _load() -> Optional[ModuleType]:
+    if os.environ.get("QC_NATIVE", "1") == "0":
+        return None
+    try:
+        import _core
+    except ImportError:
+        return None
+    return _core
+
+
+core = _load()
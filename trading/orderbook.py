@@ -0,0 +1,260 @@
+"""Fixed-tick price-level order book shared by the trading strategies.
+
+Prices live on a 0.01 grid between 0.01 and 99.99, so every level maps to an
+integer tick in ``[1, 9999]``. Quantities are kept in preallocated per-side
+arrays indexed by tick. A fixed-size ``bytearray`` per side marks which ticks
+are populated, so the next best level is found with one C-level
+``find``/``rfind`` instead of a Python loop over the array.
+Snapshots are merged into the book level by level rather than replacing it,
+and the number of levels they had to correct is reported as drift.
+
+When the native core is built, ``OrderBook`` is its C++ implementation of the
+same structure (``core.hpp``, which packs the flags into a fixed array of
+64-bit words) and the class below stays as ``PyOrderBook``.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from native import core
+
+MIN_TICK = 1        # 0.01
+MAX_TICK = 9999     # 99.99
+NUM_TICKS = MAX_TICK + 1
+
+# Sentinels chosen so that an empty side reports the same best prices the
+# strategies used before (0.0 bid, 100.0 ask).
+NO_BID = 0
+NO_ASK = MAX_TICK + 1
+
+_ZEROS = [0.0] * NUM_TICKS
+_EMPTY = bytes(NUM_TICKS)
+
+
+def to_tick(price: float) -> int:
+    """Convert a price to its integer tick on the 0.01 grid."""
+    return int(round(price * 100))
+
+
+def to_price(tick: int) -> float:
+    """Convert an integer tick back to a price."""
+    return tick / 100
+
+
+class OrderBook:
+    """Price-level order book with O(1) level updates and cached top of book.
+
+    Updating a level writes one array slot and allocates nothing. The
+    populated-tick flags and level counts only change when a level appears
+    or disappears, and the cached best bid/ask is only recomputed when the
+    best level itself empties. The next populated tick is then found by one
+    ``find``/``rfind`` over the flags, a C-level scan of at most
+    ``NUM_TICKS`` bytes.
+    """
+
+    __slots__ = (
+        "bid_qty",
+        "ask_qty",
+        "_bid_flags",
+        "_ask_flags",
+        "bid_levels",
+        "ask_levels",
+        "best_bid_tick",
+        "best_ask_tick",
+    )
+
+    def __init__(self) -> None:
+        self.bid_qty: List[float] = _ZEROS.copy()
+        self.ask_qty: List[float] = _ZEROS.copy()
+        self._bid_flags = bytearray(NUM_TICKS)  # 1 at every populated tick
+        self._ask_flags = bytearray(NUM_TICKS)
+        self.bid_levels = 0
+        self.ask_levels = 0
+        self.best_bid_tick = NO_BID
+        self.best_ask_tick = NO_ASK
+
+    def clear(self) -> None:
+        """Remove every level from both sides."""
+        self.bid_qty[:] = _ZEROS
+        self.ask_qty[:] = _ZEROS
+        self._bid_flags[:] = _EMPTY
+        self._ask_flags[:] = _EMPTY
+        self.bid_levels = 0
+        self.ask_levels = 0
+        self.best_bid_tick = NO_BID
+        self.best_ask_tick = NO_ASK
+
+    def update(self, is_bid: bool, price: float, quantity: float) -> None:
+        """Set the resting quantity at ``price``; a quantity <= 0 removes the level.
+
+        Parameters
+        ----------
+        is_bid
+            True for the bid side, False for the ask side
+        price
+            Price of the level
+        quantity
+            New total quantity resting at the level
+        """
+        tick = int(round(price * 100))
+        if tick < MIN_TICK or tick > MAX_TICK:
+            return
+        if is_bid:
+            self._set_bid(tick, quantity)
+        else:
+            self._set_ask(tick, quantity)
+
+    def _set_bid(self, tick: int, quantity: float) -> None:
+        had_level = self.bid_qty[tick] > 0
+        if quantity > 0:
+            self.bid_qty[tick] = quantity
+            if not had_level:
+                self._bid_flags[tick] = 1
+                self.bid_levels += 1
+                if tick > self.best_bid_tick:
+                    self.best_bid_tick = tick
+        elif had_level:
+            self.bid_qty[tick] = 0.0
+            self._bid_flags[tick] = 0
+            self.bid_levels -= 1
+            if tick == self.best_bid_tick:
+                # tick 0 is never populated, so an empty side finds NO_BID
+                self.best_bid_tick = max(NO_BID, self._bid_flags.rfind(1, MIN_TICK, tick))
+
+    def _set_ask(self, tick: int, quantity: float) -> None:
+        had_level = self.ask_qty[tick] > 0
+        if quantity > 0:
+            self.ask_qty[tick] = quantity
+            if not had_level:
+                self._ask_flags[tick] = 1
+                self.ask_levels += 1
+                if tick < self.best_ask_tick:
+                    self.best_ask_tick = tick
+        elif had_level:
+            self.ask_qty[tick] = 0.0
+            self._ask_flags[tick] = 0
+            self.ask_levels -= 1
+            if tick == self.best_ask_tick:
+                tick = self._ask_flags.find(1, tick + 1)
+                self.best_ask_tick = tick if tick >= 0 else NO_ASK
+
+    def load_snapshot(self, bids: Iterable[Tuple[float, float]], asks: Iterable[Tuple[float, float]]) -> int:
+        """Make the book match a snapshot, touching only the levels that differ.
+
+        Levels the snapshot repeats unchanged are left alone, so a snapshot of
+        a book the deltas kept in sync costs one comparison per level.
+
+        Parameters
+        ----------
+        bids
+            Iterable of (price, quantity) bid levels, in any order
+        asks
+            Iterable of (price, quantity) ask levels, in any order
+
+        Returns
+        -------
+        drift
+            Number of levels the snapshot added, resized or removed, i.e.
+            where the book built from deltas disagreed with it
+        """
+        return self._reconcile(True, bids) + self._reconcile(False, asks)
+
+    def _reconcile(self, is_bid: bool, levels: Iterable[Tuple[float, float]]) -> int:
+        qty = self.bid_qty if is_bid else self.ask_qty
+        set_level = self._set_bid if is_bid else self._set_ask
+        seen = bytearray(NUM_TICKS)
+        listed = 0
+        drift = 0
+        for price, quantity in levels:
+            tick = int(round(price * 100))
+            if tick < MIN_TICK or tick > MAX_TICK or not quantity > 0:
+                continue
+            if not seen[tick]:
+                seen[tick] = 1
+                listed += 1
+            if qty[tick] != quantity:
+                set_level(tick, quantity)
+                drift += 1
+        # every listed level is now populated; any others are stale
+        if (self.bid_levels if is_bid else self.ask_levels) > listed:
+            flags = self._bid_flags if is_bid else self._ask_flags
+            tick = flags.find(1)
+            while tick >= 0:
+                if not seen[tick]:
+                    set_level(tick, 0.0)
+                    drift += 1
+                tick = flags.find(1, tick + 1)
+        return drift
+
+    def best_bid(self) -> float:
+        """Best bid price, or 0.0 when there are no bids."""
+        return self.best_bid_tick / 100
+
+    def best_ask(self) -> float:
+        """Best ask price, or 100.0 when there are no asks."""
+        return self.best_ask_tick / 100
+
+    def has_bids(self) -> bool:
+        return self.best_bid_tick != NO_BID
+
+    def has_asks(self) -> bool:
+        return self.best_ask_tick != NO_ASK
+
+    def is_two_sided(self) -> bool:
+        """True when both sides of the book have at least one level."""
+        return self.best_bid_tick != NO_BID and self.best_ask_tick != NO_ASK
+
+    def mid(self) -> float:
+        """Mid price of the top of book. Only meaningful when two-sided."""
+        return (self.best_bid_tick + self.best_ask_tick) / 200
+
+    def bids(self) -> Iterator[Tuple[float, float]]:
+        """Iterate bid levels as (price, quantity), best (highest) first."""
+        flags = self._bid_flags
+        qty = self.bid_qty
+        tick = self.best_bid_tick
+        while tick > NO_BID:
+            yield tick / 100, qty[tick]
+            tick = flags.rfind(1, MIN_TICK, tick)
+
+    def asks(self) -> Iterator[Tuple[float, float]]:
+        """Iterate ask levels as (price, quantity), best (lowest) first."""
+        flags = self._ask_flags
+        qty = self.ask_qty
+        tick = self.best_ask_tick
+        while 0 <= tick < NO_ASK:
+            yield tick / 100, qty[tick]
+            tick = flags.find(1, tick + 1)
+
+
+class SnapshotMonitor:
+    """Applies snapshots to a book, counting drift and reporting top-of-book moves.
+
+    Drift is only counted once the book has been built, so the first snapshot
+    after a reset, which builds the book, does not count.
+    """
+
+    __slots__ = ("snapshots", "drifted", "drift_levels")
+
+    def __init__(self) -> None:
+        self.snapshots = 0
+        self.drifted = 0  # snapshots that disagreed with the book
+        self.drift_levels = 0
+
+    def apply(self, book: "OrderBook", bids: Iterable[Tuple[float, float]], asks: Iterable[Tuple[float, float]]) -> bool:
+        """Merge a snapshot into ``book``; True if the best bid or ask tick changed."""
+        bid, ask = book.best_bid_tick, book.best_ask_tick
+        built = bid != NO_BID or ask != NO_ASK
+        drift = book.load_snapshot(bids, asks)
+        self.snapshots += 1
+        if drift and built:
+            self.drifted += 1
+            self.drift_levels += drift
+        return book.best_bid_tick != bid or book.best_ask_tick != ask
+
+    def stats(self) -> Dict[str, int]:
+        return {"snapshots": self.snapshots, "drifted": self.drifted, "drift_levels": self.drift_levels}
+
+
+PyOrderBook = OrderBook
+if core is not None:
+    OrderBook = core.OrderBook  # noqa: F811
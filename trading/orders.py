@@ -0,0 +1,130 @@
+"""Registry of our live orders with the indexes the strategies query per event.
+
+Counting orders per side, matching a fill to an order and finding expired
+orders are all answered from indexes kept up to date on add/remove, instead
+of scanning every open order. Orders are slotted :class:`records.Order`
+objects and the indexes are keyed by int side codes, so no per-order dict is
+allocated and no enum member is hashed.
+
+When the native core is built, ``OrderRegistry`` is its C++ implementation
+(``core.hpp``) and the class below stays as ``PyOrderRegistry``. The native
+registry returns copies of its orders rather than the live records.
+"""
+
+import heapq
+from collections import deque
+from itertools import count
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from native import core
+from orderbook import to_tick
+from records import Order, side_code
+
+
+class OrderRegistry:
+    """Open orders keyed by order id, with per-side counts, a price index and an expiry heap.
+
+    Each order is a :class:`records.Order` with ``side``, ``price``, ``qty``
+    and ``placed_at_time`` attributes. Placement times must come from a clock that only
+    moves forward (e.g. seconds elapsed in the game), so the oldest order is
+    always at the top of the heap.
+    """
+
+    def __init__(self) -> None:
+        self.orders: Dict[int, Order] = {}
+        self._counts = [0, 0]
+        self._by_price: Dict[Tuple[int, int], Deque[int]] = {}
+        # (placed_at_time, seq, order_id, order); entries whose order is no
+        # longer live are skipped when popped.
+        self._expiry: List[Tuple[float, int, int, Order]] = []
+        self._seq = count()
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self.orders
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.orders)
+
+    def get(self, order_id: int) -> Optional[Order]:
+        return self.orders.get(order_id)
+
+    def count(self, side) -> int:
+        """Number of open orders on ``side``."""
+        return self._counts[side_code(side)]
+
+    def add(self, order_id: int, side, price: float, qty: float, placed_at_time: float) -> Order:
+        """Register a newly placed order, replacing any order with the same id."""
+        if order_id in self.orders:
+            self.remove(order_id)
+        order = Order(order_id, side, price, to_tick(price), qty, placed_at_time)
+        self.orders[order_id] = order
+        self._counts[order.side_code] += 1
+        key = (order.side_code, order.tick)
+        level = self._by_price.get(key)
+        if level is None:
+            level = self._by_price[key] = deque()
+        level.append(order_id)
+        heapq.heappush(self._expiry, (placed_at_time, next(self._seq), order_id, order))
+        return order
+
+    def remove(self, order_id: int) -> Optional[Order]:
+        """Forget an order (cancelled or fully filled) and return it, if it was open."""
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return None
+        self._counts[order.side_code] -= 1
+        key = (order.side_code, order.tick)
+        level = self._by_price[key]
+        level.remove(order_id)
+        if not level:
+            del self._by_price[key]
+        return order
+
+    def match_fill(self, side, price: float, quantity: float) -> Optional[int]:
+        """Apply a fill to the oldest open order at ``price`` on ``side``.
+
+        Returns
+        -------
+        order_id
+            Order the fill was applied to, or None if no open order rests at
+            that price
+        """
+        level = self._by_price.get((side_code(side), to_tick(price)))
+        if not level:
+            return None
+        order_id = level[0]
+        order = self.orders[order_id]
+        order.qty -= quantity
+        if order.qty <= 0:
+            self.remove(order_id)
+        return order_id
+
+    def pop_expired(self, now: float, lifetime: float) -> List[int]:
+        """Remove and return the ids of orders older than ``lifetime`` at time ``now``.
+
+        Only the expired orders (plus any already-removed heap entries) are
+        touched.
+        """
+        expired = []
+        heap = self._expiry
+        cutoff = now - lifetime
+        while heap and heap[0][0] < cutoff:
+            _, _, order_id, order = heapq.heappop(heap)
+            if self.orders.get(order_id) is order:
+                self.remove(order_id)
+                expired.append(order_id)
+        return expired
+
+    def clear(self) -> None:
+        self.orders.clear()
+        self._counts = [0, 0]
+        self._by_price.clear()
+        self._expiry.clear()
+
+
+PyOrderRegistry = OrderRegistry
+if core is not None:
+    OrderRegistry = core.OrderRegistry  # noqa: F811
@@ -0,0 +1,207 @@
+"""Opt-in latency instrumentation for the Strategy callbacks.
+
+The profiler wraps the callbacks of a single strategy instance (and the order
+functions of its module) with timing shims. Nothing is wrapped unless the
+profiler is attached, so a strategy running without it pays nothing beyond a
+flag check in ``__init__``.
+
+Enable it with ``QC_PROFILE=1`` in the environment, or by attaching it
+explicitly::
+
+    profiler = Profiler()
+    profiler.attach(strategy)
+"""
+
+import os
+import sys
+from time import perf_counter_ns
+from typing import Callable, Dict, Iterable, List, Optional
+
+SUB_BUCKET_BITS = 6
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_VALUE_BITS = 40  # ~18 minutes in ns, anything slower is clamped
+
+CALLBACKS = (
+    "on_trade_update",
+    "on_orderbook_update",
+    "on_account_update",
+    "on_game_event_update",
+    "on_orderbook_snapshot",
+)
+HOT_PATHS = ("evaluate_and_trade", "trade")
+ORDER_FUNCTIONS = ("place_market_order", "place_limit_order", "cancel_order")
+
+
+def profiling_enabled() -> bool:
+    """True when ``QC_PROFILE`` is set to a non-empty, non-zero value."""
+    return os.environ.get("QC_PROFILE", "") not in ("", "0")
+
+
+class Histogram:
+    """Fixed-size log-linear histogram in the style of HdrHistogram.
+
+    Values below ``2 * SUB_BUCKETS`` are counted exactly. Above that, every
+    power of two is split into ``SUB_BUCKETS`` equal buckets, so any recorded
+    value is reported within about 1.6% of its true value. Recording is a
+    couple of integer operations and one list increment.
+    """
+
+    __slots__ = ("counts", "total", "max_value")
+
+    SIZE = (MAX_VALUE_BITS - SUB_BUCKET_BITS + 1) * SUB_BUCKETS
+
+    def __init__(self) -> None:
+        self.counts = [0] * self.SIZE
+        self.total = 0
+        self.max_value = 0
+
+    def reset(self) -> None:
+        self.counts = [0] * self.SIZE
+        self.total = 0
+        self.max_value = 0
+
+    def record(self, value: int) -> None:
+        shift = value.bit_length() - SUB_BUCKET_BITS - 1
+        if shift <= 0:
+            index = value if value > 0 else 0
+        else:
+            index = (shift << SUB_BUCKET_BITS) + (value >> shift)
+            if index >= self.SIZE:
+                index = self.SIZE - 1
+        self.counts[index] += 1
+        self.total += 1
+        if value > self.max_value:
+            self.max_value = value
+
+    @staticmethod
+    def bucket_value(index: int) -> int:
+        """Midpoint of the values that land in bucket ``index``."""
+        shift = (index >> SUB_BUCKET_BITS) - 1
+        if shift <= 0:
+            return index
+        low = (index - (shift << SUB_BUCKET_BITS)) << shift
+        return low + (1 << (shift - 1))
+
+    def percentile(self, q: float) -> int:
+        """Value at percentile ``q`` (0-100), or 0 when nothing was recorded."""
+        if not self.total:
+            return 0
+        rank = max(1, -(-self.total * q // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bucket_value(index), self.max_value)
+        return self.max_value
+
+
+class Profiler:
+    """Per-callback wall-time histograms and order counts for one strategy.
+
+    Parameters
+    ----------
+    out
+        Callable the END_GAME summary is written with, defaults to ``print``
+    """
+
+    def __init__(self, out: Optional[Callable[[str], None]] = None) -> None:
+        self.out = out or print
+        self.latency: Dict[str, Histogram] = {}
+        self.orders_placed = 0
+        self.orders_cancelled = 0
+        self.placed_per_event = Histogram()
+        self.cancelled_per_event = Histogram()
+
+    def attach(self, strategy, methods: Optional[Iterable[str]] = None) -> "Profiler":
+        """Wrap ``strategy``'s callbacks and its module's order functions.
+
+        Parameters
+        ----------
+        strategy
+            Strategy instance to instrument; only this instance is affected
+        methods
+            Method names to time, defaults to the exchange callbacks plus
+            whichever of ``evaluate_and_trade``/``trade`` the strategy defines
+        """
+        if methods is None:
+            methods = CALLBACKS + tuple(name for name in HOT_PATHS if hasattr(strategy, name))
+        for name in methods:
+            self.latency[name] = Histogram()
+            is_callback = name.startswith("on_")
+            setattr(strategy, name, self._timed(name, getattr(strategy, name), is_callback))
+
+        module = sys.modules.get(type(strategy).__module__)
+        if module is not None:
+            for name in ORDER_FUNCTIONS:
+                fn = getattr(module, name, None)
+                if fn is not None:
+                    setattr(module, name, self._counted(name, getattr(fn, "__wrapped__", fn)))
+        return self
+
+    def _timed(self, name: str, fn: Callable, is_callback: bool) -> Callable:
+        hist = self.latency[name]
+        if not is_callback:
+            def timed(*args, **kwargs):
+                start = perf_counter_ns()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    hist.record(perf_counter_ns() - start)
+            return timed
+
+        def timed_callback(*args, **kwargs):
+            placed, cancelled = self.orders_placed, self.orders_cancelled
+            start = perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                hist.record(perf_counter_ns() - start)
+                self.placed_per_event.record(self.orders_placed - placed)
+                self.cancelled_per_event.record(self.orders_cancelled - cancelled)
+                if name == "on_game_event_update" and (args[0] if args else kwargs.get("event_type")) == "END_GAME":
+                    self.dump()
+                    self.reset()
+        return timed_callback
+
+    def _counted(self, name: str, fn: Callable) -> Callable:
+        if name == "cancel_order":
+            def counted(*args, **kwargs):
+                self.orders_cancelled += 1
+                return fn(*args, **kwargs)
+        else:
+            def counted(*args, **kwargs):
+                self.orders_placed += 1
+                return fn(*args, **kwargs)
+        counted.__wrapped__ = fn
+        return counted
+
+    def reset(self) -> None:
+        for hist in self.latency.values():
+            hist.reset()
+        self.orders_placed = 0
+        self.orders_cancelled = 0
+        self.placed_per_event.reset()
+        self.cancelled_per_event.reset()
+
+    def summary(self) -> List[str]:
+        """Summary lines: one per timed method (in microseconds), then order counts."""
+        lines = [f"{'callback':<24}{'count':>9}{'p50us':>10}{'p99us':>10}{'p99.9us':>10}{'maxus':>10}"]
+        for name, hist in self.latency.items():
+            if not hist.total:
+                continue
+            lines.append(
+                f"{name:<24}{hist.total:>9}"
+                f"{hist.percentile(50) / 1e3:>10.1f}{hist.percentile(99) / 1e3:>10.1f}"
+                f"{hist.percentile(99.9) / 1e3:>10.1f}{hist.max_value / 1e3:>10.1f}"
+            )
+        events = self.placed_per_event.total
+        lines.append(
+            f"orders placed: {self.orders_placed} cancelled: {self.orders_cancelled} over {events} events "
+            f"(per event p99 placed {self.placed_per_event.percentile(99)}, "
+            f"cancelled {self.cancelled_per_event.percentile(99)}; "
+            f"max placed {self.placed_per_event.max_value}, cancelled {self.cancelled_per_event.max_value})"
+        )
+        return lines
+
+    def dump(self) -> None:
+        self.out("\n".join(self.summary()))
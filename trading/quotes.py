@@ -0,0 +1,178 @@
+"""Incremental quote management: only touch the ladder levels that changed.
+
+Instead of cancelling every order and re-placing the whole ladder, the
+strategy hands the :class:`QuoteManager` its target ladder and the manager
+diffs it against the live quotes. Levels whose price is within tolerance and
+whose size is unchanged keep their order, and with it their queue priority.
+Every cancel and new order spends one token from a per-second message budget.
+
+Fills carry no order id, so they are matched to live quotes by price. A buy
+fill can come from any buy quote priced at or above the fill price. A quote
+that crossed the spread fills at the book's price, not its own. Among the
+candidates, a quote resting exactly at the fill price wins, and otherwise the
+oldest one does.
+"""
+
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from orderbook import to_tick
+from records import SideCode, side_code
+
+QuoteKey = Hashable  # e.g. (Side.BUY, level)
+
+BUY = SideCode.BUY.value
+
+
+class Quote:
+    __slots__ = ("key", "order_id", "side", "price", "tick", "qty", "remaining")
+
+    def __init__(self, key: QuoteKey, order_id: int, side, price: float, qty: float) -> None:
+        self.key = key
+        self.order_id = order_id
+        self.side = side
+        self.price = price
+        self.tick = to_tick(price)
+        self.qty = qty
+        self.remaining = qty
+
+
+class QuoteManager:
+    """Keep a ladder of limit orders in line with a target using minimal messages.
+
+    Parameters
+    ----------
+    place
+        ``place(side, qty, price) -> order_id``; an order id of 0 means rejected
+    cancel
+        ``cancel(order_id)``
+    price_tolerance
+        Live quotes within this distance of the target price are left alone
+    max_messages_per_sec
+        Token-bucket budget for cancels plus new orders; None disables it
+    clock
+        Monotonic clock in seconds that the budget refills against
+    """
+
+    def __init__(
+        self,
+        place: Callable[[object, float, float], int],
+        cancel: Callable[[int], object],
+        price_tolerance: float = 0.0,
+        max_messages_per_sec: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.place = place
+        self.cancel = cancel
+        self.price_tolerance = price_tolerance
+        self.rate = max_messages_per_sec
+        self.clock = clock
+        self.live: Dict[QuoteKey, Quote] = {}
+        self._by_side: Dict[object, List[Quote]] = {}  # live quotes per side, oldest first
+        self._tokens = max_messages_per_sec or 0.0
+        self._last_refill = clock()
+        self.messages = 0
+        self.kept = 0
+        self.throttled = 0
+        self.pending = False  # the last sync ran out of budget before reaching its targets
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(self.rate, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _spend(self) -> bool:
+        if self.rate is None:
+            self.messages += 1
+            return True
+        self._refill()
+        if self._tokens < 1.0:
+            self.throttled += 1
+            self.pending = True
+            return False
+        self._tokens -= 1.0
+        self.messages += 1
+        return True
+
+    def has_budget(self) -> bool:
+        """True if at least one message could be sent now."""
+        if self.rate is None:
+            return True
+        self._refill()
+        return self._tokens >= 1.0
+
+    def _drop(self, key: QuoteKey) -> Quote:
+        quote = self.live.pop(key)
+        self._by_side[quote.side].remove(quote)
+        return quote
+
+    def _add(self, key: QuoteKey, side, price: float, qty: float) -> None:
+        order_id = self.place(side, qty, price)
+        if order_id:
+            quote = self.live[key] = Quote(key, order_id, side, price, qty)
+            self._by_side.setdefault(side, []).append(quote)
+
+    def sync(self, targets: Dict[QuoteKey, Tuple[object, float, float]]) -> None:
+        """Move the live quotes towards ``targets``.
+
+        Parameters
+        ----------
+        targets
+            Mapping of quote key to ``(side, price, qty)``. Iteration order
+            is the priority order when the message budget runs short, so put
+            the levels nearest the touch first.
+        """
+        tolerance = self.price_tolerance
+        self.pending = False
+        for key in [key for key in self.live if key not in targets]:
+            if not self._spend():
+                return
+            self.cancel(self._drop(key).order_id)
+
+        for key, (side, price, qty) in targets.items():
+            quote = self.live.get(key)
+            if quote is not None:
+                if quote.side == side and quote.qty == qty and abs(quote.price - price) <= tolerance:
+                    self.kept += 1
+                    continue
+                if not self._spend():
+                    return
+                self.cancel(self._drop(key).order_id)
+            if not self._spend():
+                return
+            self._add(key, side, price, qty)
+
+    def match(self, side, price: float) -> Optional[Quote]:
+        """The live quote a fill on ``side`` at ``price`` came from, or None."""
+        tick = to_tick(price)
+        buy = side_code(side) == BUY
+        oldest = None
+        for quote in self._by_side.get(side, ()):
+            if quote.tick == tick:
+                return quote
+            if oldest is None and (quote.tick > tick if buy else quote.tick < tick):
+                oldest = quote
+        return oldest
+
+    def on_fill(self, side, price: float, quantity: float) -> Optional[int]:
+        """Account for a fill; fully filled quotes are forgotten so sync re-places them.
+
+        Returns
+        -------
+        order_id
+            Order id of the quote that was filled, or None if none matched
+        """
+        quote = self.match(side, price)
+        if quote is None:
+            return None
+        quote.remaining -= quantity
+        if quote.remaining <= 0:
+            self._drop(quote.key)
+        return quote.order_id
+
+    def cancel_all(self) -> None:
+        """Cancel every live quote. Not subject to the message budget."""
+        self.pending = False
+        for key in list(self.live):
+            self.cancel(self._drop(key).order_id)
+            self.messages += 1
@@ -0,0 +1,138 @@
+"""Inventory- and time-aware quoting in the style of Avellaneda & Stoikov (2008).
+
+For a fair value ``s``, inventory ``q``, risk aversion ``gamma``, fill
+intensity decay ``k``, fair-value variance ``sigma2`` per second and a
+quoting horizon of ``tau`` seconds, the engine quotes around::
+
+    reservation = s - q * gamma * sigma2 * tau
+    spread      = gamma * sigma2 * tau + (2 / gamma) * ln(1 + gamma / k)
+
+``tau`` is the game time remaining, capped at ``horizon_sec`` so the
+inventory penalty does not dominate early in a 48-minute game. The
+inventory skew ``s - reservation`` is capped at ``max_skew``, since prices
+live in [0, 100].
+
+``sigma2`` is the realised variance of the strategy's own fair value over
+its last ``vol_window`` changes. :class:`RealizedVariance` keeps it with
+running sums over a ring buffer, so observing a new fair value and quoting
+are both O(1).
+"""
+
+import math
+from typing import List, Tuple
+
+
+class RealizedVariance:
+    """Variance per second of a series, from its last ``window`` increments.
+
+    Parameters
+    ----------
+    window
+        Number of increments kept
+    prior
+        Variance reported before any time has passed
+    """
+
+    __slots__ = ("window", "prior", "_dx2", "_dt", "_i", "_n", "sum_dx2", "sum_dt", "last_t", "last_x")
+
+    def __init__(self, window: int = 50, prior: float = 0.01) -> None:
+        self.window = window
+        self.prior = prior
+        self.reset()
+
+    def reset(self) -> None:
+        self._dx2: List[float] = [0.0] * self.window
+        self._dt: List[float] = [0.0] * self.window
+        self._i = 0
+        self._n = 0
+        self.sum_dx2 = 0.0
+        self.sum_dt = 0.0
+        self.last_t = None
+        self.last_x = None
+
+    def update(self, t: float, x: float) -> None:
+        """Observe value ``x`` at time ``t`` (seconds, non-decreasing)."""
+        if self.last_x is not None:
+            dx = x - self.last_x
+            dx2 = dx * dx
+            dt = t - self.last_t
+            i = self._i
+            if self._n == self.window:
+                self.sum_dx2 -= self._dx2[i]
+                self.sum_dt -= self._dt[i]
+            else:
+                self._n += 1
+            self._dx2[i] = dx2
+            self._dt[i] = dt
+            self.sum_dx2 += dx2
+            self.sum_dt += dt
+            self._i = (i + 1) % self.window
+        self.last_t = t
+        self.last_x = x
+
+    @property
+    def value(self) -> float:
+        # running sums drift by rounding; an empty or timeless window falls back to the prior
+        if self.sum_dt <= 1e-9:
+            return self.prior
+        return max(self.sum_dx2, 0.0) / self.sum_dt
+
+
+class AvellanedaStoikov:
+    """Reservation price and half spread from inventory, time left and volatility.
+
+    Parameters
+    ----------
+    gamma
+        Risk aversion per unit of inventory
+    k
+        Decay of fill intensity with distance from the reservation price
+    horizon_sec
+        Cap on the seconds of inventory risk priced into the quotes
+    min_half_spread, max_half_spread
+        Bounds on the half spread, in price units
+    max_skew
+        Bound on the distance of the reservation price from fair value
+    vol_window
+        Fair-value increments used for the volatility estimate
+    vol_prior
+        Variance per second assumed until the estimate has data
+    """
+
+    def __init__(
+        self,
+        gamma: float = 0.05,
+        k: float = 1.5,
+        horizon_sec: float = 60.0,
+        min_half_spread: float = 0.5,
+        max_half_spread: float = 10.0,
+        max_skew: float = 10.0,
+        vol_window: int = 50,
+        vol_prior: float = 0.01,
+    ) -> None:
+        self.gamma = gamma
+        self.k = k
+        self.horizon_sec = horizon_sec
+        self.min_half_spread = min_half_spread
+        self.max_half_spread = max_half_spread
+        self.max_skew = max_skew
+        self.variance = RealizedVariance(vol_window, vol_prior)
+        # the liquidity term depends only on the parameters
+        self._liquidity_spread = (2.0 / gamma) * math.log1p(gamma / k)
+
+    def reset(self) -> None:
+        """Forget the volatility estimate, e.g. at the start of a game."""
+        self.variance.reset()
+
+    def observe(self, elapsed_sec: float, fair: float) -> None:
+        """Feed the fair value each time it is recomputed."""
+        self.variance.update(elapsed_sec, fair)
+
+    def quote(self, fair: float, inventory: float, time_left: float) -> Tuple[float, float]:
+        """``(reservation_price, half_spread)`` for the current state."""
+        tau = min(max(time_left, 0.0), self.horizon_sec)
+        risk = self.gamma * self.variance.value * tau
+        half = 0.5 * (risk + self._liquidity_spread)
+        half = min(max(half, self.min_half_spread), self.max_half_spread)
+        skew = min(max(inventory * risk, -self.max_skew), self.max_skew)
+        return fair - skew, half
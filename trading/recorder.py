@@ -0,0 +1,391 @@
+"""Capture of live Strategy callbacks into a compact binary log, and its replay.
+
+A :class:`Recorder` attached to a strategy appends every exchange callback
+(arguments plus a ``time.monotonic_ns`` timestamp) to a ``.qcr`` file before
+passing it on. Enable it with ``QC_RECORD_DIR=<directory>`` in the
+environment, which gives each strategy instance its own file, or explicitly::
+
+    Recorder("session.qcr").attach(strategy)
+
+File layout: an 8-byte magic, then records back to back. Every record starts
+with its kind byte and has a fixed width per kind, except that snapshots are
+followed by their levels as (price, quantity) float64 pairs. Strings
+(event types, teams, player names, ...) are written once as ``STRING``
+records, and game events refer to them by id. A reader builds the table as
+it scans, so the file can be appended to live and read while incomplete.
+
+:class:`Capture` memory-maps a file for scanning. :func:`replay` feeds a
+capture into any strategy, either as fast as possible or paced in real
+time. :func:`read_events` converts a capture to the event tuples of
+:mod:`backtest`, so ``backtest.load_events`` accepts ``.qcr`` files too.
+
+Recording never gets in the way of trading. A callback whose arguments cannot
+be recorded is still delivered; the failure is counted and logged.
+"""
+
+import math
+import mmap
+import os
+import struct
+import time
+from itertools import count
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from eventlog import get_log
+from records import GameEvent, side_code
+
+MAGIC = b"QCREC\x00\x01\x00"
+
+# record kinds; the first four match backtest's event kinds
+GAME_EVENT, ORDERBOOK, SNAPSHOT, TRADE, ACCOUNT, STRING = range(6)
+
+NO_STRING = 0xFFFFFFFF
+# flags of a game event whose float fields were None
+NO_X, NO_Y, NO_TIME = 1, 2, 4
+
+# kind, ticker, side, ts, quantity, price
+BOOK = struct.Struct("<BBBxqdd")
+# kind, ticker, side, ts, price, quantity, capital
+FILL = struct.Struct("<BBBxqddd")
+# kind, flags, ts, home, away, 7 string ids, x, y, time
+GAME = struct.Struct("<BBxxqii7Iddd")
+# kind, ticker, n_bids, n_asks, ts
+SNAP = struct.Struct("<BBxxIIq")
+LEVEL = struct.Struct("<dd")
+# kind, id, byte length
+STR = struct.Struct("<BxxxII")
+
+_session_ids = count()
+
+
+def recording_dir() -> Optional[str]:
+    """Directory named by ``QC_RECORD_DIR``, or None when recording is off."""
+    return os.environ.get("QC_RECORD_DIR") or None
+
+
+def session_path(directory: str) -> str:
+    """A fresh capture path in ``directory`` for the current process."""
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(directory, f"session-{stamp}-{os.getpid()}-{next(_session_ids)}.qcr")
+
+
+class Recorder:
+    """Appends strategy callbacks to a binary capture file.
+
+    Parameters
+    ----------
+    path
+        Capture file; created, or appended to if it already exists
+    clock
+        Nanosecond clock stamped on every record
+    """
+
+    def __init__(self, path: str, clock: Callable[[], int] = time.monotonic_ns) -> None:
+        self.path = path
+        self.clock = clock
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "ab", buffering=1 << 16)
+        if new:
+            self._file.write(MAGIC)
+        self._strings: Dict[str, int] = {}
+        self.records = 0
+        self.errors = 0
+
+    def _string(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        sid = self._strings.get(value)
+        if sid is None:
+            sid = self._strings[value] = len(self._strings)
+            data = value.encode()
+            self._file.write(STR.pack(STRING, sid, len(data)))
+            self._file.write(data)
+        return sid
+
+    def orderbook(self, ticker, side, quantity: float, price: float) -> None:
+        self._file.write(BOOK.pack(ORDERBOOK, side_code(ticker), side_code(side), self.clock(), quantity, price))
+        self.records += 1
+
+    def trade(self, ticker, side, quantity: float, price: float) -> None:
+        self._file.write(BOOK.pack(TRADE, side_code(ticker), side_code(side), self.clock(), quantity, price))
+        self.records += 1
+
+    def account(self, ticker, side, price: float, quantity: float, capital_remaining: float) -> None:
+        self._file.write(
+            FILL.pack(ACCOUNT, side_code(ticker), side_code(side), self.clock(), price, quantity, capital_remaining)
+        )
+        self.records += 1
+
+    def game_event(
+        self,
+        event_type,
+        home_away,
+        home_score,
+        away_score,
+        player_name,
+        substituted_player_name,
+        shot_type,
+        assist_player,
+        rebound_type,
+        coordinate_x,
+        coordinate_y,
+        time_seconds,
+    ) -> None:
+        s = self._string
+        flags = (coordinate_x is None) * NO_X | (coordinate_y is None) * NO_Y | (time_seconds is None) * NO_TIME
+        self._file.write(
+            GAME.pack(
+                GAME_EVENT,
+                flags,
+                self.clock(),
+                int(home_score),
+                int(away_score),
+                s(event_type),
+                s(home_away),
+                s(player_name),
+                s(substituted_player_name),
+                s(shot_type),
+                s(assist_player),
+                s(rebound_type),
+                math.nan if coordinate_x is None else coordinate_x,
+                math.nan if coordinate_y is None else coordinate_y,
+                math.nan if time_seconds is None else time_seconds,
+            )
+        )
+        self.records += 1
+
+    def snapshot(self, ticker, bids, asks) -> None:
+        bids, asks = list(bids), list(asks)
+        levels = [x for level in bids for x in level] + [x for level in asks for x in level]
+        # pack everything before writing so a bad level never leaves half a record
+        header = SNAP.pack(SNAPSHOT, side_code(ticker), len(bids), len(asks), self.clock())
+        body = struct.pack(f"<{len(levels)}d", *levels)
+        self._file.write(header)
+        self._file.write(body)
+        self.records += 1
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def _safe(self, write: Callable, *args) -> None:
+        """Call one of the record methods, counting and logging instead of raising."""
+        try:
+            write(*args)
+        except Exception as exc:
+            self.errors += 1
+            get_log().error("record_failed", path=self.path, record=write.__name__, error=repr(exc))
+
+    def attach(self, strategy) -> "Recorder":
+        """Record every exchange callback of ``strategy`` before it runs.
+
+        The file is flushed at ``END_GAME`` so a finished game is always
+        complete on disk.
+        """
+        on_orderbook = strategy.on_orderbook_update
+        on_trade = strategy.on_trade_update
+        on_account = strategy.on_account_update
+        on_game = strategy.on_game_event_update
+        on_snapshot = strategy.on_orderbook_snapshot
+        safe = self._safe
+
+        def on_orderbook_update(ticker, side, quantity, price):
+            safe(self.orderbook, ticker, side, quantity, price)
+            return on_orderbook(ticker, side, quantity, price)
+
+        def on_trade_update(ticker, side, quantity, price):
+            safe(self.trade, ticker, side, quantity, price)
+            return on_trade(ticker, side, quantity, price)
+
+        def on_account_update(ticker, side, price, quantity, capital_remaining):
+            safe(self.account, ticker, side, price, quantity, capital_remaining)
+            return on_account(ticker, side, price, quantity, capital_remaining)
+
+        def on_game_event_update(*args):
+            safe(self.game_event, *args)
+            if args[0] == "END_GAME":
+                safe(self.flush)
+            return on_game(*args)
+
+        def on_orderbook_snapshot(ticker, bids, asks):
+            safe(self.snapshot, ticker, bids, asks)
+            return on_snapshot(ticker, bids, asks)
+
+        strategy.on_orderbook_update = on_orderbook_update
+        strategy.on_trade_update = on_trade_update
+        strategy.on_account_update = on_account_update
+        strategy.on_game_event_update = on_game_event_update
+        strategy.on_orderbook_snapshot = on_orderbook_snapshot
+        return self
+
+
+Record = Tuple[int, int, tuple]  # (kind, timestamp ns, payload)
+
+
+class Capture:
+    """Memory-mapped view of a capture file.
+
+    Iterating yields ``(kind, timestamp_ns, payload)`` where the payload is
+    ``(ticker, side, quantity, price)`` for ``ORDERBOOK``/``TRADE``,
+    ``(ticker, side, price, quantity, capital)`` for ``ACCOUNT``, the twelve
+    callback arguments for ``GAME_EVENT`` and ``(ticker, bids, asks)`` for
+    ``SNAPSHOT``. A truncated final record (a capture still being written)
+    ends the iteration.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if self._buf[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a capture file")
+
+    def close(self) -> None:
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+    def __enter__(self) -> "Capture":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[Record]:
+        buf = self._buf
+        end = len(buf)
+        pos = len(MAGIC)
+        # keyed by id: a file appended to by several recorders redefines ids
+        strings: Dict[int, str] = {}
+
+        def s(sid: int) -> Optional[str]:
+            return None if sid == NO_STRING else strings[sid]
+
+        while pos < end:
+            kind = buf[pos]
+            try:
+                if kind == ORDERBOOK or kind == TRADE:
+                    _, ticker, side, ts, quantity, price = BOOK.unpack_from(buf, pos)
+                    pos += BOOK.size
+                    yield kind, ts, (ticker, side, quantity, price)
+                elif kind == GAME_EVENT:
+                    fields = GAME.unpack_from(buf, pos)
+                    pos += GAME.size
+                    flags = fields[1]
+                    x, y, t = fields[12:15]
+                    yield kind, fields[2], (
+                        s(fields[5]),
+                        s(fields[6]),
+                        fields[3],
+                        fields[4],
+                        s(fields[7]),
+                        s(fields[8]),
+                        s(fields[9]),
+                        s(fields[10]),
+                        s(fields[11]),
+                        None if flags & NO_X else x,
+                        None if flags & NO_Y else y,
+                        None if flags & NO_TIME else t,
+                    )
+                elif kind == SNAPSHOT:
+                    _, ticker, n_bids, n_asks, ts = SNAP.unpack_from(buf, pos)
+                    pos += SNAP.size
+                    bids = list(LEVEL.iter_unpack(buf[pos:pos + n_bids * LEVEL.size]))
+                    pos += n_bids * LEVEL.size
+                    asks = list(LEVEL.iter_unpack(buf[pos:pos + n_asks * LEVEL.size]))
+                    pos += n_asks * LEVEL.size
+                    if pos > end:
+                        return
+                    yield kind, ts, (ticker, bids, asks)
+                elif kind == ACCOUNT:
+                    _, ticker, side, ts, price, quantity, capital = FILL.unpack_from(buf, pos)
+                    pos += FILL.size
+                    yield kind, ts, (ticker, side, price, quantity, capital)
+                elif kind == STRING:
+                    _, sid, length = STR.unpack_from(buf, pos)
+                    pos += STR.size
+                    if pos + length > end:
+                        return
+                    strings[sid] = bytes(buf[pos:pos + length]).decode()
+                    pos += length
+                else:
+                    raise ValueError(f"{self.path}: unknown record kind {kind} at byte {pos}")
+            except struct.error:
+                return
+
+
+def replay(path: str, strategy, module, speed: Optional[float] = None, include_account: bool = True) -> int:
+    """Feed a capture into ``strategy``.
+
+    Parameters
+    ----------
+    path
+        Capture file
+    strategy
+        Any strategy instance
+    module
+        Strategy module, for its ``Side`` and ``Ticker`` enums
+    speed
+        None replays as fast as possible; otherwise the recorded gaps are
+        reproduced, divided by ``speed`` (1.0 is real time)
+    include_account
+        Also replay our own recorded fills through ``on_account_update``
+
+    Returns
+    -------
+    records
+        Number of callbacks made
+    """
+    sides = tuple(module.Side)
+    tickers = tuple(module.Ticker)
+    calls = 0
+    start = first = None
+    with Capture(path) as capture:
+        for kind, ts, payload in capture:
+            if kind == ACCOUNT and not include_account:
+                continue
+            if speed is not None:
+                if first is None:
+                    start, first = time.monotonic_ns(), ts
+                delay = (start + (ts - first) / speed - time.monotonic_ns()) / 1e9
+                if delay > 0:
+                    time.sleep(delay)
+            if kind == ORDERBOOK:
+                ticker, side, quantity, price = payload
+                strategy.on_orderbook_update(tickers[ticker], sides[side], quantity, price)
+            elif kind == TRADE:
+                ticker, side, quantity, price = payload
+                strategy.on_trade_update(tickers[ticker], sides[side], quantity, price)
+            elif kind == GAME_EVENT:
+                strategy.on_game_event_update(*payload)
+            elif kind == SNAPSHOT:
+                ticker, bids, asks = payload
+                strategy.on_orderbook_snapshot(tickers[ticker], bids, asks)
+            else:
+                ticker, side, price, quantity, capital = payload
+                strategy.on_account_update(tickers[ticker], sides[side], price, quantity, capital)
+            calls += 1
+    return calls
+
+
+def read_events(path: str) -> List[tuple]:
+    """Market and game records of a capture as :func:`backtest.load_events` tuples.
+
+    Our own recorded fills are dropped; the backtester simulates its own.
+    """
+    events: List[tuple] = []
+    with Capture(path) as capture:
+        for kind, _, payload in capture:
+            if kind == ORDERBOOK or kind == TRADE:
+                _, side, quantity, price = payload
+                events.append((kind, side, quantity, price))
+            elif kind == GAME_EVENT:
+                events.append((GAME_EVENT, GameEvent(*payload)))
+            elif kind == SNAPSHOT:
+                _, bids, asks = payload
+                events.append((SNAPSHOT, tuple(bids), tuple(asks)))
+    return events
@@ -0,0 +1,171 @@
+"""Compact records for game events and orders, with enum values as small ints.
+
+The exchange hands game events to ``on_game_event_update`` as twelve loose
+arguments whose categorical fields are strings. :func:`event_code` and
+friends turn those into small integer codes with one dict lookup each, so
+the strategies' hot-path checks are int compares. :class:`GameEvent` stores
+a whole event in one slotted object and interns player names, so a replay
+holds one copy of each name rather than one per event.
+
+:class:`Order` is the slotted record :class:`orders.OrderRegistry` keeps per
+open order, in place of a four-key dict.
+"""
+
+import sys
+from enum import IntEnum
+from typing import Dict, Optional, Tuple
+
+
+class EventCode(IntEnum):
+    JUMP_BALL = 0
+    SCORE = 1
+    MISSED = 2
+    REBOUND = 3
+    STEAL = 4
+    BLOCK = 5
+    TURNOVER = 6
+    FOUL = 7
+    TIMEOUT = 8
+    SUBSTITUTION = 9
+    START_PERIOD = 10
+    END_PERIOD = 11
+    END_GAME = 12
+    DEADBALL = 13
+    NOTHING = 14
+    UNKNOWN = 15
+
+
+class TeamCode(IntEnum):
+    HOME = 0
+    AWAY = 1
+    UNKNOWN = 2
+
+
+class ShotCode(IntEnum):
+    NONE = 0
+    THREE_POINT = 1
+    TWO_POINT = 2
+    FREE_THROW = 3
+    DUNK = 4
+    LAYUP = 5
+
+
+class SideCode(IntEnum):
+    BUY = 0
+    SELL = 1
+
+
+# keyed by the exact strings the exchange sends; plain ints as values so
+# comparisons never go through the enum machinery
+_EVENT_CODES: Dict[Optional[str], int] = {code.name: int(code) for code in EventCode}
+_TEAM_CODES: Dict[Optional[str], int] = {"home": TeamCode.HOME.value, "away": TeamCode.AWAY.value}
+_SHOT_CODES: Dict[Optional[str], int] = {code.name: int(code) for code in ShotCode if code}
+
+EVENT_NAMES: Tuple[str, ...] = tuple(code.name for code in EventCode)
+TEAM_NAMES: Tuple[str, ...] = ("home", "away", "unknown")
+SHOT_NAMES: Tuple[Optional[str], ...] = (None, *(code.name for code in ShotCode if code))
+
+
+def event_code(event_type: Optional[str]) -> int:
+    return _EVENT_CODES.get(event_type, EventCode.UNKNOWN.value)
+
+
+def team_code(home_away: Optional[str]) -> int:
+    return _TEAM_CODES.get(home_away, TeamCode.UNKNOWN.value)
+
+
+def shot_code(shot_type: Optional[str]) -> int:
+    return _SHOT_CODES.get(shot_type, ShotCode.NONE.value)
+
+
+def side_code(side) -> int:
+    """0 for buy, 1 for sell, from a ``Side`` enum member or an int code."""
+    return getattr(side, "value", side)
+
+
+def _intern(name: Optional[str]) -> Optional[str]:
+    return sys.intern(name) if name is not None else None
+
+
+class GameEvent:
+    """One game event, with categorical fields stored as codes.
+
+    Unrecognised event types are stored as ``UNKNOWN`` and unrecognised
+    shot types as ``NONE``; :meth:`args` reproduces every other field
+    exactly.
+    """
+
+    __slots__ = (
+        "code",
+        "team",
+        "home_score",
+        "away_score",
+        "player",
+        "substituted",
+        "shot",
+        "assist",
+        "rebound",
+        "x",
+        "y",
+        "time",
+    )
+
+    def __init__(
+        self,
+        event_type: Optional[str],
+        home_away: Optional[str],
+        home_score: int,
+        away_score: int,
+        player_name: Optional[str] = None,
+        substituted_player_name: Optional[str] = None,
+        shot_type: Optional[str] = None,
+        assist_player: Optional[str] = None,
+        rebound_type: Optional[str] = None,
+        coordinate_x: Optional[float] = None,
+        coordinate_y: Optional[float] = None,
+        time_seconds: Optional[float] = None,
+    ) -> None:
+        self.code = event_code(event_type)
+        self.team = team_code(home_away)
+        self.home_score = home_score
+        self.away_score = away_score
+        self.player = _intern(player_name)
+        self.substituted = _intern(substituted_player_name)
+        self.shot = shot_code(shot_type)
+        self.assist = _intern(assist_player)
+        self.rebound = _intern(rebound_type)
+        self.x = coordinate_x
+        self.y = coordinate_y
+        self.time = time_seconds
+
+    def args(self) -> tuple:
+        """The twelve arguments of ``Strategy.on_game_event_update``."""
+        return (
+            EVENT_NAMES[self.code],
+            TEAM_NAMES[self.team],
+            self.home_score,
+            self.away_score,
+            self.player,
+            self.substituted,
+            SHOT_NAMES[self.shot],
+            self.assist,
+            self.rebound,
+            self.x,
+            self.y,
+            self.time,
+        )
+
+
+class Order:
+    """One of our open orders. ``side`` is the caller's side object; ``side_code`` its int code."""
+
+    __slots__ = ("order_id", "side", "side_code", "price", "tick", "qty", "placed_at_time")
+
+    def __init__(self, order_id: int, side, price: float, tick: int, qty: float, placed_at_time: float) -> None:
+        self.order_id = order_id
+        self.side = side
+        self.side_code = side_code(side)
+        self.price = price
+        self.tick = tick
+        self.qty = qty
+        self.placed_at_time = placed_at_time
@@ -0,0 +1,187 @@
+"""Pre-trade risk checks answered in constant time from incrementally kept totals.
+
+:class:`RiskEngine` keeps the filled position and, for our resting limit
+orders, the quantity and the capital at risk on each side. Each total is
+updated once per placement, cancel or fill, so a pre-trade check is a few
+comparisons. A contract settles at 0 or 100, so buying at ``p`` risks ``p``
+per unit and selling at ``p`` risks ``100 - p``.
+
+The position limit applies to the worst case, where every resting order on
+the order's side fills. Quantity that only closes the current position
+carries no new risk. Such quantity passes the notional limits and is the only
+quantity allowed once the kill switch has tripped.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from records import SideCode, side_code
+
+SETTLE_HIGH = 100.0
+
+BUY = SideCode.BUY.value
+SELL = SideCode.SELL.value
+
+
+@dataclass
+class RiskLimits:
+    """Hard limits; ``math.inf`` disables a limit."""
+
+    max_position: float = math.inf  # |position| if every resting order on a side fills
+    max_resting_per_side: float = math.inf  # resting limit-order quantity per side
+    max_order_qty: float = math.inf
+    max_notional: float = math.inf  # capital at risk in resting orders plus the new order
+    max_loss: float = math.inf  # trip the kill switch when equity, marked at each fill, falls this far
+
+
+class RiskEngine:
+    """Position, resting exposure and capital at risk, with O(1) pre-trade checks.
+
+    Parameters
+    ----------
+    limits
+        Limits to enforce
+    capital
+        Starting capital, the reference for ``max_loss``
+    """
+
+    def __init__(self, limits: RiskLimits, capital: float) -> None:
+        self.limits = limits
+        self.reset(capital)
+
+    def reset(self, capital: float) -> None:
+        """Start a new game: flat, no resting orders, kill switch cleared."""
+        self.start_capital = capital
+        self.capital = capital
+        self.position = 0.0
+        self.resting = [0.0, 0.0]
+        self.at_risk = [0.0, 0.0]
+        # order_id -> [side code, price, remaining qty]
+        self._orders: Dict[int, List] = {}
+        self.killed: Optional[str] = None
+        self.rejected: Dict[str, int] = {}
+
+    # -- checks ----------------------------------------------------------------
+
+    def _closing(self, code: int) -> float:
+        """Quantity an order on side ``code`` can trade purely to reduce the position."""
+        return self.position if code == SELL else -self.position
+
+    def check(self, side, qty: float, price: float, resting: bool = True) -> Optional[str]:
+        """Name of the first limit an order would break, or None if it may be sent.
+
+        Parameters
+        ----------
+        side
+            Order side, a ``Side`` member or an int code
+        qty
+            Order quantity
+        price
+            Limit price, or the expected execution price of a market order
+        resting
+            False for market and IOC orders, which never rest on the book
+        """
+        code = side_code(side)
+        limits = self.limits
+        opening = qty - max(self._closing(code), 0.0)
+        if self.killed is not None and opening > 0:
+            return "killed"
+        if qty > limits.max_order_qty:
+            return "order_qty"
+        if code == BUY:
+            worst = self.position + self.resting[BUY] + qty
+        else:
+            worst = self.resting[SELL] + qty - self.position
+        if worst > limits.max_position:
+            return "position"
+        if resting and self.resting[code] + qty > limits.max_resting_per_side:
+            return "resting"
+        if opening > 0:
+            unit = price if code == BUY else SETTLE_HIGH - price
+            if self.at_risk[BUY] + self.at_risk[SELL] + opening * unit > limits.max_notional:
+                return "notional"
+        return None
+
+    def allow(self, side, qty: float, price: float, resting: bool = True) -> bool:
+        """:meth:`check`, counting rejections by reason."""
+        reason = self.check(side, qty, price, resting)
+        if reason is None:
+            return True
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        return False
+
+    def headroom(self, side) -> float:
+        """Largest quantity on ``side`` the position and per-side limits still allow."""
+        code = side_code(side)
+        limits = self.limits
+        if code == BUY:
+            room = limits.max_position - self.position - self.resting[BUY]
+        else:
+            room = limits.max_position + self.position - self.resting[SELL]
+        room = min(room, limits.max_order_qty, limits.max_resting_per_side - self.resting[code])
+        if self.killed is not None:
+            room = min(room, max(self._closing(code), 0.0))
+        return max(room, 0.0)
+
+    # -- updates -----------------------------------------------------------------
+
+    def on_place(self, order_id: int, side, price: float, qty: float) -> None:
+        """A limit order was accepted and may rest on the book."""
+        code = side_code(side)
+        self._orders[order_id] = [code, price, qty]
+        self.resting[code] += qty
+        self.at_risk[code] += qty * (price if code == BUY else SETTLE_HIGH - price)
+
+    def _release(self, order: List, qty: float) -> None:
+        code, price = order[0], order[1]
+        order[2] -= qty
+        self.resting[code] -= qty
+        self.at_risk[code] -= qty * (price if code == BUY else SETTLE_HIGH - price)
+
+    def on_cancel(self, order_id: int) -> None:
+        """One of our resting orders was cancelled or expired."""
+        order = self._orders.pop(order_id, None)
+        if order is not None:
+            self._release(order, order[2])
+            self._settle_totals()
+
+    def on_fill(self, order_id: Optional[int], side, price: float, qty: float, capital: float) -> None:
+        """Apply a fill; ``order_id`` is the resting order it matched, or None for market orders."""
+        code = side_code(side)
+        self.position += qty if code == BUY else -qty
+        self.capital = capital
+        order = self._orders.get(order_id) if order_id is not None else None
+        if order is not None:
+            self._release(order, min(qty, order[2]))
+            if order[2] <= 0:
+                del self._orders[order_id]
+                self._settle_totals()
+        if self.killed is None and self.start_capital - (capital + self.position * price) > self.limits.max_loss:
+            self.kill("max_loss")
+
+    def _settle_totals(self) -> None:
+        # running sums pick up rounding error; with nothing resting they are exactly zero
+        if not self._orders:
+            self.resting = [0.0, 0.0]
+            self.at_risk = [0.0, 0.0]
+
+    # -- kill switch ---------------------------------------------------------------
+
+    def kill(self, reason: str = "manual") -> None:
+        """Allow only orders that reduce the position until :meth:`resume`."""
+        if self.killed is None:
+            self.killed = reason
+
+    def resume(self) -> None:
+        self.killed = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "position": self.position,
+            "resting_buy": self.resting[BUY],
+            "resting_sell": self.resting[SELL],
+            "at_risk": self.at_risk[BUY] + self.at_risk[SELL],
+            "killed": self.killed,
+            **{f"rejected_{reason}": n for reason, n in self.rejected.items()},
+        }
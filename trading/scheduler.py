@@ -0,0 +1,105 @@
+"""Coalescing scheduler for strategy reevaluation.
+
+Callbacks arrive in bursts (a trade, then the book updates it caused, then a
+snapshot), and each one used to trigger a full reevaluation even when the
+inputs had not changed. Callbacks now call :meth:`EvalScheduler.mark`
+instead. The scheduler evaluates at most once per ``min_interval`` seconds,
+or at once for urgent events (scores, end of game). It also skips an
+evaluation whose inputs, as summarised by ``state_key``, are the same as
+the last one it ran.
+
+There is no timer thread. An evaluation deferred by ``min_interval`` runs on
+the first :meth:`~EvalScheduler.mark` or :meth:`~EvalScheduler.poll` after
+the interval has passed, so strategies should poll from callbacks that do
+not otherwise evaluate.
+"""
+
+import time
+from typing import Callable, Dict, Hashable, Optional
+
+
+class EvalScheduler:
+    """Run ``evaluate`` only when something changed and the interval allows.
+
+    Parameters
+    ----------
+    evaluate
+        The reevaluation to schedule
+    state_key
+        Returns a hashable summary of the evaluation's inputs; an evaluation
+        whose key equals the previous one is skipped. None disables the check.
+    min_interval
+        Minimum seconds between non-urgent evaluations; 0 disables coalescing
+        by time
+    clock
+        Monotonic clock in seconds
+    """
+
+    def __init__(
+        self,
+        evaluate: Callable[[], object],
+        state_key: Optional[Callable[[], Hashable]] = None,
+        min_interval: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.evaluate = evaluate
+        self.state_key = state_key
+        self.min_interval = min_interval
+        self.clock = clock
+        self.dirty = False
+        self._last_run = float("-inf")
+        self._last_key: Hashable = object()
+        self.marked = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.unchanged = 0
+        self.urgent = 0
+
+    def mark(self, urgent: bool = False) -> bool:
+        """Record that inputs may have changed and evaluate if allowed.
+
+        Returns
+        -------
+        evaluated
+            True if the evaluation ran
+        """
+        self.marked += 1
+        self.dirty = True
+        if urgent:
+            self.urgent += 1
+            return self._run(force=True)
+        return self.poll()
+
+    def poll(self) -> bool:
+        """Run a pending evaluation once ``min_interval`` has passed."""
+        if not self.dirty:
+            return False
+        if self.min_interval > 0 and self.clock() - self._last_run < self.min_interval:
+            self.coalesced += 1
+            return False
+        return self._run(force=False)
+
+    def _run(self, force: bool) -> bool:
+        self.dirty = False
+        if self.state_key is not None:
+            key = self.state_key()
+            if not force and key == self._last_key:
+                self.unchanged += 1
+                return False
+            self._last_key = key
+        self._last_run = self.clock()
+        self.executed += 1
+        self.evaluate()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "marked": self.marked,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "unchanged": self.unchanged,
+            "urgent": self.urgent,
+        }
+
+    def reset_stats(self) -> None:
+        self.marked = self.executed = self.coalesced = self.unchanged = self.urgent = 0
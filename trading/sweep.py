@@ -0,0 +1,273 @@
+"""Parallel parameter sweeps over recorded games.
+
+Every (game, parameter set) pair is one task. Tasks only carry a game path and
+a small parameter dict; each worker process imports the strategy once and
+keeps the games it has parsed, so the per-task cost is the replay itself and
+throughput scales with the number of worker processes.
+
+Besides PnL and fills, each row reports the strategy's callback latency,
+measured inside the worker. ``callback_ns_per_event`` is the time spent in
+the exchange callbacks divided by the number of recorded events.
+``callback_p50_ns`` and ``callback_p99_ns`` are percentiles over individual
+callback calls, from a :class:`profiler.Histogram`. ``elapsed_sec`` is the
+wall time of the whole replay, including the matching engine.
+
+Usage::
+
+    python sweep.py template.py games/*.jsonl \\
+        --grid gamma=0.02,0.05,0.1 --grid half_spread=0.5,1.0 --out sweep.csv
+
+    python sweep.py template.py games/*.jsonl \\
+        --uniform min_edge=5:20 --uniform take_profit_threshold=1:5 --samples 200
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import random
+import sys
+from dataclasses import asdict
+from multiprocessing import Pool
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from time import perf_counter_ns
+
+from backtest import load_events, load_strategy_module, run_backtest
+from profiler import CALLBACKS, Histogram
+
+Params = Dict[str, Any]
+
+RESULT_COLUMNS = (
+    "game",
+    "param_id",
+    "pnl",
+    "position",
+    "fills",
+    "filled_qty",
+    "orders_placed",
+    "orders_cancelled",
+    "events",
+    "elapsed_sec",
+    "callback_ns_per_event",
+    "callback_p50_ns",
+    "callback_p99_ns",
+)
+
+
+def grid(space: Dict[str, Sequence[Any]]) -> Iterator[Params]:
+    """Yield every combination of a parameter grid.
+
+    Parameters
+    ----------
+    space
+        Mapping of parameter name to the values to try
+    """
+    names = list(space)
+    for values in itertools.product(*(space[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def random_search(space: Dict[str, Any], n_samples: int, seed: int = 0) -> Iterator[Params]:
+    """Yield ``n_samples`` random parameter sets.
+
+    Parameters
+    ----------
+    space
+        Mapping of parameter name to either a ``(low, high)`` tuple, sampled
+        uniformly (as integers when both bounds are ints), or a list of choices
+    n_samples
+        Number of parameter sets to draw
+    seed
+        Seed for the sampler, so a search can be reproduced
+    """
+    rng = random.Random(seed)
+    for _ in range(n_samples):
+        params = {}
+        for name, dist in space.items():
+            if isinstance(dist, tuple):
+                low, high = dist
+                if isinstance(low, int) and isinstance(high, int):
+                    params[name] = rng.randint(low, high)
+                else:
+                    params[name] = rng.uniform(low, high)
+            else:
+                params[name] = rng.choice(dist)
+        yield params
+
+
+class ResultsTable:
+    """Columnar store for sweep results, one list per column."""
+
+    def __init__(self, param_names: Sequence[str]) -> None:
+        self.param_names = list(param_names)
+        self.columns: Dict[str, List[Any]] = {name: [] for name in (*RESULT_COLUMNS, *self.param_names)}
+
+    def __len__(self) -> int:
+        return len(self.columns["game"])
+
+    def append(self, row: Dict[str, Any]) -> None:
+        for name, column in self.columns.items():
+            column.append(row.get(name))
+
+    def to_pandas(self):
+        import pandas as pd
+
+        return pd.DataFrame(self.columns)
+
+    def write_csv(self, path: str) -> None:
+        names = list(self.columns)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(names)
+            writer.writerows(zip(*(self.columns[name] for name in names)))
+
+
+# -- worker side -------------------------------------------------------------
+
+_worker_module = None
+_worker_games: Dict[str, List[tuple]] = {}
+
+
+def _init_worker(strategy_path: str, quiet: bool) -> None:
+    global _worker_module
+    if quiet:
+        sys.stdout = open(os.devnull, "w")
+    _worker_module = load_strategy_module(strategy_path)
+
+
+def _time_callbacks(strategy, hist: Histogram, spent: List[int]) -> None:
+    """Record every exchange callback of ``strategy`` into ``hist`` and add its time to ``spent[0]``."""
+    for name in CALLBACKS:
+        fn = getattr(strategy, name)
+
+        def timed(*args, fn=fn):
+            start = perf_counter_ns()
+            try:
+                return fn(*args)
+            finally:
+                elapsed = perf_counter_ns() - start
+                hist.record(elapsed)
+                spent[0] += elapsed
+
+        setattr(strategy, name, timed)
+
+
+def _run_task(task: Tuple[str, int, Params]) -> Dict[str, Any]:
+    game, param_id, params = task
+    events = _worker_games.get(game)
+    if events is None:
+        events = _worker_games[game] = load_events(game)
+
+    module = _worker_module
+    hist = Histogram()
+    spent = [0]
+
+    def factory():
+        strategy = module.Strategy(module.StrategyParams(**params)) if params else module.Strategy()
+        _time_callbacks(strategy, hist, spent)
+        return strategy
+
+    result = run_backtest(module, events, factory)
+    return {
+        "game": game,
+        "param_id": param_id,
+        **params,
+        **asdict(result),
+        "callback_ns_per_event": round(spent[0] / result.events, 1) if result.events else 0.0,
+        "callback_p50_ns": hist.percentile(50),
+        "callback_p99_ns": hist.percentile(99),
+    }
+
+
+# -- driver ------------------------------------------------------------------
+
+def run_sweep(
+    strategy_path: str,
+    games: Sequence[str],
+    param_sets: Iterable[Params],
+    workers: Optional[int] = None,
+    chunksize: int = 4,
+    quiet: bool = True,
+) -> ResultsTable:
+    """Replay every game under every parameter set across a process pool.
+
+    Parameters
+    ----------
+    strategy_path
+        Path to the strategy file; it must define ``StrategyParams`` when
+        parameter sets are non-empty
+    games
+        Recorded game files
+    param_sets
+        Parameter dicts, e.g. from :func:`grid` or :func:`random_search`
+    workers
+        Number of worker processes, defaults to the CPU count
+    chunksize
+        Tasks handed to a worker at a time
+    quiet
+        Silence the strategies' stdout inside the workers
+
+    Returns
+    -------
+    results
+        One row per (game, parameter set), in completion order
+    """
+    param_sets = list(param_sets) or [{}]
+    param_names = sorted({name for params in param_sets for name in params})
+    # Keep a game's tasks together so workers reuse the events they parsed.
+    tasks = [(game, pid, params) for game in games for pid, params in enumerate(param_sets)]
+
+    table = ResultsTable(param_names)
+    with Pool(workers, initializer=_init_worker, initargs=(strategy_path, quiet)) as pool:
+        for row in pool.imap_unordered(_run_task, tasks, chunksize=chunksize):
+            table.append(row)
+    return table
+
+
+def _parse_value(text: str) -> Any:
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Sweep strategy parameters over recorded games.")
+    parser.add_argument("strategy", help="path to the strategy file, e.g. template.py")
+    parser.add_argument("games", nargs="+", help="recorded game files (JSONL)")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...")
+    parser.add_argument("--uniform", action="append", default=[], metavar="NAME=LOW:HIGH")
+    parser.add_argument("--samples", type=int, default=50, help="random search draws when --uniform is used")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="sweep.csv")
+    args = parser.parse_args(argv)
+
+    space = {}
+    for spec in args.grid:
+        name, values = spec.split("=", 1)
+        space[name] = [_parse_value(v) for v in values.split(",")]
+    if args.uniform:
+        bounds = {}
+        for spec in args.uniform:
+            name, values = spec.split("=", 1)
+            low, high = values.split(":", 1)
+            bounds[name] = (_parse_value(low), _parse_value(high))
+        param_sets = [
+            {**fixed, **sampled}
+            for fixed in grid(space)
+            for sampled in random_search(bounds, args.samples, args.seed)
+        ]
+    else:
+        param_sets = list(grid(space))
+
+    table = run_sweep(args.strategy, args.games, param_sets, workers=args.workers)
+    table.write_csv(args.out)
+    print(f"{len(table)} runs written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
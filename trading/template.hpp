@@ -8,6 +8,10 @@
 #include <optional>
 #include <string>
 
+// Order book, order registry and win-probability model shared with the Python
+// strategies (which load them through _core); submit core.hpp alongside this file.
+#include "core.hpp"
+
 enum class Side { buy = 0, sell = 1 };
 enum class Ticker : std::uint8_t { TEAM_A = 0 }; // NOLINT
 
@@ -64,8 +68,16 @@ public:
    */
   void reset_state() {
     // Add any state reset logic here
+    book.clear();
+    open_orders.clear();
+    win_probability = 0.5;
   }
 
+  qc::OrderBook book;
+  qc::OrderRegistry open_orders;
+  qc::WinProbModel win_model = qc::WinProbModel::template_preset();
+  double win_probability = 0.5; // of the home team, as of the last timed event
+
   Strategy() {
     // Your initialization code goes here
     reset_state();
@@ -94,7 +106,9 @@ public:
    * @param price Price of orderbook that has an update
    */
   void on_orderbook_update(Ticker ticker, Side side, float quantity,
-                           float price) {}
+                           float price) {
+    book.update(side == Side::buy, price, quantity);
+  }
 
   /**
    * Called whenever one of your orders is filled.
@@ -106,7 +120,9 @@ public:
    * @param capital_remaining Amount of capital after fulfilling order
    */
   void on_account_update(Ticker ticker, Side side, float price, float quantity,
-                         float capital_remaining) {}
+                         float capital_remaining) {
+    open_orders.match_fill(static_cast<int>(side), price, quantity);
+  }
 
   /**
    * Called whenever a basketball game event occurs.
@@ -146,5 +162,9 @@ public:
       reset_state();
       return;
     }
+
+    if (time_seconds) {
+      win_probability = win_model.prob(home_score - away_score, *time_seconds);
+    }
   }
 };
@@ -1,7 +1,21 @@
-from enum import Enum, IntEnum, StrEnum, auto
 import math
+import time
+from dataclasses import dataclass
+from enum import Enum, IntEnum, StrEnum, auto
 from typing import Optional
 
+from eventlog import get_log
+from gamestate import POSSESSION, GameState
+from orderbook import OrderBook, SnapshotMonitor
+from orders import OrderRegistry
+from profiler import Profiler, profiling_enabled
+from quoting import AvellanedaStoikov
+from recorder import Recorder, recording_dir, session_path
+from risk import RiskEngine, RiskLimits
+from scheduler import EvalScheduler
+from records import EventCode, event_code, shot_code, team_code
+from winprob import get_model
+
 class UpperStrEnum(StrEnum):
     @staticmethod
     def _generate_next_value_(name,*args):
@@ -47,6 +61,33 @@ class TradeSetting(IntEnum):
     INITIAL_CAPITAL = 100_000
     TAKE_PROFIT_THRESHOLD = 2
 
+GAME_LENGTH_SEC = 2880.0
+
+@dataclass
+class StrategyParams:
+    """Per-instance strategy parameters. Defaults mirror TradeSetting."""
+    min_edge: float = int(TradeSetting.MIN_EDGE)
+    max_edge: float = int(TradeSetting.MAX_EDGE)
+    max_exposure_pct: float = int(TradeSetting.MAX_EXPOSURE_PCT)
+    max_orders_per_side: int = int(TradeSetting.MAX_ORDERS_PER_SIDE)
+    order_lifetime_sec: float = int(TradeSetting.ORDER_LIFETIME_SEC)
+    spread_capture_threshold: float = int(TradeSetting.SPREAD_CAPTURE_THRESHOLD)
+    initial_capital: float = int(TradeSetting.INITIAL_CAPITAL)
+    take_profit_threshold: float = int(TradeSetting.TAKE_PROFIT_THRESHOLD)
+    gamma: float = 0.05 # Avellaneda-Stoikov risk aversion per unit of position
+    half_spread: float = 0.5 # minimum market making distance from the reservation price
+    max_half_spread: float = 10.0
+    max_skew: float = 10.0 # cap on the inventory shift of the reservation price
+    fill_decay: float = 1.5 # k: how fast fill probability decays with distance from the reservation price
+    risk_horizon_sec: float = 60.0 # cap on the seconds of inventory risk priced into the quotes
+    vol_window: int = 50 # fair value changes in the rolling volatility estimate
+    eval_min_interval_sec: float = 0.0 # coalesce non-urgent reevaluations within this many clock() seconds
+    max_resting_per_side: float = math.inf # resting limit-order quantity per side
+    max_notional: float = math.inf # capital at risk in resting orders
+    max_loss: float = math.inf # kill switch: only position-reducing orders after losing this much
+    win_model: str = "template" # winprob preset name or path to a fitted .npz
+    profile: bool = False # time callbacks and dump a summary at END_GAME (or set QC_PROFILE=1)
+
 class Side(Enum):
     BUY = 0
     SELL = 1
@@ -109,6 +150,13 @@ def cancel_order(ticker: Ticker, order_id: int) -> bool:
     """
     return 0
 
+def clock() -> float:
+    """Monotonic time in seconds for the message budget and re-quote coalescing.
+
+    The backtester rebinds this to replay time, so replays are deterministic.
+    """
+    return time.monotonic()
+
 class Strategy:
     def reset_state(self) -> None:
         """Reset the state of the strategy to the start of game position.
@@ -118,53 +166,50 @@ class Strategy:
         """
         self.position = 0
         self.win_probability = 0.5 # natural
-        self.bids = [] # bids order from the orderbook
-        self.asks = [] # asks order from the orderbook
+        self.book = OrderBook() # price-level view of the exchange orderbook
+        self.snapshots = SnapshotMonitor() # drift between the delta stream and snapshots
+        self.quoter.reset() # volatility is estimated per game
         
         self.home_score = 0 
         self.away_score = 0
-        self.time_seconds = 2880.0
-        self.last_event_time = 2880.0
-        # self.possession_team = "unknown"
-        self.open_orders  = {}
-        self.capital_remaining = TradeSetting.INITIAL_CAPITAL
+        self.time_seconds = GAME_LENGTH_SEC
+        self.last_event_time = GAME_LENGTH_SEC
+        self.game = GameState() # possession, runs, shooting, fouls and pace, see gamestate.py
+        self.open_orders = OrderRegistry()
+        self.capital_remaining = self.params.initial_capital
         self.avg_entry_price = 0.0
-        
-        
-        # self.shot_attempts = defaultdict(int)
-        # self.shot_makes = defaultdict(int)
-        
+        self.risk.reset(self.params.initial_capital)
+
     def get_best_bid(self) -> float: 
         """ get best bid from orderbook """
-        return self.bids[0][0] if self.bids else 0.0
+        return self.book.best_bid()
     
     def get_best_ask(self) -> float:
         """ get best ask from orderbook """
-        return self.asks[0][0] if self.asks else 100.0
+        return self.book.best_ask()
+
+    def elapsed_time(self) -> float:
+        """ game seconds elapsed at the last event, increases monotonically """
+        return GAME_LENGTH_SEC - self.last_event_time
 
     def update_win_probability(self) -> None:
         score_diff = self.home_score - self.away_score
-        time_left = max(1.0,self.time_seconds)
-
-        score_diff_scaling = 0.4
-        base_prob = 0.5 + (score_diff * score_diff_scaling) / time_left
-
-        prob = 1 / (1 + math.exp(-base_prob))
-        self.win_probability = max(0.01, min(0.99,prob))
+        self.win_probability = self.win_model.prob(score_diff, self.time_seconds, self.game.features[POSSESSION])
+        self.quoter.observe(self.elapsed_time(), self.win_probability * 100)
     
-    def calculate_order_quantity(self, edge_cents) -> float:
+    def calculate_order_quantity(self, side: Side, edge_cents) -> float:
         
         base_qty = edge_cents / 100.0
         
         scaled_qty = max(1.0,min(
          base_qty * 1.0,
          self.capital_remaining / 100 * 0.1,
-         (TradeSetting.MAX_EXPOSURE_PCT / 100.0 * TradeSetting.INITIAL_CAPITAL) / 100.0 - abs(self.position)
+         self.risk.headroom(side) # position limit net of resting orders on this side
         ))
         
         return round(scaled_qty,1)
     
-    def should_place_order(self, side: Side, limit_price: float, qty:float) -> bool:
+    def should_place_order(self, side: Side, limit_price: float, qty:float, resting: bool = True) -> bool:
         best_ask = self.get_best_ask() 
         best_bid = self.get_best_bid()
         
@@ -173,39 +218,35 @@ class Strategy:
         if side == Side.SELL and limit_price <= best_bid:
             return False
 
-        exposure_after= self.position + (qty if side == Side.BUY else -qty)
-        max_allowed = (TradeSetting.MAX_EXPOSURE_PCT/ 100.0 * TradeSetting.INITIAL_CAPITAL) / 100.0
-        if abs(exposure_after) > max_allowed:
-            return False
-        
-        return True
+        return self.risk.allow(side, qty, limit_price, resting)
     
     def place_smart_order(self,side: Side, target_price: float, edge_buffer: float, edge: int, order_type="limit") -> None:
-        if len([o for o in self.open_orders.values() if o["side"] == side]) >= TradeSetting.MAX_ORDERS_PER_SIDE:
+        if self.open_orders.count(side) >= self.params.max_orders_per_side:
             return
         
         limit_price = round(target_price - (edge_buffer if side == Side.BUY else -edge_buffer), 2)
         limit_price = max(0.01, min(99.99, limit_price))
          
-        qty = self.calculate_order_quantity(edge)
+        qty = self.calculate_order_quantity(side, edge)
         
-        if not self.should_place_order(side,limit_price,qty):
+        if not self.should_place_order(side,limit_price,qty,resting=order_type == "limit"):
             return
         
-        print(f"Order placed: type: {order_type}, side:{side.name}, target price: {target_price}, qty: {qty} ")
+        self.log.info("order", type=order_type, side=side.name, target=target_price, price=limit_price, qty=qty)
         if order_type == "limit":
             order_id = place_limit_order(side,Ticker.TEAM_A,qty,limit_price)
             
-            self.open_orders[order_id] = {
-                'side': side,
-                'price': limit_price,
-                'qty': qty,
-                'placed_at_time': self.last_event_time
-            }
+            self.open_orders.add(order_id, side, limit_price, qty, self.elapsed_time())
+            self.risk.on_place(order_id, side, limit_price, qty)
         else:
             place_market_order(side,Ticker.TEAM_A,qty)
             
         
+    def evaluation_inputs(self) -> tuple:
+        """ everything evaluate_and_trade reads that callbacks change; equal inputs are not reevaluated """
+        book = self.book
+        return (book.best_bid_tick, book.best_ask_tick, self.win_probability, self.position, self.last_event_time)
+
     def evaluate_and_trade(self) -> None:
         fair = self.win_probability * 100
         best_ask = self.get_best_ask()
@@ -214,57 +255,82 @@ class Strategy:
         sell_edge = best_bid - fair
         spread = best_ask - best_bid
 
-        stale_ids = [
-            oid for oid, o in self.open_orders.items()
-            if o["placed_at_time"] - self.last_event_time > TradeSetting.ORDER_LIFETIME_SEC
-        ]
-        
+        stale_ids = self.open_orders.pop_expired(self.elapsed_time(), self.params.order_lifetime_sec)
         for oid in stale_ids:
             cancel_order(Ticker.TEAM_A, oid)
-            self.open_orders.pop(oid,None)
+            self.risk.on_cancel(oid)
         
         if self.position != 0:
             unrealized = (fair - self.avg_entry_price) if self.position > 0 else (self.avg_entry_price - fair)
-            if unrealized > TradeSetting.TAKE_PROFIT_THRESHOLD:
+            if unrealized > self.params.take_profit_threshold:
                 close_side = Side.SELL if self.position > 0 else Side.BUY
                 close_qty = abs(self.position)
-                place_market_order(close_side, Ticker.TEAM_A, close_qty)
-                self.position = 0
-                self.avg_entry_price = 0
+                close_price = best_bid if close_side == Side.SELL else best_ask
+                if self.risk.allow(close_side, close_qty, close_price, resting=False):
+                    place_market_order(close_side, Ticker.TEAM_A, close_qty)
+                    self.position = 0
+                    self.avg_entry_price = 0
         
         
         #Market Making logic (always try to have some order in the market)
-        gamma = 0.05
-        skew = self.position * gamma
-        reservation = fair - skew
-        half_spread = 0.5
+        reservation, half_spread = self.quoter.quote(fair, self.position, self.time_seconds)
         
-        buy_orders = [o for o in self.open_orders.values() if o["side"] == Side.BUY]
-        if len(buy_orders) < TradeSetting.MAX_ORDERS_PER_SIDE:
+        if self.open_orders.count(Side.BUY) < self.params.max_orders_per_side:
             self.place_smart_order(Side.BUY,reservation,half_spread,edge=3.0)     
-        sell_orders = [o for o in self.open_orders.values() if o["side"] == Side.SELL]
-        if len(sell_orders) < TradeSetting.MAX_ORDERS_PER_SIDE:
+        if self.open_orders.count(Side.SELL) < self.params.max_orders_per_side:
             self.place_smart_order(Side.SELL,reservation,half_spread,edge=3.0)
         
         # Directional trading
-        if buy_edge > TradeSetting.MIN_EDGE:
-            order_type = "market" if buy_edge > TradeSetting.MAX_EDGE else "limit"
+        if buy_edge > self.params.min_edge:
+            order_type = "market" if buy_edge > self.params.max_edge else "limit"
             self.place_smart_order(Side.BUY,fair, edge_buffer=5.0, edge=buy_edge,order_type=order_type)
-        if sell_edge > TradeSetting.MIN_EDGE:
-            order_type = "market" if sell_edge > TradeSetting.MAX_EDGE else "limit"
+        if sell_edge > self.params.min_edge:
+            order_type = "market" if sell_edge > self.params.max_edge else "limit"
             self.place_smart_order(Side.SELL,fair, edge_buffer=5.0, edge=sell_edge,order_type=order_type)
             
         # Capturing the Spread
-        if (spread > TradeSetting.SPREAD_CAPTURE_THRESHOLD and
+        if (spread > self.params.spread_capture_threshold and
                 best_bid <  fair < best_ask
                 ):
                 self.place_smart_order(Side.BUY, fair, edge_buffer=3.0, edge=abs(buy_edge),order_type="market")
                 self.place_smart_order(Side.SELL, fair, edge_buffer=3.0, edge=abs(sell_edge), order_type="market")
             
         
-    def __init__(self) -> None:
+    def __init__(self, params: Optional[StrategyParams] = None) -> None:
         """Your initialization code goes here."""
+        self.params = params if params is not None else StrategyParams()
+        self.log = get_log()
+        self.win_model = get_model(self.params.win_model)
+        self.risk = RiskEngine(
+            RiskLimits(
+                max_position=self.params.max_exposure_pct / 100.0 * self.params.initial_capital / 100.0,
+                max_resting_per_side=self.params.max_resting_per_side,
+                max_notional=self.params.max_notional,
+                max_loss=self.params.max_loss,
+            ),
+            self.params.initial_capital,
+        )
+        self.quoter = AvellanedaStoikov(
+            gamma=self.params.gamma,
+            k=self.params.fill_decay,
+            horizon_sec=self.params.risk_horizon_sec,
+            min_half_spread=self.params.half_spread,
+            max_half_spread=self.params.max_half_spread,
+            max_skew=self.params.max_skew,
+            vol_window=self.params.vol_window,
+        )
+        # callbacks mark state dirty; the scheduler decides when evaluate_and_trade runs
+        self.scheduler = EvalScheduler(
+            lambda: self.evaluate_and_trade(),
+            state_key=self.evaluation_inputs,
+            min_interval=self.params.eval_min_interval_sec,
+            clock=clock,
+        )
         self.reset_state()
+        self.profiler = None
+        if self.params.profile or profiling_enabled():
+            self.profiler = Profiler().attach(self)
+        self.recorder = Recorder(session_path(recording_dir())).attach(self) if recording_dir() else None
 
 
     def on_trade_update(
@@ -273,7 +339,7 @@ class Strategy:
         """
         Called whenever two orders match. Could be one of your orders, or two other people's orders.
         """
-        self.evaluate_and_trade()
+        self.scheduler.mark()
 
     def on_orderbook_update(
         self, ticker: Ticker, side: Side, quantity: float, price: float
@@ -281,23 +347,8 @@ class Strategy:
         """
         Called whenever the orderbook changes. This could be because of a trade, or because of a new order, or both.
         """
-        book = self.bids if side == Side.BUY else self.asks
-        i = 0
-        while i < len(book):
-            if abs(book[i][0] - price) < 1e-5:
-                del book[i]
-            else:
-                i += 1
-        
-        if quantity > 0:
-            new_entry = (price, quantity)
-            book.append(new_entry)
-            
-            if side == Side.BUY:
-                book.sort(key=lambda x: x[0], reverse=True)
-            else:
-                book.sort(key=lambda x: x[0])
-                
+        self.book.update(side == Side.BUY, price, quantity)
+        self.scheduler.poll() # run an evaluation deferred by eval_min_interval_sec
         # if self.time_seconds < 2880.0:
         #     self.evaluate_and_trade()
 
@@ -322,15 +373,9 @@ class Strategy:
             direction = 1 if side == Side.BUY else -1
             self.avg_entry_price = (self.avg_entry_price * abs(old_position) + price * quantity * direction) / abs(self.position) if self.position != 0 else 0.0
             
-        for oid in list(self.open_orders.keys()):
-            o = self.open_orders[oid]
-            if o["side"] == side and abs(o["price"] - price) < 0.01:
-                o["qty"] -= quantity
-                if o["qty"] <= 0:
-                    del self.open_orders[oid]
-                break
-        print(f"FILLED : {side.name}, {quantity} @{price}. Position: {self.position}")
-        print(f"capital remaining: {capital_remaining}")
+        order_id = self.open_orders.match_fill(side, price, quantity)
+        self.risk.on_fill(order_id, side, price, quantity, capital_remaining)
+        self.log.info("fill", side=side.name, qty=quantity, price=price, position=self.position, capital=capital_remaining)
     
 
     def on_game_event_update(self,
@@ -355,18 +400,19 @@ class Strategy:
         if time_seconds is not None:
             self.time_seconds = time_seconds
         self.last_event_time = self.time_seconds
-        # if event_type == EventType.TURNOVER:
-        #     self.possession_team = team.AWAY if home_away == team.HOME else team.HOME
-        # elif event_type == EventType.REBOUND:
-        #    self.possession_team = home_away
-        # elif event_type == EventType.STEAL:
-        #     self.possession_team = home_away
-                
+        code = event_code(event_type)  # int compares from here on
+        self.game.update(code, team_code(home_away), home_score, away_score, shot_code(shot_type), time_seconds)
+
         self.update_win_probability()
-        self.evaluate_and_trade()
-        print(f"{event_type} {home_score} - {away_score}")
+        self.scheduler.mark(urgent=code == EventCode.SCORE or code == EventCode.END_GAME)
+        self.log.info("game", event=event_type, home=home_score, away=away_score, time=self.time_seconds, prob=self.win_probability)
 
-        if event_type == EventType.END_GAME:
+        if code == EventCode.END_GAME:
+            self.log.info("scheduler", **self.scheduler.stats())
+            self.log.info("risk", **self.risk.stats())
+            self.log.info("book", **self.snapshots.stats())
+            self.log.info("game_state", **self.game.as_dict())
+            self.scheduler.reset_stats()
             self.reset_state()
 
     def on_orderbook_snapshot(self, ticker: Ticker, bids: list, asks: list) -> None:
@@ -375,9 +421,8 @@ class Strategy:
         This provides the full current state of all bids and asks, useful for 
         verification and algorithms that need the complete market picture.
         """
-        # Reset the state of local books
-        self.bids = bids
-        self.asks = asks
-        self.evaluate_and_trade()
+        # Merge into the local book; only a new top of book can change the quotes
+        if self.snapshots.apply(self.book, bids, asks):
+            self.scheduler.mark()
         
     
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# the trading modules import each other as flat siblings
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QC_LOG_LEVEL", "OFF")
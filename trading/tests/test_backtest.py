@@ -0,0 +1,62 @@
+import os
+
+from backtest import BUY, SELL, SNAPSHOT, TRADE, Exchange, load_strategy_module
+from orderbook import NO_BID
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "template.py")
+
+
+class _Passive:
+    """Strategy that only records its fills."""
+
+    def __init__(self):
+        self.fills = []
+
+    def on_orderbook_update(self, *args):
+        pass
+
+    def on_trade_update(self, *args):
+        pass
+
+    def on_orderbook_snapshot(self, *args):
+        pass
+
+    def on_account_update(self, ticker, side, price, quantity, capital_remaining):
+        self.fills.append((side.name, price, quantity))
+
+
+def _exchange():
+    module = load_strategy_module(TEMPLATE)
+    exchange = Exchange()
+    exchange.bind(module)
+    return module, exchange, _Passive()
+
+
+def test_a_print_fills_only_the_side_its_aggressor_took():
+    module, exchange, strategy = _exchange()
+    Side = module.Side
+    bid = exchange.place_limit_order(Side.BUY, None, 5.0, 50.0)
+    offer = exchange.place_limit_order(Side.SELL, None, 5.0, 49.0)
+
+    exchange.run(module, strategy, [(TRADE, SELL, 3.0, 49.5)])
+    assert strategy.fills == [("BUY", 50.0, 3.0)]
+    assert exchange.orders[bid][2] == 2.0 and exchange.orders[offer][2] == 5.0
+
+    exchange.run(module, strategy, [(TRADE, BUY, 5.0, 49.5)])
+    assert strategy.fills[1:] == [("SELL", 49.0, 5.0)]
+    assert exchange.position == 3.0 - 5.0
+    assert exchange.filled_qty == 8.0
+
+
+def test_book_moving_through_a_resting_order_fills_every_crossed_level():
+    module, exchange, strategy = _exchange()
+    Side = module.Side
+    exchange.place_limit_order(Side.BUY, None, 10.0, 52.0)
+    exchange.place_limit_order(Side.SELL, None, 4.0, 60.0)
+
+    exchange.run(module, strategy, [(SNAPSHOT, ((61.0, 1.0), (60.5, 2.0)), ((50.0, 3.0), (51.0, 3.0), (53.0, 3.0)))])
+
+    assert strategy.fills == [("BUY", 52.0, 3.0), ("BUY", 52.0, 3.0), ("SELL", 60.0, 1.0), ("SELL", 60.0, 2.0)]
+    assert exchange.book.best_ask() == 53.0
+    assert exchange.book.best_bid_tick == NO_BID
+    assert [order[2] for order in exchange.orders.values()] == [4.0, 1.0]
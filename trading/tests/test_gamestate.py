@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+from bench import play_by_play
+from gamestate import AWAY, FOULS, HOME, PACE, PERIOD_FOULS, POSSESSION, POSSESSIONS, RUN, SCORE_DIFF, GameState
+from records import EventCode, ShotCode, TeamCode, event_code, shot_code, team_code
+
+# the baseline keeps raw strings, None before the first event
+_TEAMS = {"home": TeamCode.HOME.value, "away": TeamCode.AWAY.value, "unknown": TeamCode.UNKNOWN.value, None: TeamCode.UNKNOWN.value}
+
+
+class BaselineWoody:
+    """Possession, streak and clock tracking as the original woodytest.py did it."""
+
+    def __init__(self):
+        self.possession = None
+        self.last_shooter = None
+        self.max_time = None
+        self.home_score = 0
+        self.away_score = 0
+        self.time_remaining = 0.0
+        self.streak_team = None
+        self.streak_points = 0
+
+    def update(self, event_type, home_away, home_score, away_score, shot_type, time_seconds):
+        self.home_score = home_score
+        self.away_score = away_score
+        self.time_remaining = time_seconds if time_seconds is not None else self.time_remaining
+        if self.max_time is None and self.time_remaining > 0:
+            self.max_time = self.time_remaining
+
+        if event_type == "JUMP_BALL" and home_away != "unknown":
+            self.possession = home_away
+        elif event_type == "SCORE":
+            if self.possession == "home":
+                self.possession = "away"
+            elif self.possession == "away":
+                self.possession = "home"
+        elif event_type == "MISSED":
+            self.last_shooter = home_away
+        elif event_type == "REBOUND":
+            self.possession = home_away
+        elif event_type == "TURNOVER":
+            self.possession = "away" if home_away == "home" else "home"
+        elif event_type == "STEAL":
+            self.possession = home_away
+
+        if event_type == "SCORE":
+            points = 3 if shot_type == "THREE_POINT" else 1 if shot_type == "FREE_THROW" else 2
+            if self.streak_team != home_away:
+                self.streak_team = home_away
+                self.streak_points = points
+            else:
+                self.streak_points += points
+
+    def p(self):
+        return 1.0 if self.possession == "home" else 0.0 if self.possession == "away" else 0.5
+
+
+def _events(seed, n=600):
+    """Seeded play-by-play with some events re-attributed to the unknown team."""
+    rng = random.Random(seed)
+    for event in play_by_play(seed, n):
+        args = list(event.args())
+        if args[0] != "END_GAME" and rng.random() < 0.1:
+            args[1] = "unknown"
+        yield args
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_matches_the_baseline_woodytest_logic(seed):
+    game, woody = GameState(), BaselineWoody()
+    for args in _events(seed):
+        event_type, home_away, home_score, away_score = args[:4]
+        if event_type == "END_GAME":
+            break
+        shot_type, time_seconds = args[6], args[11]
+        woody.update(event_type, home_away, home_score, away_score, shot_type, time_seconds)
+        game.update(event_code(event_type), team_code(home_away), home_score, away_score, shot_code(shot_type), time_seconds)
+
+        assert game.features[POSSESSION] == woody.p()
+        assert game.features[SCORE_DIFF] == home_score - away_score
+        assert (game.home_score, game.away_score) == (woody.home_score, woody.away_score)
+        assert game.time_left == woody.time_remaining
+        assert game.start_time == woody.max_time
+        assert game.streak_points == woody.streak_points
+        assert game.streak_team == _TEAMS[woody.streak_team]
+        assert game.last_shooter == _TEAMS[woody.last_shooter]
+
+
+def _update(game, event, team, home, away, time, shot=ShotCode.NONE):
+    game.update(event.value, team, home, away, shot.value, time)
+
+
+def test_counters_and_derived_features():
+    game = GameState()
+    _update(game, EventCode.JUMP_BALL, HOME, 0, 0, 2880.0)
+    _update(game, EventCode.SCORE, HOME, 3, 0, 2870.0, ShotCode.THREE_POINT)
+    _update(game, EventCode.MISSED, AWAY, 3, 0, 2860.0, ShotCode.TWO_POINT)
+    _update(game, EventCode.MISSED, AWAY, 3, 0, 2855.0)  # no shot type: counts in the total only
+    _update(game, EventCode.REBOUND, HOME, 3, 0, 2850.0)
+    _update(game, EventCode.SCORE, HOME, 5, 0, 2840.0, ShotCode.LAYUP)
+    _update(game, EventCode.FOUL, AWAY, 5, 0, 2830.0)
+    _update(game, EventCode.SCORE, AWAY, 5, 1, 2820.0, ShotCode.FREE_THROW)
+    _update(game, EventCode.START_PERIOD, TeamCode.UNKNOWN.value, 5, 1, 2160.0)
+
+    assert game.features[RUN] == -1.0  # away's one-point run
+    assert (game.streak_team, game.streak_points) == (AWAY, 1)
+    assert game.features[FOULS + AWAY] == 1.0 and game.features[PERIOD_FOULS + AWAY] == 0.0
+    assert game.shot_pct(HOME) == 1.0 and game.shot_pct(HOME, ShotCode.THREE_POINT.value) == 1.0
+    assert game.shot_pct(AWAY) == pytest.approx(1 / 3)
+    assert game.shot_pct(AWAY, ShotCode.TWO_POINT.value) == 0.0
+    # home, then away after the score, home on the rebound, away after the layup, home after the free throw
+    assert game.features[POSSESSIONS] == 4.0
+    assert game.features[PACE] == pytest.approx(4 * 60.0 / (2880.0 - 2160.0))
+    assert game.features[POSSESSION] == 1.0
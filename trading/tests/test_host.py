@@ -0,0 +1,52 @@
+import asyncio
+import os
+import sys
+import threading
+
+from eventlog import INFO, EventLog
+from host import StrategyHost
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "template.py")
+
+
+class _Gateway:
+    def place_market_order(self, side, ticker, quantity):
+        pass
+
+    def place_limit_order(self, side, ticker, quantity, price, ioc=False):
+        return 0
+
+    def cancel_order(self, ticker, order_id):
+        return False
+
+
+def test_event_log_keeps_every_record_from_concurrent_producers(tmp_path):
+    path = tmp_path / "log.txt"
+    log = EventLog(str(path), level=INFO, capacity=1 << 15, flush_interval=60.0)
+    threads, per_thread = 8, 2000
+
+    def produce(t):
+        for i in range(per_thread):
+            log.info("tick", thread=t, i=i)
+
+    workers = [threading.Thread(target=produce, args=(t,)) for t in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    log.close()
+
+    lines = path.read_text().splitlines()
+    assert log.dropped == 0
+    assert len(lines) == len(set(lines)) == threads * per_thread
+
+
+def test_remove_game_unregisters_the_private_module():
+    async def run():
+        host = StrategyHost(TEMPLATE, _Gateway(), workers=2)
+        names = [host.add_game(ticker).module.__name__ for ticker in ("a", "b")]
+        assert all(name in sys.modules for name in names)
+        await host.close()
+        return names
+
+    assert not any(name in sys.modules for name in asyncio.run(run()))
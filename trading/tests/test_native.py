@@ -0,0 +1,113 @@
+"""The native core against the pure-Python fallback, replaying seeded streams through both."""
+
+import math
+import random
+
+import pytest
+
+import orderbook
+import orders
+import winprob
+from backtest import GAME_EVENT, ORDERBOOK, SNAPSHOT, TRADE
+from bench import game_stream
+from native import core
+from records import SideCode
+
+pytestmark = pytest.mark.skipif(core is None, reason="native core not built (python build_core.py)")
+
+BUY, SELL = SideCode.BUY.value, SideCode.SELL.value
+
+
+def _book_state(book):
+    return (
+        book.best_bid_tick,
+        book.best_ask_tick,
+        list(book.bids()),
+        list(book.asks()),
+        book.is_two_sided(),
+        book.mid() if book.is_two_sided() else None,
+    )
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_order_book_replay(seed):
+    py, native = orderbook.PyOrderBook(), core.OrderBook()
+    for event in game_stream(seed, 200, 50, 20):
+        kind = event[0]
+        if kind == ORDERBOOK:
+            _, side, quantity, price = event
+            py.update(side == BUY, price, quantity)
+            native.update(side == BUY, price, quantity)
+        elif kind == SNAPSHOT:
+            _, bids, asks = event
+            assert py.load_snapshot(bids, asks) == native.load_snapshot(bids, asks)
+        else:
+            continue
+        assert _book_state(py) == _book_state(native)
+    assert list(py.bid_qty) == list(native.bid_qty)
+    assert list(py.ask_qty) == list(native.ask_qty)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_order_registry_replay(seed):
+    """Rest an order at every traded price, fill against trades and expire the rest."""
+    rng = random.Random(seed)
+    py, native = orders.PyOrderRegistry(), core.OrderRegistry()
+    now = 0.0
+    order_id = 0
+    for event in game_stream(seed, 200, 50, 20):
+        now += 0.1
+        if event[0] != TRADE:
+            continue
+        _, side, quantity, price = event
+        order_id += 1
+        ours = SELL if side == BUY else BUY
+        args = (order_id, ours, price, rng.choice([1.0, 2.5, 5.0]), now)
+        placed_py, placed_native = py.add(*args), native.add(*args)
+        assert (placed_py.order_id, placed_py.tick, placed_py.qty) == (placed_native.order_id, placed_native.tick, placed_native.qty)
+        assert py.match_fill(ours, price, quantity) == native.match_fill(ours, price, quantity)
+        if rng.random() < 0.1:
+            victim = rng.randint(1, order_id)
+            assert (py.remove(victim) is None) == (native.remove(victim) is None)
+        assert py.pop_expired(now, 5.0) == native.pop_expired(now, 5.0)
+        assert len(py) == len(native)
+        assert (py.count(BUY), py.count(SELL)) == (native.count(BUY), native.count(SELL))
+        assert sorted(py) == sorted(native)
+
+
+@pytest.mark.parametrize("preset", sorted(winprob.PRESETS))
+def test_win_probability_replay(preset):
+    model = winprob.get_model(preset)
+    py_prob = winprob.WinProbModel.prob.__get__(model)
+    py_exact = winprob.WinProbModel.prob_exact.__get__(model)
+    native = core.WinProbModel(*winprob.PRESETS[preset], game_length=model.game_length)
+    for seed in range(3):
+        for event in game_stream(seed, 400, 1, 0):
+            if event[0] != GAME_EVENT:
+                continue
+            game_event = event[1]
+            diff = game_event.home_score - game_event.away_score
+            for possession in (0.0, 0.5, 1.0, 0.3):
+                for score_diff in (diff, float(diff), diff + 0.5):
+                    state = (score_diff, game_event.time, possession)
+                    assert native.prob(*state) == py_prob(*state), state
+                    assert native.prob_exact(*state) == py_exact(*state), state
+
+
+def test_uninitialized_win_probability_model_raises():
+    model = core.WinProbModel.__new__(core.WinProbModel)
+    with pytest.raises(RuntimeError):
+        model.prob(1, 100.0, 0.5)
+    with pytest.raises(RuntimeError):
+        model.prob_exact(1, 100.0, 0.5)
+
+
+@pytest.mark.parametrize("time_left", [math.nan, math.inf, -math.inf])
+def test_non_finite_time_uses_the_exact_formula(time_left):
+    model = winprob.get_model("woody")
+    py_prob = winprob.WinProbModel.prob.__get__(model)
+    native = core.WinProbModel(*winprob.PRESETS["woody"], game_length=model.game_length)
+    for score_diff in (0, 3, -7):
+        expected = model.prob_exact(score_diff, time_left, 0.5)
+        for got in (py_prob(score_diff, time_left, 0.5), native.prob(score_diff, time_left, 0.5)):
+            assert got == expected or (got != got and expected != expected)
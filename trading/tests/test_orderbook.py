@@ -0,0 +1,60 @@
+import pytest
+
+import orderbook
+from bench import snapshots
+from native import core
+from orderbook import SnapshotMonitor
+
+BOOKS = [orderbook.PyOrderBook] + ([core.OrderBook] if core is not None else [])
+
+
+@pytest.fixture(params=BOOKS, ids=lambda cls: cls.__module__)
+def book_type(request):
+    return request.param
+
+
+def _levels(book):
+    return list(book.bids()), list(book.asks())
+
+
+def test_first_snapshot_builds_the_book_without_counting_drift(book_type):
+    book, monitor = book_type(), SnapshotMonitor()
+    assert monitor.apply(book, [(49.0, 10.0), (48.0, 5.0)], [(51.0, 4.0)])
+    assert (book.best_bid_tick, book.best_ask_tick) == (4900, 5100)
+    assert monitor.stats() == {"snapshots": 1, "drifted": 0, "drift_levels": 0}
+
+
+def test_snapshot_matching_the_deltas_reports_nothing(book_type):
+    book, monitor = book_type(), SnapshotMonitor()
+    monitor.apply(book, [(49.0, 10.0)], [(51.0, 4.0)])
+    book.update(True, 48.0, 5.0)
+    book.update(False, 51.0, 0.0)
+    book.update(False, 52.0, 2.0)
+    assert not monitor.apply(book, [(48.0, 5.0), (49.0, 10.0)], [(52.0, 2.0)])
+    assert monitor.stats() == {"snapshots": 2, "drifted": 0, "drift_levels": 0}
+
+
+def test_drift_is_counted_per_level_and_top_moves_reported(book_type):
+    book, monitor = book_type(), SnapshotMonitor()
+    monitor.apply(book, [(49.0, 10.0), (48.0, 5.0)], [(51.0, 4.0)])
+
+    # a resized level below the top: drift, but the top did not move
+    assert not monitor.apply(book, [(49.0, 10.0), (48.0, 7.0)], [(51.0, 4.0)])
+    assert monitor.stats() == {"snapshots": 2, "drifted": 1, "drift_levels": 1}
+
+    # best bid removed and a new ask level added: two levels, top moved
+    assert monitor.apply(book, [(48.0, 7.0)], [(51.0, 4.0), (53.0, 1.0)])
+    assert monitor.stats() == {"snapshots": 3, "drifted": 2, "drift_levels": 3}
+    assert _levels(book) == ([(48.0, 7.0)], [(51.0, 4.0), (53.0, 1.0)])
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_merging_equals_rebuilding_from_scratch(book_type, seed):
+    book, monitor = book_type(), SnapshotMonitor()
+    for bids, asks in snapshots(seed, 50, 20):
+        top = (book.best_bid_tick, book.best_ask_tick)
+        moved = monitor.apply(book, bids, asks)
+        fresh = book_type()
+        fresh.load_snapshot(bids, asks)
+        assert _levels(book) == _levels(fresh)
+        assert moved == ((fresh.best_bid_tick, fresh.best_ask_tick) != top)
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+import orders
+from native import core
+
+BUY, SELL = 0, 1
+REGISTRIES = [orders.PyOrderRegistry] + ([core.OrderRegistry] if core is not None else [])
+
+
+@pytest.fixture(params=REGISTRIES, ids=lambda cls: cls.__module__)
+def registry(request):
+    return request.param()
+
+
+def test_counts_and_fill_matching_fifo_within_a_price(registry):
+    registry.add(1, BUY, 50.0, 2.0, 0.0)
+    registry.add(2, BUY, 50.0, 3.0, 1.0)
+    registry.add(3, SELL, 55.0, 1.0, 2.0)
+    assert (registry.count(BUY), registry.count(SELL)) == (2, 1)
+
+    assert registry.match_fill(BUY, 50.0, 1.5) == 1  # oldest at the price, partially filled
+    assert registry.get(1).qty == 0.5
+    assert registry.match_fill(BUY, 50.0, 0.5) == 1  # now fully filled and removed
+    assert 1 not in registry
+    assert registry.match_fill(BUY, 50.0, 3.0) == 2
+    assert registry.count(BUY) == 0
+
+    assert registry.match_fill(SELL, 55.01, 1.0) is None  # no order at that price
+    assert registry.match_fill(BUY, 55.0, 1.0) is None  # nor on that side
+    assert registry.match_fill(SELL, 55.0, 1.0) == 3
+    assert len(registry) == 0
+
+
+def test_expiry_pops_oldest_first_and_skips_removed_or_replaced_orders(registry):
+    for order_id, placed in ((1, 0.0), (2, 1.0), (3, 2.0), (4, 3.0)):
+        registry.add(order_id, BUY, 40.0 + order_id, 1.0, placed)
+    registry.remove(2)
+    registry.add(3, SELL, 60.0, 1.0, 10.0)  # same id re-placed later
+
+    assert registry.pop_expired(5.0, 2.5) == [1]  # placed before 2.5; 2 is gone, 3 was replaced
+    assert registry.pop_expired(5.0, 1.0) == [4]
+    assert sorted(registry) == [3]
+    assert registry.count(SELL) == 1 and registry.count(BUY) == 0
+    assert registry.pop_expired(20.0, 5.0) == [3]
+    assert len(registry) == 0
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_a_linear_scan(registry, seed):
+    """Random traffic against the plain dict scan the strategies used before."""
+    rng = random.Random(seed)
+    live = {}  # order_id -> [side, tick, qty, placed]
+    now = 0.0
+    for order_id in range(1, 400):
+        now += rng.random()
+        op = rng.random()
+        if op < 0.5:
+            side, tick = rng.choice((BUY, SELL)), rng.randint(4990, 5010)
+            qty = rng.choice((1.0, 2.0, 5.0))
+            registry.add(order_id, side, tick / 100, qty, now)
+            live[order_id] = [side, tick, qty, now]
+        elif op < 0.8:
+            side, tick, quantity = rng.choice((BUY, SELL)), rng.randint(4990, 5010), rng.choice((1.0, 3.0))
+            candidates = [i for i, o in live.items() if o[0] == side and o[1] == tick]
+            expected = min(candidates, key=lambda i: (live[i][3], i)) if candidates else None
+            assert registry.match_fill(side, tick / 100, quantity) == expected
+            if expected is not None:
+                live[expected][2] -= quantity
+                if live[expected][2] <= 0:
+                    del live[expected]
+        elif op < 0.9 and live:
+            victim = rng.choice(list(live))
+            assert registry.remove(victim) is not None
+            del live[victim]
+        else:
+            expected = sorted((o[3], i) for i, o in live.items() if o[3] < now - 20.0)
+            assert registry.pop_expired(now, 20.0) == [i for _, i in expected]
+            for _, i in expected:
+                del live[i]
+        assert sorted(registry) == sorted(live)
+        assert registry.count(BUY) == sum(o[0] == BUY for o in live.values())
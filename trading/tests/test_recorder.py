@@ -0,0 +1,82 @@
+from backtest import GAME_EVENT, ORDERBOOK, SNAPSHOT, TRADE
+from bench import game_stream
+from recorder import Capture, Recorder, read_events
+
+
+class _Sink:
+    def on_orderbook_update(self, ticker, side, quantity, price):
+        pass
+
+    def on_trade_update(self, ticker, side, quantity, price):
+        pass
+
+    def on_account_update(self, ticker, side, price, quantity, capital_remaining):
+        pass
+
+    def on_game_event_update(self, *args):
+        self.last_game_event = args
+
+    def on_orderbook_snapshot(self, ticker, bids, asks):
+        pass
+
+
+def _feed(strategy, events):
+    for event in events:
+        kind = event[0]
+        if kind == ORDERBOOK:
+            strategy.on_orderbook_update(0, event[1], event[2], event[3])
+        elif kind == TRADE:
+            strategy.on_trade_update(0, event[1], event[2], event[3])
+        elif kind == GAME_EVENT:
+            strategy.on_game_event_update(*event[1].args())
+        else:
+            strategy.on_orderbook_snapshot(0, list(event[1]), list(event[2]))
+
+
+def _comparable(events):
+    return [(GAME_EVENT, event[1].args()) if event[0] == GAME_EVENT else event for event in events]
+
+
+def test_game_stream_round_trip(tmp_path):
+    events = game_stream(0, 200, 20, 10)
+    path = str(tmp_path / "session.qcr")
+    strategy = _Sink()
+    recorder = Recorder(path).attach(strategy)
+    _feed(strategy, events)
+    recorder.close()
+
+    assert recorder.errors == 0
+    assert recorder.records == len(events)
+    assert _comparable(read_events(path)) == _comparable(events)
+    with Capture(path) as capture:
+        kinds = [kind for kind, _, _ in capture]
+    assert kinds == [event[0] for event in events]
+    assert {SNAPSHOT, ORDERBOOK, TRADE, GAME_EVENT} <= set(kinds)
+
+
+def test_float_scores_are_recorded_and_delivered(tmp_path):
+    path = str(tmp_path / "session.qcr")
+    strategy = _Sink()
+    recorder = Recorder(path).attach(strategy)
+    args = ("SCORE", "home", 3.0, 1.0, None, None, "THREE_POINT", None, None, None, None, 2000.0)
+    strategy.on_game_event_update(*args)
+    recorder.close()
+
+    assert strategy.last_game_event == args
+    assert recorder.errors == 0
+    (event,) = read_events(path)
+    assert event[1].args() == ("SCORE", "home", 3, 1, None, None, "THREE_POINT", None, None, None, None, 2000.0)
+
+
+def test_unrecordable_callback_still_reaches_the_strategy(tmp_path):
+    path = str(tmp_path / "session.qcr")
+    strategy = _Sink()
+    recorder = Recorder(path).attach(strategy)
+    args = ("SCORE", "home", "three", 0, None, None, None, None, None, None, None, 2000.0)
+    strategy.on_game_event_update(*args)
+    strategy.on_orderbook_snapshot(0, [(50.0, "ten")], [])
+    recorder.close()
+
+    assert strategy.last_game_event == args
+    assert recorder.errors == 2
+    assert read_events(path) == []
@@ -0,0 +1,39 @@
+import os
+
+from backtest import BUY, TRADE, Exchange, load_strategy_module
+
+WOODYTEST = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "woodytest.py")
+
+
+def _deliver(exchange, module, strategy):
+    sides = (module.Side.BUY, module.Side.SELL)
+    while exchange.pending_fills:
+        code, price, quantity, capital = exchange.pending_fills.popleft()
+        strategy.on_account_update(module.Ticker.TEAM_A, sides[code], price, quantity, capital)
+
+
+def test_quote_fills_release_resting_exposure():
+    module = load_strategy_module(WOODYTEST)
+    exchange = Exchange()
+    exchange.bind(module)
+    strategy = module.Strategy(module.StrategyParams(max_messages_per_sec=None))
+    exchange.book.load_snapshot([(49.0, 100.0)], [(50.0, 100.0)])
+    Side = module.Side
+
+    # a buy quote through the ask fills at the ask, not at its limit
+    strategy.quotes.sync({(Side.BUY, 1): (Side.BUY, 55.0, 2.0)})
+    # two ladder levels clamped to the same price
+    strategy.quotes.sync({(Side.SELL, 1): (Side.SELL, 99.99, 1.0), (Side.SELL, 2): (Side.SELL, 99.99, 1.5)})
+    assert strategy.risk.resting == [0.0, 2.5]
+    _deliver(exchange, module, strategy)
+
+    exchange.run(module, strategy, [(TRADE, BUY, 2.5, 99.99)])
+
+    assert exchange.fills == 3
+    assert strategy.position == 2.0 - 2.5
+    assert strategy.risk.position == strategy.position
+    assert strategy.risk.resting == [0.0, 0.0]
+    assert strategy.risk.at_risk == [0.0, 0.0]
+    assert not strategy.quotes.live
+    assert strategy.quotes.has_budget()
+    assert strategy.risk.check(Side.BUY, 1.0, 50.0) is None
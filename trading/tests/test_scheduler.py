@@ -0,0 +1,94 @@
+import os
+
+from backtest import Exchange, load_strategy_module
+from scheduler import EvalScheduler
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "template.py")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler(min_interval=0.0, key=None):
+    runs = []
+    clock = _Clock()
+    state = {"key": 0}
+    scheduler = EvalScheduler(
+        lambda: runs.append(clock.now),
+        state_key=(lambda: state["key"]) if key is None else key,
+        min_interval=min_interval,
+        clock=clock,
+    )
+    return scheduler, runs, clock, state
+
+
+def test_unchanged_state_key_is_skipped():
+    scheduler, runs, _, state = _scheduler()
+    assert scheduler.mark()
+    assert not scheduler.mark()
+    state["key"] = 1
+    assert scheduler.mark()
+    assert len(runs) == 2
+    assert scheduler.stats()["unchanged"] == 1
+
+
+def test_urgent_mark_runs_even_when_coalesced_and_unchanged():
+    scheduler, runs, clock, _ = _scheduler(min_interval=1.0)
+    assert scheduler.mark()
+    clock.now = 0.1
+    assert not scheduler.mark()  # inside the interval
+    assert scheduler.mark(urgent=True)  # and with an unchanged key
+    assert runs == [0.0, 0.1]
+    assert not scheduler.dirty
+
+
+def test_min_interval_coalesces_marks_into_one_evaluation():
+    scheduler, runs, clock, state = _scheduler(min_interval=1.0)
+    scheduler.mark()
+    for t in (0.2, 0.4, 0.6):
+        clock.now = t
+        state["key"] += 1
+        assert not scheduler.mark()
+    assert runs == [0.0]
+    assert scheduler.stats()["coalesced"] == 3
+    clock.now = 1.0
+    assert scheduler.mark()
+    assert runs == [0.0, 1.0]
+
+
+def test_deferred_mark_runs_on_the_next_poll():
+    scheduler, runs, clock, state = _scheduler(min_interval=1.0)
+    scheduler.mark()
+    clock.now = 0.5
+    state["key"] = 1
+    scheduler.mark()
+    assert scheduler.dirty
+    assert not scheduler.poll()  # still inside the interval
+    clock.now = 1.5
+    assert scheduler.poll()
+    assert runs == [0.0, 1.5]
+    assert not scheduler.poll()  # nothing pending any more
+
+
+def test_template_only_reevaluates_when_its_inputs_change():
+    module = load_strategy_module(TEMPLATE)
+    Exchange().bind(module)
+    strategy = module.Strategy()
+    runs = []
+    strategy.evaluate_and_trade = lambda: runs.append(strategy.evaluation_inputs())
+    Side, ticker = module.Side, module.Ticker.TEAM_A
+
+    strategy.on_orderbook_snapshot(ticker, [(49.0, 10.0), (48.0, 5.0)], [(51.0, 10.0), (52.0, 5.0)])
+    assert len(runs) == 1
+    strategy.on_trade_update(ticker, Side.BUY, 1.0, 51.0)  # nothing it reads changed
+    strategy.on_orderbook_update(ticker, Side.BUY, 7.0, 48.0)  # below the top of book
+    assert len(runs) == 1
+    strategy.on_orderbook_update(ticker, Side.BUY, 3.0, 50.0)  # new best bid
+    strategy.on_trade_update(ticker, Side.SELL, 1.0, 50.0)
+    assert len(runs) == 2
+    assert runs[-1][0] == 5000
@@ -0,0 +1,240 @@
+"""Win-probability models shared by the strategies and the research code.
+
+Every model is a logistic regression over the same small feature set::
+
+    logit = c0 + c1 * S + c2 * S * (t / game_length) + c3 * S / max(1, t) + c4 * P
+
+where ``S`` is the home-minus-away score difference, ``t`` the game seconds
+remaining and ``P`` home possession (1.0 home, 0.0 away, 0.5 unknown).
+
+Live lookups go through a table precomputed over (possession, score
+difference, time bucket) with linear interpolation in time. The last minute
+of the game (where ``S / t`` moves fast), score differences outside the table
+and non-standard possession values fall back to the exact formula. The batch
+API and coefficient fitting need NumPy; live lookups do not. When the native
+core is built, live lookups go through its copy of the table (``core.hpp``),
+which gives identical results.
+"""
+
+import math
+from array import array
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
+
+from native import core
+
+FEATURES = ("intercept", "score_diff", "score_diff_x_time_frac", "score_diff_per_sec", "possession")
+
+PRESETS: Dict[str, Tuple[Tuple[float, ...], Tuple[float, float]]] = {
+    # template.py: sigmoid(0.5 + 0.4 * S / t), clipped to [0.01, 0.99]
+    "template": ((0.5, 0.0, 0.0, 0.4, 0.0), (0.01, 0.99)),
+    # woodytest.py: sigmoid(0.2775 + 0.3208 * T * S + 0.2894 * P) for the home team
+    "woody": ((0.2775, 0.0, 0.3208, 0.0, 0.2894), (0.0, 1.0)),
+}
+
+_POSSESSION_INDEX = {0.0: 0, 0.5: 1, 1.0: 2}
+
+
+def design_matrix(score_diff, time_left, possession=0.5, game_length: float = 2880.0):
+    """Feature matrix of shape (n, len(FEATURES)) for array inputs (broadcast together)."""
+    import numpy as np
+
+    s, t, p = np.broadcast_arrays(
+        np.asarray(score_diff, dtype=np.float64),
+        np.asarray(time_left, dtype=np.float64),
+        np.asarray(possession, dtype=np.float64),
+    )
+    s, t, p = s.ravel(), t.ravel(), p.ravel()
+    return np.column_stack([np.ones_like(s), s, s * (t / game_length), s / np.maximum(1.0, t), p])
+
+
+class WinProbModel:
+    """Logistic win-probability model with a precomputed lookup table.
+
+    Parameters
+    ----------
+    coef
+        One coefficient per entry of ``FEATURES``
+    clip
+        (low, high) bounds applied to every probability
+    game_length
+        Regulation length in seconds, used for the time fraction feature
+    max_score_diff
+        Score differences in ``[-max_score_diff, max_score_diff]`` are tabulated
+    time_step
+        Seconds between tabulated time points
+    exact_below
+        Time remaining below which probabilities are computed exactly
+    """
+
+    def __init__(
+        self,
+        coef: Sequence[float],
+        clip: Tuple[float, float] = (0.0, 1.0),
+        game_length: float = 2880.0,
+        max_score_diff: int = 60,
+        time_step: float = 5.0,
+        exact_below: float = 60.0,
+    ) -> None:
+        if len(coef) != len(FEATURES):
+            raise ValueError(f"expected {len(FEATURES)} coefficients, got {len(coef)}")
+        self.coef = tuple(float(c) for c in coef)
+        self.clip = (float(clip[0]), float(clip[1]))
+        self.game_length = float(game_length)
+        self.max_score_diff = int(max_score_diff)
+        self.time_step = float(time_step)
+        self.exact_below = float(exact_below)
+        self.n_scores = 2 * self.max_score_diff + 1
+        self.n_times = int(math.ceil(self.game_length / self.time_step)) + 1
+        self._table = self._build_table()
+        if core is not None:
+            native = core.WinProbModel(
+                self.coef, self.clip, self.game_length, self.max_score_diff, self.time_step, self.exact_below
+            )
+            self.prob = native.prob
+            self.prob_exact = native.prob_exact
+
+    # -- exact model ----------------------------------------------------------
+
+    def logit(self, score_diff: float, time_left: float, possession: float = 0.5) -> float:
+        c0, c1, c2, c3, c4 = self.coef
+        return (
+            c0
+            + c1 * score_diff
+            + c2 * score_diff * (time_left / self.game_length)
+            + c3 * score_diff / max(1.0, time_left)
+            + c4 * possession
+        )
+
+    def prob_exact(self, score_diff: float, time_left: float, possession: float = 0.5) -> float:
+        z = self.logit(score_diff, time_left, possession)
+        if z >= 0:
+            p = 1.0 / (1.0 + math.exp(-z))
+        else:
+            e = math.exp(z)
+            p = e / (1.0 + e)
+        low, high = self.clip
+        return low if p < low else high if p > high else p
+
+    def _build_table(self) -> array:
+        c0, c1, c2, c3, c4 = self.coef
+        low, high = self.clip
+        exp = math.exp
+        times = [i * self.time_step for i in range(self.n_times)]
+        # per time point, the coefficient multiplying the score difference
+        slopes = [c1 + c2 * (t / self.game_length) + c3 / max(1.0, t) for t in times]
+        table = array("d")
+        for possession in (0.0, 0.5, 1.0):
+            offset = c0 + c4 * possession
+            for s in range(-self.max_score_diff, self.max_score_diff + 1):
+                for slope in slopes:
+                    z = offset + slope * s
+                    p = 1.0 / (1.0 + exp(-z)) if z >= 0 else 1.0 - 1.0 / (1.0 + exp(z))
+                    table.append(low if p < low else high if p > high else p)
+        return table
+
+    # -- live lookup ----------------------------------------------------------
+
+    def prob(self, score_diff: float, time_left: float, possession: float = 0.5) -> float:
+        """Win probability of the home team, from the lookup table where possible.
+
+        Integral score differences, including floats such as ``3.0``, use the
+        table; anything else falls back to the exact formula, as do times
+        below ``exact_below`` and NaN or infinite times.
+        """
+        s = score_diff + self.max_score_diff
+        p = _POSSESSION_INDEX.get(possession)
+        if not self.exact_below <= time_left < math.inf or p is None or s < 0 or s >= self.n_scores or s % 1:
+            return self.prob_exact(score_diff, time_left, possession)
+        s = int(s)
+        x = time_left / self.time_step
+        i = int(x)
+        if i >= self.n_times - 1:
+            i = self.n_times - 2
+            x = i + 1.0
+        base = (p * self.n_scores + s) * self.n_times + i
+        table = self._table
+        low = table[base]
+        return low + (table[base + 1] - low) * (x - i)
+
+    # -- batch / research -----------------------------------------------------
+
+    def prob_batch(self, score_diff, time_left, possession=0.5):
+        """Exact win probabilities for arrays of inputs (broadcast together)."""
+        import numpy as np
+
+        z = design_matrix(score_diff, time_left, possession, self.game_length) @ np.asarray(self.coef)
+        return np.clip(0.5 * (1.0 + np.tanh(0.5 * z)), *self.clip)
+
+    @classmethod
+    def fit(cls, score_diff, time_left, possession, home_won, l2: float = 1e-4, n_iter: int = 50, **kwargs) -> "WinProbModel":
+        """Fit coefficients by ridge-penalised IRLS on historical game states.
+
+        Parameters
+        ----------
+        score_diff, time_left, possession
+            Game state arrays, one row per observed state
+        home_won
+            1 where the home team went on to win, else 0
+        l2
+            Ridge penalty (not applied to the intercept)
+        kwargs
+            Passed to the constructor, e.g. ``game_length`` or ``clip``
+        """
+        import numpy as np
+
+        X = design_matrix(score_diff, time_left, possession, kwargs.get("game_length", 2880.0))
+        y = np.asarray(home_won, dtype=np.float64)
+        beta = np.zeros(X.shape[1])
+        penalty = np.full(X.shape[1], l2)
+        penalty[0] = 0.0
+        for _ in range(n_iter):
+            p = 0.5 * (1.0 + np.tanh(0.5 * (X @ beta)))
+            w = np.maximum(p * (1.0 - p), 1e-9)
+            grad = X.T @ (y - p) - penalty * beta
+            hess = (X * w[:, None]).T @ X + np.diag(penalty)
+            step = np.linalg.solve(hess, grad)
+            beta += step
+            if np.max(np.abs(step)) < 1e-10:
+                break
+        return cls(beta, **kwargs)
+
+    def save(self, path: str) -> None:
+        """Write the coefficients and settings to a compact ``.npz`` file."""
+        import numpy as np
+
+        np.savez(
+            path,
+            coef=np.asarray(self.coef),
+            clip=np.asarray(self.clip),
+            game_length=self.game_length,
+            features=np.asarray(FEATURES),
+        )
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "WinProbModel":
+        """Build a model from a file written by :meth:`save`."""
+        import numpy as np
+
+        with np.load(path) as data:
+            if tuple(data["features"]) != FEATURES:
+                raise ValueError(f"{path} was fitted on features {tuple(data['features'])}, expected {FEATURES}")
+            return cls(
+                data["coef"].tolist(),
+                clip=tuple(data["clip"].tolist()),
+                game_length=float(data["game_length"]),
+                **kwargs,
+            )
+
+
+@lru_cache(maxsize=None)
+def get_model(spec: str = "template") -> WinProbModel:
+    """Shared model for a preset name or a path to a ``.npz`` coefficient file.
+
+    Models are cached per process, so every strategy instance (and every game
+    in a replay) reuses the same precomputed table.
+    """
+    if spec.endswith(".npz"):
+        return WinProbModel.load(spec)
+    coef, clip = PRESETS[spec]
+    return WinProbModel(coef, clip=clip)
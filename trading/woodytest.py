@@ -1,7 +1,21 @@
 
+import math
+import time
+from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
-import math
+
+from eventlog import get_log
+from gamestate import POSSESSION, GameState
+from orderbook import OrderBook, SnapshotMonitor
+from profiler import Profiler, profiling_enabled
+from quotes import QuoteManager
+from quoting import AvellanedaStoikov
+from recorder import Recorder, recording_dir, session_path
+from risk import RiskEngine, RiskLimits
+from scheduler import EvalScheduler
+from records import EventCode, TeamCode, event_code, shot_code, team_code
+from winprob import get_model
 
 class Side(Enum):
     BUY = 0
@@ -65,6 +79,34 @@ def cancel_order(ticker: Ticker, order_id: int) -> bool:
     """
     return 0
 
+def clock() -> float:
+    """Monotonic time in seconds for the message budget and re-quote coalescing.
+
+    The backtester rebinds this to replay time, so replays are deterministic.
+    """
+    return time.monotonic()
+
+@dataclass
+class StrategyParams:
+    """Per-instance strategy parameters."""
+    interval: float = 3.0  # spacing between grid levels beyond the first
+    num_levels: int = 3
+    gamma: float = 0.05  # Avellaneda-Stoikov risk aversion per unit of position
+    fill_decay: float = 1.5  # k: decay of fill probability with distance from the reservation price
+    risk_horizon_sec: float = 60.0  # cap on the seconds of inventory risk priced into the quotes
+    min_half_spread: float = 3.0  # nearest levels never closer to the reservation price than this
+    max_half_spread: float = 15.0
+    max_skew: float = 10.0  # cap on the inventory shift of the reservation price
+    vol_window: int = 50  # fair value changes in the rolling volatility estimate
+    eval_min_interval_sec: float = 0.0  # coalesce non-urgent re-quotes within this many clock() seconds
+    price_tolerance: float = 0.5  # keep live quotes within this distance of the target
+    max_messages_per_sec: Optional[float] = 50.0  # cancels + new orders, None to disable
+    win_model: str = "woody"  # winprob preset name or path to a fitted .npz
+    max_position: float = math.inf  # |position| if every resting quote on a side fills
+    max_resting_per_side: float = math.inf
+    max_notional: float = math.inf  # capital at risk in resting quotes
+    max_loss: float = math.inf  # kill switch: only position-reducing orders after losing this much
+
 class Strategy:
     """Template for a strategy."""
 
@@ -72,65 +114,78 @@ class Strategy:
         """Reset the state of the strategy to the start of game position."""
         self.position = 0.0
         self.capital = 100000.0
-        self.possession = None
-        self.last_shooter = None
-        self.max_time = None
+        self.game = GameState()  # score, clock, possession, runs and shooting, see gamestate.py
         self.current_prob = 0.5
-        self.home_score = 0
-        self.away_score = 0
-        self.time_remaining = 0.0
-        self.bids = []  # list of (price, quantity) sorted descending by price
-        self.asks = []  # list of (price, quantity) sorted ascending by price
-        self.my_orders = {}  # dict of order_id: (side, price, quantity)
-        self.streak_team = None
-        self.streak_points = 0
-        self.last_mid = None
-
-    def __init__(self) -> None:
+        self.book = OrderBook()  # price-level book, see orderbook.py
+        self.snapshots = SnapshotMonitor()  # drift between the delta stream and snapshots
+        self.risk.reset(self.capital)
+        self.quotes = QuoteManager(
+            place=self.place_quote,
+            cancel=self.cancel_quote,
+            price_tolerance=self.params.price_tolerance,
+            max_messages_per_sec=self.params.max_messages_per_sec,
+            clock=clock,
+        )
+        self.last_mid = None  # mid at the last move of 1.0 or more
+        self.quoter.reset()
+
+    def __init__(self, params: Optional[StrategyParams] = None) -> None:
         """Your initialization code goes here."""
+        self.params = params if params is not None else StrategyParams()
+        self.log = get_log()
+        self.win_model = get_model(self.params.win_model)
+        self.risk = RiskEngine(
+            RiskLimits(
+                max_position=self.params.max_position,
+                max_resting_per_side=self.params.max_resting_per_side,
+                max_notional=self.params.max_notional,
+                max_loss=self.params.max_loss,
+            ),
+            100000.0,
+        )
+        self.quoter = AvellanedaStoikov(
+            gamma=self.params.gamma,
+            k=self.params.fill_decay,
+            horizon_sec=self.params.risk_horizon_sec,
+            min_half_spread=self.params.min_half_spread,
+            max_half_spread=self.params.max_half_spread,
+            max_skew=self.params.max_skew,
+            vol_window=self.params.vol_window,
+        )
+        # callbacks mark state dirty; the scheduler decides when trade runs
+        self.scheduler = EvalScheduler(
+            lambda: self.trade(),
+            state_key=self.trade_inputs,
+            min_interval=self.params.eval_min_interval_sec,
+            clock=clock,
+        )
         self.reset_state()
+        self.profiler = Profiler().attach(self) if profiling_enabled() else None
+        self.recorder = Recorder(session_path(recording_dir())).attach(self) if recording_dir() else None
 
     def on_trade_update(
         self, ticker: Ticker, side: Side, quantity: float, price: float
     ) -> None:
         """Called whenever two orders match."""
-        print(f"Python Trade update: {ticker} {side} {quantity} shares @ {price}")
+        self.log.debug("trade", side=side.name, qty=quantity, price=price)
 
     def on_orderbook_update(
         self, ticker: Ticker, side: Side, quantity: float, price: float
     ) -> None:
         """Called whenever the orderbook changes."""
-        if side == Side.BUY:
-            for i in range(len(self.bids)):
-                if self.bids[i][0] == price:
-                    if quantity > 0:
-                        self.bids[i] = (price, quantity)
-                    else:
-                        del self.bids[i]
-                    break
-            else:
-                if quantity > 0:
-                    self.bids.append((price, quantity))
-            self.bids.sort(reverse=True)
-        else:
-            for i in range(len(self.asks)):
-                if self.asks[i][0] == price:
-                    if quantity > 0:
-                        self.asks[i] = (price, quantity)
-                    else:
-                        del self.asks[i]
-                    break
-            else:
-                if quantity > 0:
-                    self.asks.append((price, quantity))
-            self.asks.sort()
-
-        # Trade only if mid changed significantly to avoid too frequent updates
-        if self.bids and self.asks:
-            mid = (self.bids[0][0] + self.asks[0][0]) / 2
+        self.book.update(side == Side.BUY, price, quantity)
+
+        # Re-quote only if mid changed significantly to avoid too frequent updates
+        if self.book.is_two_sided():
+            mid = self.book.mid()
             if self.last_mid is None or abs(mid - self.last_mid) >= 1.0:
                 self.last_mid = mid
-                self.trade()
+                self.scheduler.mark()
+                return
+        if self.quotes.pending and self.quotes.has_budget():
+            self.scheduler.mark()  # finish a ladder the message budget cut short
+        else:
+            self.scheduler.poll()
 
     def on_account_update(
         self,
@@ -146,7 +201,8 @@ class Strategy:
         else:
             self.position -= quantity
         self.capital = capital_remaining
-        # Since we cancel and replace, we don't precisely track partial fills here
+        order_id = self.quotes.on_fill(side, price, quantity)
+        self.risk.on_fill(order_id, side, price, quantity, capital_remaining)
 
     def on_game_event_update(self,
                              event_type: str,
@@ -164,123 +220,133 @@ class Strategy:
         ) -> None:
         """Called whenever a basketball game event occurs."""
 
-        print(f"{event_type} {home_score} - {away_score}")
+        self.log.info("game", event=event_type, home=home_score, away=away_score, time=time_seconds)
 
-        if event_type == "END_GAME":
+        code = event_code(event_type)
+        if code == EventCode.END_GAME:
+            self.log.info("scheduler", **self.scheduler.stats())
+            self.log.info("risk", **self.risk.stats())
+            self.log.info("book", **self.snapshots.stats())
+            self.log.info("game_state", **self.game.as_dict())
+            self.scheduler.reset_stats()
             self.reset_state()
             return
 
-        self.home_score = home_score
-        self.away_score = away_score
-        self.time_remaining = time_seconds if time_seconds is not None else self.time_remaining
-
-        if self.max_time is None and self.time_remaining > 0:
-            self.max_time = self.time_remaining
-
-        # Update possession
-        if event_type == "JUMP_BALL" and home_away != "unknown":
-            self.possession = home_away
-        elif event_type == "SCORE":
-            if self.possession == "home":
-                self.possession = "away"
-            elif self.possession == "away":
-                self.possession = "home"
-        elif event_type == "MISSED":
-            self.last_shooter = home_away
-        elif event_type == "REBOUND":
-            self.possession = home_away
-        elif event_type == "TURNOVER":
-            self.possession = "away" if home_away == "home" else "home"
-        elif event_type == "STEAL":
-            self.possession = home_away
-
-        # Update streak for momentum
-        if event_type == "SCORE":
-            points = 3 if shot_type == "THREE_POINT" else 1 if shot_type == "FREE_THROW" else 2
-            if self.streak_team != home_away:
-                self.streak_team = home_away
-                self.streak_points = points
-            else:
-                self.streak_points += points
+        game = self.game
+        game.update(code, team_code(home_away), home_score, away_score, shot_code(shot_type), time_seconds)
 
         # Calculate win probability
-        if self.time_remaining == 0:
-            self.current_prob = 1.0 if self.home_score > self.away_score else 0.0
+        if game.time_left == 0:
+            self.current_prob = 1.0 if game.home_score > game.away_score else 0.0
         else:
-            T = self.time_remaining / self.max_time if self.max_time else 0.0
-            S = self.home_score - self.away_score
-            A = 0  # Home team
-            P = 1.0 if self.possession == "home" else 0.0 if self.possession == "away" else 0.5
-            linear_inside = 0.2775 - 0.4483 * A + 0.3208 * T * S + 0.2894 * P
-            self.current_prob = 1 / (1 + math.exp(-linear_inside))
+            T = game.time_left / game.start_time if game.start_time else 0.0
+            S = game.home_score - game.away_score
+            self.current_prob = self.win_model.prob(S, T * self.win_model.game_length, game.features[POSSESSION])
+        self.quoter.observe(game.elapsed(), self.current_prob * 100)
 
-        # Trade after event
-        self.trade()
+        # Trade after event; scores re-quote immediately
+        self.scheduler.mark(urgent=code == EventCode.SCORE)
 
     def on_orderbook_snapshot(self, ticker: Ticker, bids: list, asks: list) -> None:
         """Called periodically with a complete snapshot of the orderbook."""
-        self.bids = bids
-        self.asks = asks
-        self.trade()
+        # only a new top of book can change what we trade
+        if self.snapshots.apply(self.book, bids, asks):
+            self.scheduler.mark()
+
+    def place_quote(self, side: Side, qty: float, price: float) -> int:
+        """Send a ladder order if the risk limits allow it; 0 means rejected."""
+        if not self.risk.allow(side, qty, price):
+            return 0
+        order_id = place_limit_order(side, Ticker.TEAM_A, qty, price)
+        if order_id:
+            self.risk.on_place(order_id, side, price, qty)
+        return order_id
+
+    def cancel_quote(self, order_id: int) -> None:
+        cancel_order(Ticker.TEAM_A, order_id)
+        self.risk.on_cancel(order_id)
+
+    def trade_inputs(self) -> tuple:
+        """Everything trade() reads; unchanged inputs are not re-quoted.
+
+        ``last_mid`` only moves in steps of at least 1.0, so small mid moves
+        do not re-quote, while larger ones re-quote as they always have.
+        The throttle count is included so a ladder cut short by the message
+        budget is not skipped as unchanged. The next book update after the
+        budget refills marks the state, and that completes the ladder.
+        """
+        game = self.game
+        return (
+            self.book.is_two_sided(),
+            self.last_mid,
+            self.current_prob,
+            self.position,
+            self.capital,
+            game.time_left,
+            game.home_score,
+            game.away_score,
+            game.streak_team,
+            game.streak_points,
+            self.quotes.throttled,
+        )
 
     def is_away_dominating(self) -> bool:
         """Check if away team is dominating."""
-        diff = self.away_score - self.home_score
+        game = self.game
+        diff = game.away_score - game.home_score
         if diff <= 0:
             return False
 
-        if self.max_time is None:
+        if game.start_time is None:
             return False
 
-        quarter_duration = self.max_time / 4
-        if self.time_remaining > 3 * quarter_duration:  # Q1
+        quarter_duration = game.start_time / 4
+        if game.time_left > 3 * quarter_duration:  # Q1
             threshold = 10
-        elif self.time_remaining > 2 * quarter_duration:  # Q2
+        elif game.time_left > 2 * quarter_duration:  # Q2
             threshold = 15
-        elif self.time_remaining > quarter_duration:  # Q3
+        elif game.time_left > quarter_duration:  # Q3
             threshold = 12
         else:  # Q4
             threshold = 8
 
         score_dominate = diff >= threshold
-        streak_dominate = self.streak_team == "away" and self.streak_points >= 10
+        streak_dominate = game.streak_team == TeamCode.AWAY and game.streak_points >= 10
 
         return score_dominate or streak_dominate
 
     def trade(self) -> None:
         """Implement the modified grid strategy."""
-        if not self.bids or not self.asks:
+        if not self.book.is_two_sided():
             return
 
-        # First, cancel all existing orders
-        for order_id in list(self.my_orders.keys()):
-            cancel_order(Ticker.TEAM_A, order_id)
-        self.my_orders = {}
-
         # Clear positions if 5 minutes or less remaining
-        if self.time_remaining <= 300 and self.time_remaining > 0:
-            if self.position > 0:
+        time_left = self.game.time_left
+        if time_left <= 300 and time_left > 0:
+            self.quotes.cancel_all()
+            if self.position > 0 and self.risk.allow(Side.SELL, self.position, self.book.best_bid(), resting=False):
                 place_market_order(Side.SELL, Ticker.TEAM_A, self.position)
-            elif self.position < 0:
+            elif self.position < 0 and self.risk.allow(Side.BUY, -self.position, self.book.best_ask(), resting=False):
                 place_market_order(Side.BUY, Ticker.TEAM_A, -self.position)
             return
 
-        # Otherwise, set up grid around fair value
+        # Otherwise, set up grid around the inventory-adjusted reservation price
         fair = self.current_prob * 100
-        interval = 3.0  # Tight grid as recommended
-        num_levels = 3
+        reservation, half_spread = self.quoter.quote(fair, self.position, time_left)
+        interval = self.params.interval
         qty_per_level = max(1.0, (self.capital * 0.005) / fair) if fair > 0 else 1.0  # 0.5% of capital per level
+        qty_per_level = round(qty_per_level, 1)
 
         away_dominating = self.is_away_dominating()
 
-        for i in range(1, num_levels + 1):
-            buy_price = max(0.01, fair - i * interval)  # Avoid 0 or negative
+        # Target ladder, nearest levels first; only changed levels are re-sent
+        targets = {}
+        for i in range(1, self.params.num_levels + 1):
             if not away_dominating:
-                order_id = place_limit_order(Side.BUY, Ticker.TEAM_A, qty_per_level, buy_price)
-                if order_id:
-                    self.my_orders[order_id] = (Side.BUY, buy_price, qty_per_level)
-
-            sell_price = min(99.99, fair + i * interval)  # Avoid over 100
-            order_id = place_limit_order(Side.SELL, Ticker.TEAM_A, qty_per_level, sell_price)
-            if order_id:
-                self.my_orders[order_id] = (Side.SELL, sell_price, qty_per_level)
+                buy_price = round(max(0.01, reservation - half_spread - (i - 1) * interval), 2)  # Avoid 0 or negative
+                targets[(Side.BUY, i)] = (Side.BUY, buy_price, qty_per_level)
+
+            sell_price = round(min(99.99, reservation + half_spread + (i - 1) * interval), 2)  # Avoid over 100
+            targets[(Side.SELL, i)] = (Side.SELL, sell_price, qty_per_level)
+
+        self.quotes.sync(targets)